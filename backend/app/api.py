@@ -2,19 +2,27 @@
 API REST para geração de relatórios - FastAPI
 """
 
+import asyncio
 import logging
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+from typing import List, Sequence
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import tempfile
-import shutil
+from io import BytesIO
 
-from app.utils.jira_parser import parser_jira_csv
-from app.services.ticket_service import TicketService
-from app.services.analysis_service import AnalysisService
-from app.services.pdf_report_service import PDFReportService
-from app.config import REPORTS_OUTPUT_DIR
+from app.services import metricas_service
+from app.services.job_service import FilaCheiaError, JobService
+from app.services.report_service import ReportService
+from app.utils import instrumentacao
+from app.utils.jira_parser import validar_cabecalho
+from app.utils.metricas import CONTENT_TYPE, MedirRequisicoes
+from app.utils.upload_stream import TAMANHO_INICIO, FluxoUpload, LimiteTamanhoRequisicao, UploadRejeitadoError
+from app.utils.versao import obter_versao
+from app.config import REPORTS_OUTPUT_DIR, UPLOAD_LEITORES, UPLOAD_TAMANHO_MAXIMO_MB
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -36,6 +44,75 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Limite do corpo das requisições (recusa pelo Content-Length antes de ler o upload)
+UPLOAD_TAMANHO_MAXIMO = UPLOAD_TAMANHO_MAXIMO_MB * 1024 * 1024
+app.add_middleware(LimiteTamanhoRequisicao, tamanho_maximo=UPLOAD_TAMANHO_MAXIMO)
+
+# Parsers dos uploads em streaming, fora do executor padrão (ver FluxoUpload.iniciar_leitor)
+leitores_upload = ThreadPoolExecutor(max_workers=UPLOAD_LEITORES, thread_name_prefix='upload')
+app.router.add_event_handler("shutdown", lambda: leitores_upload.shutdown(wait=False, cancel_futures=True))
+
+# Métricas para /metrics: latência por endpoint (middleware) e etapas dos relatórios
+# (observador da instrumentação; as etapas dos jobs voltam no resultado de cada job)
+app.add_middleware(
+    MedirRequisicoes,
+    latencia=metricas_service.requisicao_duracao,
+    em_andamento=metricas_service.requisicoes_em_andamento
+)
+instrumentacao.observar(metricas_service.registrar_etapa)
+
+# Jobs de relatório (pool de processos criado no primeiro job)
+jobs = JobService()
+app.router.add_event_handler("shutdown", jobs.encerrar)
+
+
+def _resposta_pdf(pdf: bytes, nome: str, total_tickets: int) -> StreamingResponse:
+    """Devolve o PDF gerado em memória como download, sem gravá-lo em disco"""
+    return StreamingResponse(
+        BytesIO(pdf),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f'attachment; filename="{nome}"',
+            "X-Total-Tickets": str(total_tickets),
+        }
+    )
+
+
+def _salvar_pdf(relatorio: dict) -> Path:
+    """Grava o PDF gerado em REPORTS_OUTPUT_DIR (servido por /download)"""
+    pdf_path = REPORTS_OUTPUT_DIR / relatorio['pdf_nome']
+    pdf_path.parent.mkdir(parents=True, exist_ok=True)
+    pdf_path.write_bytes(relatorio['pdf'])
+    return pdf_path
+
+
+def _validar_upload(*arquivos: UploadFile):
+    """Recusa (400) uploads cujo cabeçalho não é de um CSV do Jira, antes de processá-los"""
+    for arquivo in arquivos:
+        if arquivo.size is not None:
+            metricas_service.upload_tamanho.observar(arquivo.size)
+        inicio = arquivo.file.read(TAMANHO_INICIO)
+        arquivo.file.seek(0)
+        try:
+            validar_cabecalho(inicio)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"{arquivo.filename}: {e}")
+
+
+def _copiar_para_temporarios(*arquivos: UploadFile) -> List[Path]:
+    """Copia os uploads para arquivos temporários (só o caminho vai para o processo do job)"""
+    caminhos = []
+    try:
+        for arquivo in arquivos:
+            with tempfile.NamedTemporaryFile(prefix='job_', suffix='.csv', delete=False) as destino:
+                caminhos.append(Path(destino.name))
+                shutil.copyfileobj(arquivo.file, destino)
+    except Exception:
+        for caminho in caminhos:
+            caminho.unlink(missing_ok=True)
+        raise
+    return caminhos
+
 
 @app.get("/")
 async def root():
@@ -43,11 +120,19 @@ async def root():
     return {
         "projeto": "AGT 4.0",
         "versao": "1.0.0",
+        "build": obter_versao(),
         "descricao": "Sistema de Análise de Tickets e Geração de Relatórios",
         "endpoints": {
             "POST /upload-csv": "Upload de CSV e geração de relatório",
             "POST /upload-comparativo": "Upload de dois CSVs e geração de relatório comparativo",
-            "GET /health": "Verificar status da API"
+            "POST /upload-csv/stream": "CSV no corpo da requisição, processado enquanto é recebido",
+            "POST /jobs/upload-csv": "Enfileirar relatório de um CSV (retorna o id do job)",
+            "POST /jobs/upload-comparativo": "Enfileirar relatório comparativo (retorna o id do job)",
+            "GET /jobs/{job_id}": "Status do job",
+            "GET /jobs/{job_id}/download": "PDF do job concluído",
+            "GET /jobs": "Métricas da fila de jobs",
+            "GET /health": "Verificar status da API",
+            "GET /metrics": "Métricas no formato do Prometheus"
         }
     }
 
@@ -58,78 +143,116 @@ async def health_check():
     return {"status": "OK", "servico": "AGT 4.0 API"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Métricas no formato de texto do Prometheus (latência, vazão da leitura, relatórios, jobs)"""
+    metricas_service.atualizar_jobs(jobs.metricas())
+    metricas_service.registrar_versao(obter_versao())
+    return Response(metricas_service.registro.formatar(), media_type=CONTENT_TYPE)
+
+
 @app.post("/upload-csv")
-async def upload_csv(file: UploadFile = File(...)):
+def upload_csv(file: UploadFile = File(...), em_memoria: bool = False):
     """
     Upload de CSV e geração de relatório
     
+    Handler síncrono: o FastAPI o executa no threadpool, sem bloquear o event loop.
+    
     Args:
         file: Arquivo CSV do Jira
+        em_memoria: Se True, devolve o próprio PDF sem gravá-lo em disco
         
     Returns:
-        Path do PDF gerado
+        Path do PDF gerado (ou o PDF, com em_memoria)
     """
     try:
         logger.info(f"Recebido arquivo: {file.filename}")
+        _validar_upload(file)
         
-        # Salvar temporariamente
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = Path(tmp.name)
-        
-        # Processar
-        logger.info("Processando arquivo...")
-        tickets = parser_jira_csv(tmp_path)
+        # Processar direto do upload e gerar o PDF (agrupamento e PDF em cache pelo hash do CSV)
+        logger.info("Processando arquivo e gerando PDF...")
+        relatorio = ReportService.gerar_pdf_periodo(file.file, file.filename)
+        resultado = relatorio['resultado']
         
-        service = TicketService()
-        service.carregar_tickets(tickets)
-        
-        resumo = AnalysisService.calcular_resumo_executivo(tickets)
-        analises_tipologia = AnalysisService.analisar_por_tipologia(tickets)
-        analises_componente = AnalysisService.analisar_por_componente(tickets)
-        analises_origem = AnalysisService.analisar_por_origem(tickets)
-        analises_prioridade = AnalysisService.analisar_por_prioridade(tickets)
-        analises_servidor = AnalysisService.analisar_por_servidor(tickets)
-        
-        # Gerar PDF
-        periodo = file.filename.split("_")[1] if "_" in file.filename else "Período"
-        pdf_path = REPORTS_OUTPUT_DIR / f"relatorio_{file.filename.replace('.csv', '.pdf')}"
-        
-        logger.info("Gerando PDF...")
-        pdf_service = PDFReportService(pdf_path)
-        pdf_service.gerar_relatorio(
-            periodo=periodo,
-            resumo=resumo,
-            analises_tipologia=analises_tipologia,
-            analises_componente=analises_componente,
-            analises_origem=analises_origem,
-            analises_prioridade=analises_prioridade,
-            analises_servidor=analises_servidor
-        )
-        
-        # Limpar temporário
-        tmp_path.unlink()
+        if em_memoria:
+            return _resposta_pdf(relatorio['pdf'], relatorio['pdf_nome'], resultado['total_tickets'])
         
+        pdf_path = _salvar_pdf(relatorio)
         logger.info(f"PDF gerado: {pdf_path}")
         
         return {
             "status": "sucesso",
-            "arquivo": file.filename,
-            "total_tickets": len(tickets),
-            "resumo": resumo,
+            **resultado,
             "pdf_path": str(pdf_path),
             "pdf_url": f"/download/{pdf_path.name}"
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/upload-csv/stream")
+async def upload_csv_stream(request: Request, nome: str = "upload.csv", em_memoria: bool = False):
+    """
+    Upload do CSV no corpo da requisição (Content-Type: text/csv), processado em streaming
+    
+    Os blocos são entregues ao parser (numa thread) à medida que chegam: o
+    hash é calculado no caminho, e um arquivo grande demais (413) ou com
+    cabeçalho inválido (400) é recusado sem esperar o fim do upload.
+    
+    Args:
+        request: Requisição com o CSV como corpo
+        nome: Nome do arquivo (define o período e o nome do PDF)
+        em_memoria: Se True, devolve o próprio PDF sem gravá-lo em disco
+        
+    Returns:
+        Path do PDF gerado (ou o PDF, com em_memoria)
+    """
+    logger.info(f"Recebendo arquivo em streaming: {nome}")
+    fluxo = FluxoUpload(UPLOAD_TAMANHO_MAXIMO, validar_inicio=validar_cabecalho)
+    processamento = fluxo.iniciar_leitor(leitores_upload, ReportService.gerar_pdf_periodo, nome)
+    
+    try:
+        async for bloco in request.stream():
+            # False: o parser parou (ex.: CSV inválido); o erro vem do await abaixo
+            if not await fluxo.alimentar(bloco):
+                break
+        else:
+            await fluxo.finalizar()
+        relatorio = await processamento
+        metricas_service.upload_tamanho.observar(fluxo.tamanho)
+    
+    except Exception as e:
+        fluxo.abortar(e)
+        await asyncio.wait([processamento])
+        processamento.exception()
+        logger.error(f"Erro: {e}")
+        status = e.status if isinstance(e, UploadRejeitadoError) else 400
+        raise HTTPException(status_code=status, detail=str(e))
+    
+    resultado = relatorio['resultado']
+    if em_memoria:
+        return _resposta_pdf(relatorio['pdf'], relatorio['pdf_nome'], resultado['total_tickets'])
+    
+    pdf_path = _salvar_pdf(relatorio)
+    logger.info(f"PDF gerado: {pdf_path} ({fluxo.tamanho} bytes recebidos)")
+    
+    return {
+        "status": "sucesso",
+        **resultado,
+        "pdf_path": str(pdf_path),
+        "pdf_url": f"/download/{pdf_path.name}"
+    }
+
+
 @app.post("/upload-comparativo")
-async def upload_comparativo(
+def upload_comparativo(
     arquivo_anterior: UploadFile = File(...),
-    arquivo_atual: UploadFile = File(...)
+    arquivo_atual: UploadFile = File(...),
+    em_memoria: bool = False
 ):
     """
     Upload de dois CSVs e geração de relatório comparativo
@@ -137,119 +260,139 @@ async def upload_comparativo(
     Args:
         arquivo_anterior: CSV do período anterior
         arquivo_atual: CSV do período atual
+        em_memoria: Se True, devolve o próprio PDF sem gravá-lo em disco
         
     Returns:
-        Path do PDF comparativo
+        Path do PDF comparativo (ou o PDF, com em_memoria)
     """
     try:
         logger.info(f"Recebidos arquivos: {arquivo_anterior.filename}, {arquivo_atual.filename}")
+        _validar_upload(arquivo_anterior, arquivo_atual)
         
-        # Salvar temporariamente
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp_ant:
-            shutil.copyfileobj(arquivo_anterior.file, tmp_ant)
-            tmp_ant_path = Path(tmp_ant.name)
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp_atu:
-            shutil.copyfileobj(arquivo_atual.file, tmp_atu)
-            tmp_atu_path = Path(tmp_atu.name)
-        
-        # Processar período anterior
-        logger.info("Processando período anterior...")
-        tickets_ant = parser_jira_csv(tmp_ant_path)
-        service_ant = TicketService()
-        service_ant.carregar_tickets(tickets_ant)
-        resumo_ant = AnalysisService.calcular_resumo_executivo(tickets_ant)
-        
-        # Processar período atual
-        logger.info("Processando período atual...")
-        tickets_atu = parser_jira_csv(tmp_atu_path)
-        service_atu = TicketService()
-        service_atu.carregar_tickets(tickets_atu)
-        resumo_atu = AnalysisService.calcular_resumo_executivo(tickets_atu)
-        analises_tipologia = AnalysisService.analisar_por_tipologia(tickets_atu)
-        analises_componente = AnalysisService.analisar_por_componente(tickets_atu)
-        analises_origem = AnalysisService.analisar_por_origem(tickets_atu)
-        analises_prioridade = AnalysisService.analisar_por_prioridade(tickets_atu)
-        analises_servidor = AnalysisService.analisar_por_servidor(tickets_atu)
-        
-        # Top 10 servidores com mais tickets (total do período)
-        top_10_servidores_atual = AnalysisService.top_10_servidores_por_total(tickets_atu)
-        top_10_servidores_acumulado = AnalysisService.top_10_servidores_por_total(tickets_ant + tickets_atu)
-        
-        # Resumo acumulado
-        resumo_acumulado = AnalysisService.calcular_resumo_acumulado(tickets_ant, tickets_atu)
-        
-        # Tabelas detalhadas para relatório
-        tabela_tipologia = AnalysisService.tabela_tipologia(tickets_ant, tickets_atu)
-        tabela_top10_modulos = AnalysisService.tabela_top10_modulos(tickets_ant, tickets_atu)
-        tabela_origem = AnalysisService.tabela_origem(tickets_ant, tickets_atu)
-        
-        # Gerar comparativo
-        comparativo = {
-            'periodo_anterior': arquivo_anterior.filename.split("_")[1] if "_" in arquivo_anterior.filename else "Anterior",
-            'periodo_atual': arquivo_atual.filename.split("_")[1] if "_" in arquivo_atual.filename else "Atual",
-            'total_anterior': resumo_ant['total_geral'],
-            'total_atual': resumo_atu['total_geral'],
-            'variacao_total': resumo_atu['total_geral'] - resumo_ant['total_geral'],
-            'abertos_anterior': resumo_ant['total_abertos'],
-            'abertos_atual': resumo_atu['total_abertos'],
-            'variacao_abertos': resumo_atu['total_abertos'] - resumo_ant['total_abertos'],
-            'fechados_anterior': resumo_ant['total_fechados'],
-            'fechados_atual': resumo_atu['total_fechados'],
-            'variacao_fechados': resumo_atu['total_fechados'] - resumo_ant['total_fechados'],
-            'backlog_anterior': resumo_ant['backlog_final'],
-            'backlog_atual': resumo_atu['backlog_final'],
-            'variacao_backlog': resumo_atu['backlog_final'] - resumo_ant['backlog_final'],
-            'top_10_servidores_atual': top_10_servidores_atual,
-            'top_10_servidores_acumulado': top_10_servidores_acumulado,
-            'resumo_acumulado': resumo_acumulado
-        }
-        
-        # Gerar PDF
-        pdf_path = REPORTS_OUTPUT_DIR / f"relatorio_comparativo_{comparativo['periodo_anterior']}_vs_{comparativo['periodo_atual']}.pdf"
-        
-        logger.info("Gerando PDF comparativo...")
-        pdf_service = PDFReportService(pdf_path)
-        pdf_service.gerar_relatorio(
-            periodo=f"{comparativo['periodo_anterior']} vs {comparativo['periodo_atual']}",
-            resumo=resumo_atu,
-            analises_tipologia=analises_tipologia,
-            analises_componente=analises_componente,
-            analises_origem=analises_origem,
-            analises_prioridade=analises_prioridade,
-            analises_servidor=analises_servidor,
-            comparativo=comparativo,
-            resumo_anterior=resumo_ant,
-            resumo_acumulado=resumo_acumulado,
-            top_10_servidores_atual=top_10_servidores_atual,
-            top_10_servidores_acumulado=top_10_servidores_acumulado,
-            tabela_tipologia=tabela_tipologia,
-            tabela_top10_modulos=tabela_top10_modulos,
-            tabela_origem=tabela_origem
+        logger.info("Processando períodos e gerando PDF comparativo...")
+        relatorio = ReportService.gerar_pdf_comparativo(
+            arquivo_anterior.file, arquivo_anterior.filename,
+            arquivo_atual.file, arquivo_atual.filename
         )
+        resultado = relatorio['resultado']
         
-        # Limpar temporários
-        tmp_ant_path.unlink()
-        tmp_atu_path.unlink()
+        if em_memoria:
+            return _resposta_pdf(relatorio['pdf'], relatorio['pdf_nome'], resultado['tickets_atual'])
         
+        pdf_path = _salvar_pdf(relatorio)
         logger.info(f"PDF comparativo gerado: {pdf_path}")
         
         return {
             "status": "sucesso",
-            "arquivo_anterior": arquivo_anterior.filename,
-            "arquivo_atual": arquivo_atual.filename,
-            "tickets_anterior": len(tickets_ant),
-            "tickets_atual": len(tickets_atu),
-            "comparativo": comparativo,
+            **resultado,
             "pdf_path": str(pdf_path),
             "pdf_url": f"/download/{pdf_path.name}"
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _enfileirar(tipo: str, funcao, *args, arquivos: Sequence[Path] = ()) -> JSONResponse:
+    """Submete um job e responde 202 com as URLs de status e download"""
+    try:
+        job = jobs.submeter(tipo, funcao, *args, arquivos=arquivos)
+    except FilaCheiaError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    return JSONResponse(status_code=202, content={
+        **job.to_dict(),
+        "status_url": f"/jobs/{job.job_id}",
+        "download_url": f"/jobs/{job.job_id}/download"
+    })
+
+
+@app.post("/jobs/upload-csv")
+def job_upload_csv(file: UploadFile = File(...)):
+    """
+    Enfileira a geração do relatório de um CSV e retorna o id do job
+    
+    Handler síncrono (threadpool): o upload é validado e copiado para um
+    arquivo temporário sem bloquear o event loop; o job recebe o caminho.
+    
+    Args:
+        file: Arquivo CSV do Jira
+        
+    Returns:
+        Job criado (202), ou 429 se a fila estiver cheia
+    """
+    logger.info(f"Job de relatório: {file.filename}")
+    _validar_upload(file)
+    csvs = _copiar_para_temporarios(file)
+    return _enfileirar("relatorio", ReportService.gerar_pdf_periodo, csvs[0], file.filename, arquivos=csvs)
+
+
+@app.post("/jobs/upload-comparativo")
+def job_upload_comparativo(
+    arquivo_anterior: UploadFile = File(...),
+    arquivo_atual: UploadFile = File(...)
+):
+    """
+    Enfileira a geração do relatório comparativo e retorna o id do job
+    
+    Handler síncrono (threadpool), como /jobs/upload-csv.
+    
+    Args:
+        arquivo_anterior: CSV do período anterior
+        arquivo_atual: CSV do período atual
+        
+    Returns:
+        Job criado (202), ou 429 se a fila estiver cheia
+    """
+    logger.info(f"Job comparativo: {arquivo_anterior.filename}, {arquivo_atual.filename}")
+    _validar_upload(arquivo_anterior, arquivo_atual)
+    csvs = _copiar_para_temporarios(arquivo_anterior, arquivo_atual)
+    return _enfileirar(
+        "comparativo", ReportService.gerar_pdf_comparativo,
+        csvs[0], arquivo_anterior.filename,
+        csvs[1], arquivo_atual.filename,
+        arquivos=csvs
+    )
+
+
+@app.get("/jobs")
+async def metricas_jobs():
+    """Capacidade, profundidade da fila e contadores dos jobs"""
+    return jobs.metricas()
+
+
+@app.get("/jobs/{job_id}")
+async def status_job(job_id: str):
+    """Status do job (e o resultado, quando concluído)"""
+    job = jobs.obter(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/download")
+async def download_job(job_id: str):
+    """PDF do job concluído (409 enquanto estiver na fila ou executando)"""
+    job = jobs.obter(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    
+    status = job.status
+    if status == 'erro':
+        raise HTTPException(status_code=400, detail=str(job.future.exception()))
+    if status == 'cancelado':
+        raise HTTPException(status_code=410, detail="Job cancelado (servidor encerrado antes de executá-lo)")
+    if status != 'concluido':
+        raise HTTPException(status_code=409, detail=f"Job ainda não concluído ({status})")
+    
+    relatorio = job.future.result()
+    total = relatorio['resultado'].get('total_tickets', relatorio['resultado'].get('tickets_atual', 0))
+    return _resposta_pdf(relatorio['pdf'], relatorio['pdf_nome'], total)
+
+
 @app.get("/download/{filename}")
 async def download_file(filename: str):
     """
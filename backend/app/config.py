@@ -22,6 +22,10 @@ RELATORIOS_DIR = PROJECT_ROOT / "relatorios"
 # Diretório de outputs de relatórios PDF
 REPORTS_OUTPUT_DIR = RELATORIOS_DIR
 
+# Cache em disco de tickets, agregados e PDFs, endereçado pelo hash dos CSVs (tamanho 0 desativa)
+CACHE_RELATORIOS_DIR = Path(os.getenv("CACHE_RELATORIOS_DIR", str(DATA_DIR / "cache")))
+CACHE_RELATORIOS_TAMANHO_MB = int(os.getenv("CACHE_RELATORIOS_TAMANHO_MB", "512"))
+
 # Configurações de logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -29,6 +33,28 @@ LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 # Configurações de processamento
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "1000"))
 
+# Tamanho máximo do corpo de um upload na API (MB)
+UPLOAD_TAMANHO_MAXIMO_MB = int(os.getenv("UPLOAD_TAMANHO_MAXIMO_MB", "200"))
+
+# Uploads em streaming processados ao mesmo tempo (threads dos parsers)
+UPLOAD_LEITORES = int(os.getenv("UPLOAD_LEITORES", "4"))
+
+# Jobs de geração de relatórios da API: processos, jobs aguardando, retenção dos resultados (s)
+# e quantos jobs finalizados (com o PDF em memória) ficam retidos no máximo
+JOBS_PROCESSOS = int(os.getenv("JOBS_PROCESSOS", "2"))
+JOBS_FILA_MAXIMA = int(os.getenv("JOBS_FILA_MAXIMA", "20"))
+JOBS_RETENCAO_SEGUNDOS = float(os.getenv("JOBS_RETENCAO_SEGUNDOS", "3600"))
+JOBS_RETIDOS_MAXIMO = int(os.getenv("JOBS_RETIDOS_MAXIMO", "50"))
+
+# Processos para renderizar os gráficos dos PDFs (0 = um por CPU)
+GRAFICOS_PROCESSOS = int(os.getenv("GRAFICOS_PROCESSOS", "0")) or None
+
+# Instrumentação das etapas do pipeline (tempos, linhas e bytes no log) e perfil
+# opcional de cada relatório: PERFIL=cprofile|pyinstrument, gravado em PERFIL_DIR
+INSTRUMENTACAO = os.getenv("INSTRUMENTACAO", "0").lower() in ("1", "true", "sim")
+PERFIL = os.getenv("PERFIL", "").lower() or None
+PERFIL_DIR = Path(os.getenv("PERFIL_DIR", str(DATA_DIR / "perfis")))
+
 # Períodos para análise
 CURRENT_PERIOD = "Outubro de 2025"
 PREVIOUS_PERIOD = "Setembro de 2025"
@@ -19,15 +19,17 @@ class Ticket:
     componente: str  # Database, PSRM, Portal, Batch Server, Jira Server, Clusters
     servidor: Optional[str]  # Servidor/Cluster específico
     status: str  # Fechada, Aberta, Em Progresso, Cancelado
-    data_abertura: datetime
+    data_abertura: Optional[datetime]  # None quando a data do CSV é inválida
     data_fechamento: Optional[datetime]
     responsavel: Optional[str]
     relator: Optional[str]
     prioridade: Optional[str]  # Low, Medium, High, Critical
     
     @property
-    def dias_aberto(self) -> int:
-        """Calcula dias em aberto"""
+    def dias_aberto(self) -> Optional[int]:
+        """Calcula dias em aberto (None sem data de abertura)"""
+        if self.data_abertura is None:
+            return None
         data_fim = self.data_fechamento or datetime.now()
         return (data_fim - self.data_abertura).days
     
@@ -0,0 +1,144 @@
+"""
+Modelo colunar de tickets (TicketFrame)
+"""
+
+from dataclasses import fields
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .ticket import Ticket
+
+# pandas/numpy são importados no primeiro uso: isinstance(x, TicketFrame) não os carrega
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Ordem dos campos igual à do dataclass Ticket
+CAMPOS_TICKET = [f.name for f in fields(Ticket)]
+
+# Colunas de texto com poucos valores distintos (armazenadas como categorias)
+COLUNAS_CATEGORICAS = [
+    'tipologia', 'origem', 'componente', 'servidor',
+    'status', 'responsavel', 'relator', 'prioridade'
+]
+
+# Texto livre, quase único por ticket: como categoria custaria mais (códigos + tabela de categorias)
+COLUNAS_TEXTO_LIVRE = ['titulo', 'descricao']
+
+COLUNAS_DATA = ['data_abertura', 'data_fechamento']
+
+# Status considerados fechados (mesma regra de Ticket.esta_aberto)
+STATUS_FECHADOS = ('fechada', 'cancelado')
+
+
+def _para_python(serie: "pd.Series") -> List[Any]:
+    """Converte uma coluna em lista de valores Python (NaN/NaT viram None)"""
+    import pandas as pd
+    
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return [None if pd.isna(v) else v.to_pydatetime() for v in serie]
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+class TicketFrame:
+    """
+    Conjunto de tickets em formato colunar (pandas)
+    
+    Colunas de texto com poucos valores distintos são categóricas (título e
+    descrição ficam como object), datas ficam em datetime64[ns]
+    (int64 internamente) e a máscara de abertos é calculada uma única vez.
+    """
+    
+    def __init__(self, dados: "pd.DataFrame"):
+        """
+        Inicializa o frame
+        
+        Args:
+            dados: DataFrame com as colunas de CAMPOS_TICKET
+        """
+        import pandas as pd
+        
+        dados = dados.reset_index(drop=True)
+        for coluna in COLUNAS_CATEGORICAS:
+            if not isinstance(dados[coluna].dtype, pd.CategoricalDtype):
+                dados[coluna] = dados[coluna].astype('category')
+        for coluna in COLUNAS_DATA:
+            dados[coluna] = pd.to_datetime(dados[coluna])
+        
+        self.dados = dados[CAMPOS_TICKET]
+        self.abertos = self._calcular_abertos(self.dados['status'])
+    
+    @staticmethod
+    def _calcular_abertos(status: "pd.Series") -> "np.ndarray":
+        """Calcula a máscara de abertos avaliando cada status distinto uma vez"""
+        import numpy as np
+        
+        categorias = status.cat.categories
+        # astype(str): sem tickets as categorias vêm vazias e sem tipo texto
+        fechado = np.append(categorias.astype(str).str.lower().isin(STATUS_FECHADOS), False)
+        return ~fechado[status.cat.codes.to_numpy()]
+    
+    @classmethod
+    def from_colunas(cls, colunas: Dict[str, Sequence[Any]]) -> "TicketFrame":
+        """Cria o frame a partir de um dicionário {campo: valores}"""
+        import pandas as pd
+        return cls(pd.DataFrame({campo: colunas[campo] for campo in CAMPOS_TICKET}))
+    
+    @classmethod
+    def from_tickets(cls, tickets: Iterable[Ticket]) -> "TicketFrame":
+        """Cria o frame a partir de objetos Ticket"""
+        import pandas as pd
+        linhas = [tuple(getattr(t, campo) for campo in CAMPOS_TICKET) for t in tickets]
+        return cls(pd.DataFrame.from_records(linhas, columns=CAMPOS_TICKET))
+    
+    @classmethod
+    def concatenar(cls, frames: Iterable["TicketFrame"]) -> "TicketFrame":
+        """Concatena vários frames (categorias são unificadas sem voltar a texto)"""
+        import pandas as pd
+        from pandas.api.types import union_categoricals
+        
+        frames = list(frames)
+        if not frames:
+            return cls.from_colunas({campo: [] for campo in CAMPOS_TICKET})
+        
+        colunas = {}
+        for campo in CAMPOS_TICKET:
+            series = [f.dados[campo] for f in frames]
+            if campo in COLUNAS_CATEGORICAS:
+                colunas[campo] = union_categoricals(series, ignore_order=True)
+            else:
+                colunas[campo] = pd.concat(series, ignore_index=True)
+        return cls.from_colunas(colunas)
+    
+    def __len__(self) -> int:
+        return len(self.dados)
+    
+    def __add__(self, outro: "TicketFrame") -> "TicketFrame":
+        return TicketFrame.concatenar([self, outro])
+    
+    def __iter__(self) -> Iterator[Ticket]:
+        """Itera como objetos Ticket (compatibilidade com código por ticket)"""
+        colunas = [_para_python(self.dados[campo]) for campo in CAMPOS_TICKET]
+        for valores in zip(*colunas):
+            yield Ticket(*valores)
+    
+    def to_tickets(self) -> List[Ticket]:
+        """Converte para lista de objetos Ticket"""
+        return list(self)
+    
+    def filtrar(self, mascara: "np.ndarray") -> "TicketFrame":
+        """Retorna um novo frame apenas com as linhas da máscara"""
+        return TicketFrame(self.dados[mascara])
+    
+    def dias_aberto(self, agora: Optional[datetime] = None) -> "np.ndarray":
+        """Calcula dias em aberto de todos os tickets de uma vez (NaN sem data de abertura)"""
+        import numpy as np
+        
+        agora = np.datetime64(agora or datetime.now(), 'ns')
+        fim = self.dados['data_fechamento'].to_numpy().copy()
+        fim[np.isnat(fim)] = agora
+        return np.floor((fim - self.dados['data_abertura'].to_numpy()) / np.timedelta64(1, 'D'))
+
+
+# Entrada aceita pelos serviços: lista de Ticket ou TicketFrame
+ColecaoTickets = Union[List[Ticket], TicketFrame]
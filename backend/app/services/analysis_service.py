@@ -3,28 +3,144 @@ Serviço de análise de tickets
 """
 
 import logging
-from typing import List, Dict, Any
+from operator import attrgetter
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
+
 from ..models.ticket import Ticket
+from ..models.ticket_frame import TicketFrame, ColecaoTickets
+from ..utils.instrumentacao import etapa
+from ..utils.top_k import SpaceSaving, top_k
 
 logger = logging.getLogger(__name__)
 
 
+# Mapeamento de componentes para origens usado nas análises
+ORIGEM_ANALISE_MAP = {
+    'Database': 'Database',
+    'Middleware': 'Middleware',
+    'Infraestruturas': 'Infra'
+}
+
+
+def _origem_por_componente(componente: Optional[str]) -> str:
+    """Obtém a origem de análise a partir do componente"""
+    componente = componente or "Não especificado"
+    return ORIGEM_ANALISE_MAP.get(componente, componente)
+
+
+# Dimensões de análise: (campo do ticket, normalização do valor)
+DIMENSOES = {
+    'tipologia': ('tipologia', None),
+    'componente': ('componente', None),
+    'origem': ('componente', _origem_por_componente),
+    'prioridade': ('prioridade', lambda v: v or "Não especificada"),
+    'responsavel': ('responsavel', lambda v: v or "Não atribuído"),
+    'servidor': ('servidor', lambda v: v or "Não especificado"),
+}
+
+
+def _extrator(dimensao: str):
+    """Cria a função que extrai a chave da dimensão de um Ticket"""
+    campo, normalizar = DIMENSOES[dimensao]
+    obter = attrgetter(campo)
+    if normalizar is None:
+        return obter
+    return lambda t: normalizar(obter(t))
+
+
+def _codigos_frame(frame: TicketFrame, dimensao: str) -> Tuple[List[Any], "np.ndarray"]:
+    """
+    Chaves normalizadas de cada categoria e o código de cada linha
+    
+    Args:
+        frame: TicketFrame
+        dimensao: Nome da dimensão (ver DIMENSOES)
+    
+    Returns:
+        Tupla (chaves por código, códigos); a última chave é a dos valores ausentes
+    """
+    import numpy as np
+    
+    campo, normalizar = DIMENSOES[dimensao]
+    serie = frame.dados[campo]
+    categorias = list(serie.cat.categories) + [None]
+    if normalizar is not None:
+        categorias = [normalizar(c) for c in categorias]
+    
+    # Código -1 (valor ausente) vai para a última posição
+    codigos = serie.cat.codes.to_numpy().astype(np.intp)
+    codigos[codigos < 0] = len(categorias) - 1
+    return categorias, codigos
+
+
+def _agrupar_frame(frame: TicketFrame, dimensao: str) -> Dict[str, Dict[str, int]]:
+    """Agrupa uma dimensão de um TicketFrame usando os códigos das categorias"""
+    import numpy as np
+    
+    categorias, codigos = _codigos_frame(frame, dimensao)
+    totais = np.bincount(codigos, minlength=len(categorias))
+    abertos = np.bincount(codigos, weights=frame.abertos, minlength=len(categorias))
+    
+    resultado = {}
+    for chave, total, abertos_chave in zip(categorias, totais.tolist(), abertos.astype(np.int64).tolist()):
+        if not total:
+            continue
+        contagem = resultado.setdefault(chave, {'total': 0, 'abertos': 0, 'fechados': 0})
+        contagem['total'] += total
+        contagem['abertos'] += abertos_chave
+        contagem['fechados'] += total - abertos_chave
+    return resultado
+
+
+def _agrupar(tickets: Iterable[Ticket], dimensoes: List[str]) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """Contagens de AnalysisService.agrupar, sem medir a etapa (usada a cada lote)"""
+    if isinstance(tickets, TicketFrame):
+        return {d: _agrupar_frame(tickets, d) for d in dimensoes}
+    
+    extratores = [(_extrator(d), {}) for d in dimensoes]
+    
+    for ticket in tickets:
+        aberto = ticket.esta_aberto
+        for extrair, contagens in extratores:
+            chave = extrair(ticket)
+            contagem = contagens.get(chave)
+            if contagem is None:
+                contagem = contagens[chave] = {'total': 0, 'abertos': 0, 'fechados': 0}
+            contagem['total'] += 1
+            if aberto:
+                contagem['abertos'] += 1
+            else:
+                contagem['fechados'] += 1
+    
+    return {d: contagens for d, (_, contagens) in zip(dimensoes, extratores)}
+
+
+def _como_agregado(tickets: Union[ColecaoTickets, "TicketAggregate"], dimensoes: Iterable[str]) -> "TicketAggregate":
+    """Usa o agregado recebido ou agrega os tickets nas dimensões pedidas"""
+    if isinstance(tickets, TicketAggregate):
+        return tickets
+    return TicketAggregate.from_tickets(tickets, dimensoes)
+
+
 class AnalysisService:
     """Serviço responsável por análises e cálculos de métricas"""
     
     @staticmethod
-    def calcular_resumo_executivo(tickets: List[Ticket]) -> Dict[str, Any]:
+    def calcular_resumo_executivo(tickets: ColecaoTickets) -> Dict[str, Any]:
         """
         Calcula resumo executivo
         
         Args:
-            tickets: Lista de Tickets
+            tickets: Lista de Tickets ou TicketFrame
             
         Returns:
             Dicionário com métricas do resumo
         """
-        abertos = sum(1 for t in tickets if t.esta_aberto)
-        fechados = sum(1 for t in tickets if not t.esta_aberto)
+        if isinstance(tickets, TicketFrame):
+            abertos = int(tickets.abertos.sum())
+        else:
+            abertos = sum(1 for t in tickets if t.esta_aberto)
+        fechados = len(tickets) - abertos
         
         return {
             'total_abertos': abertos,
@@ -34,360 +150,548 @@ class AnalysisService:
         }
     
     @staticmethod
-    def analisar_por_tipologia(tickets: List[Ticket]) -> Dict[str, Dict[str, int]]:
+    def agrupar(
+        tickets: Iterable[Ticket],
+        dimensoes: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Dict[str, int]]]:
         """
-        Análise detalhada por tipologia
+        Conta total/abertos/fechados de várias dimensões numa única passagem
         
         Args:
-            tickets: Lista de Tickets
+            tickets: Tickets a agrupar (TicketFrame ou qualquer iterável, percorrido uma vez)
+            dimensoes: Nomes das dimensões (padrão: todas as de DIMENSOES)
             
         Returns:
-            Dicionário com análises por tipologia
+            Dicionário {dimensao: {chave: {'total', 'abertos', 'fechados'}}}
         """
-        resultado = {}
-        tipologias = set(t.tipologia for t in tickets)
-        
-        for tipologia in tipologias:
-            tickets_tipo = [t for t in tickets if t.tipologia == tipologia]
-            resultado[tipologia] = {
-                'total': len(tickets_tipo),
-                'abertos': sum(1 for t in tickets_tipo if t.esta_aberto),
-                'fechados': sum(1 for t in tickets_tipo if not t.esta_aberto)
-            }
+        dimensoes = list(dimensoes) if dimensoes is not None else list(DIMENSOES)
         
-        return resultado
+        with etapa('agregacao', dimensoes=len(dimensoes)) as medida:
+            agrupamento = _agrupar(tickets, dimensoes)
+            if medida and dimensoes:
+                medida['linhas'] = sum(c['total'] for c in agrupamento[dimensoes[0]].values())
+        return agrupamento
     
     @staticmethod
-    def analisar_por_componente(tickets: List[Ticket]) -> Dict[str, Dict[str, int]]:
-        """Análise detalhada por componente"""
-        resultado = {}
-        componentes = set(t.componente for t in tickets)
-        
-        for componente in componentes:
-            tickets_componente = [t for t in tickets if t.componente == componente]
-            resultado[componente] = {
-                'total': len(tickets_componente),
-                'abertos': sum(1 for t in tickets_componente if t.esta_aberto),
-                'fechados': sum(1 for t in tickets_componente if not t.esta_aberto)
-            }
+    def somar_agrupamentos(*agrupamentos: Dict[str, Dict[str, Dict[str, int]]]) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """
+        Soma resultados de agrupar (contagens por dimensão são aditivas)
         
-        return resultado
-    
-    @staticmethod
-    def analisar_por_origem(tickets: List[Ticket]) -> Dict[str, Dict[str, int]]:
-        """Análise detalhada por origem"""
+        Args:
+            *agrupamentos: Resultados de AnalysisService.agrupar
+            
+        Returns:
+            Novo agrupamento com as contagens somadas
+        """
         resultado = {}
-        origens = set(t.origem for t in tickets)
-        
-        for origem in origens:
-            tickets_origem = [t for t in tickets if t.origem == origem]
-            resultado[origem] = {
-                'total': len(tickets_origem),
-                'abertos': sum(1 for t in tickets_origem if t.esta_aberto),
-                'fechados': sum(1 for t in tickets_origem if not t.esta_aberto)
-            }
-        
+        for agrupamento in agrupamentos:
+            for dimensao, contagens in agrupamento.items():
+                destino = resultado.setdefault(dimensao, {})
+                for chave, contagem in contagens.items():
+                    soma = destino.setdefault(chave, {'total': 0, 'abertos': 0, 'fechados': 0})
+                    for campo in ('total', 'abertos', 'fechados'):
+                        soma[campo] += contagem[campo]
         return resultado
     
     @staticmethod
-    def analisar_por_prioridade(tickets: List[Ticket]) -> Dict[str, Dict[str, int]]:
-        """Análise detalhada por prioridade"""
-        resultado = {}
-        prioridades = set(t.prioridade or "Não especificada" for t in tickets)
-        
-        for prioridade in prioridades:
-            tickets_prioridade = [t for t in tickets if (t.prioridade or "Não especificada") == prioridade]
-            resultado[prioridade] = {
-                'total': len(tickets_prioridade),
-                'abertos': sum(1 for t in tickets_prioridade if t.esta_aberto),
-                'fechados': sum(1 for t in tickets_prioridade if not t.esta_aberto)
-            }
+    def agrupar_lotes(
+        lotes: Iterable[ColecaoTickets],
+        dimensoes: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """
+        Agrupa tickets lidos em lotes, consumindo um lote de cada vez
         
+        Args:
+            lotes: Lotes de tickets (ex.: iterar_jira_csv)
+            dimensoes: Nomes das dimensões (padrão: todas as de DIMENSOES)
+            
+        Returns:
+            Mesmo formato de AnalysisService.agrupar
+        """
+        dimensoes = list(dimensoes) if dimensoes is not None else list(DIMENSOES)
+        resultado = {d: {} for d in dimensoes}
+        # A etapa inclui a leitura dos lotes; 'agrupar_ms' é só o tempo da agregação
+        with etapa('agregacao_lotes', dimensoes=len(dimensoes)) as medida:
+            for lote in lotes:
+                with medida.cronometrar('agrupar_ms'):
+                    resultado = AnalysisService.somar_agrupamentos(resultado, _agrupar(lote, dimensoes))
+                medida.somar('linhas', len(lote))
         return resultado
     
     @staticmethod
-    def analisar_por_responsavel(tickets: List[Ticket]) -> Dict[str, Dict[str, int]]:
-        """Análise detalhada por responsável"""
-        resultado = {}
-        responsaveis = set(t.responsavel or "Não atribuído" for t in tickets)
-        
-        for responsavel in responsaveis:
-            tickets_resp = [t for t in tickets if (t.responsavel or "Não atribuído") == responsavel]
-            resultado[responsavel] = {
-                'total': len(tickets_resp),
-                'abertos': sum(1 for t in tickets_resp if t.esta_aberto),
-                'fechados': sum(1 for t in tickets_resp if not t.esta_aberto)
-            }
+    def agrupar_por_mes(
+        tickets: ColecaoTickets,
+        dimensoes: Optional[Iterable[str]] = None
+    ) -> Dict[Optional[Tuple[int, int]], Dict[str, Dict[str, Dict[str, int]]]]:
+        """
+        Agrupa os tickets separadamente por mês de abertura (contagens parciais)
         
-        return resultado
+        Args:
+            tickets: Lista de Tickets ou TicketFrame
+            dimensoes: Nomes das dimensões (padrão: todas as de DIMENSOES)
+            
+        Returns:
+            Dicionário {(ano, mes): agrupamento}; tickets sem data ficam na chave None
+        """
+        dimensoes = list(dimensoes) if dimensoes is not None else list(DIMENSOES)
+        
+        if isinstance(tickets, TicketFrame):
+            import numpy as np
+            import pandas as pd
+            
+            datas = tickets.dados['data_abertura']
+            meses = (datas.dt.year * 12 + datas.dt.month - 1).to_numpy()
+            resultado = {}
+            for indice in pd.unique(meses[~np.isnan(meses)]):
+                chave = (int(indice) // 12, int(indice) % 12 + 1)
+                resultado[chave] = AnalysisService.agrupar(tickets.filtrar(meses == indice), dimensoes)
+            sem_data = np.isnan(meses)
+            if sem_data.any():
+                resultado[None] = AnalysisService.agrupar(tickets.filtrar(sem_data), dimensoes)
+            return resultado
+        
+        por_mes = {}
+        for ticket in tickets:
+            data = ticket.data_abertura
+            por_mes.setdefault((data.year, data.month) if data else None, []).append(ticket)
+        return {chave: AnalysisService.agrupar(lista, dimensoes) for chave, lista in por_mes.items()}
     
     @staticmethod
-    def analisar_por_servidor(tickets: List[Ticket]) -> Dict[str, Dict[str, int]]:
-        """Análise detalhada por servidor/cluster"""
-        resultado = {}
-        servidores = set(t.servidor or "Não especificado" for t in tickets)
-        
-        for servidor in servidores:
-            tickets_servidor = [t for t in tickets if (t.servidor or "Não especificado") == servidor]
-            resultado[servidor] = {
-                'total': len(tickets_servidor),
-                'abertos': sum(1 for t in tickets_servidor if t.esta_aberto),
-                'fechados': sum(1 for t in tickets_servidor if not t.esta_aberto)
-            }
+    def resumo_do_agrupamento(agrupamento: Dict[str, Dict[str, Dict[str, int]]]) -> Dict[str, Any]:
+        """
+        Calcula o resumo executivo a partir de um agrupamento já calculado
         
-        return resultado
+        Args:
+            agrupamento: Resultado de agrupar/agrupar_lotes (qualquer dimensão preenchida serve)
+            
+        Returns:
+            Mesmo formato de calcular_resumo_executivo
+        """
+        contagens = next((c for c in agrupamento.values() if c), {}).values()
+        abertos = sum(c['abertos'] for c in contagens)
+        total = sum(c['total'] for c in contagens)
+        
+        return {
+            'total_abertos': abertos,
+            'total_fechados': total - abertos,
+            'total_geral': total,
+            'backlog_final': abertos
+        }
     
     @staticmethod
-    def top_10_servidores_abertos(tickets: List[Ticket]) -> List[tuple]:
+    def analisar_por_tipologia(tickets: ColecaoTickets) -> Dict[str, Dict[str, int]]:
         """
-        Retorna top 10 servidores com mais tickets ABERTOS
+        Análise detalhada por tipologia
         
         Args:
-            tickets: Lista de Tickets
+            tickets: Lista de Tickets ou TicketFrame
             
         Returns:
-            Lista de tuplas (servidor, count) ordenada decrescente
+            Dicionário com análises por tipologia
         """
-        abertos = [t for t in tickets if t.esta_aberto]
-        servidor_count = {}
+        return AnalysisService.agrupar(tickets, ['tipologia'])['tipologia']
+    
+    @staticmethod
+    def analisar_por_componente(tickets: ColecaoTickets) -> Dict[str, Dict[str, int]]:
+        """Análise detalhada por componente"""
+        return AnalysisService.agrupar(tickets, ['componente'])['componente']
+    
+    @staticmethod
+    def analisar_por_origem(tickets: ColecaoTickets) -> Dict[str, Dict[str, int]]:
+        """
+        Análise detalhada por origem (Database, Middleware, Infra)
         
-        for ticket in abertos:
-            serv = ticket.servidor or "Não especificado"
-            servidor_count[serv] = servidor_count.get(serv, 0) + 1
+        Args:
+            tickets: Lista de Tickets ou TicketFrame
         
-        # Ordenar e retornar top 10
-        top_10 = sorted(servidor_count.items(), key=lambda x: x[1], reverse=True)[:10]
-        return top_10
+        Returns:
+            Dicionário com análises por origem
+        """
+        return AnalysisService.agrupar(tickets, ['origem'])['origem']
     
     @staticmethod
-    def top_10_servidores_por_total(tickets: List[Ticket]) -> List[tuple]:
+    def analisar_por_prioridade(tickets: ColecaoTickets) -> Dict[str, Dict[str, int]]:
+        """Análise detalhada por prioridade"""
+        return AnalysisService.agrupar(tickets, ['prioridade'])['prioridade']
+    
+    @staticmethod
+    def analisar_por_responsavel(tickets: ColecaoTickets) -> Dict[str, Dict[str, int]]:
+        """Análise detalhada por responsável"""
+        return AnalysisService.agrupar(tickets, ['responsavel'])['responsavel']
+    
+    @staticmethod
+    def analisar_por_servidor(tickets: ColecaoTickets) -> Dict[str, Dict[str, int]]:
+        """Análise detalhada por servidor/cluster"""
+        return AnalysisService.agrupar(tickets, ['servidor'])['servidor']
+    
+    @staticmethod
+    def top_k(
+        tickets: Iterable[Ticket],
+        dimensao: str,
+        k: int = 10,
+        contagem: str = 'total',
+        capacidade: Optional[int] = None
+    ) -> List[tuple]:
         """
-        Retorna top 10 servidores com MAIS TICKETS NO TOTAL
-        (Útil para ver quais servidores mais geraram tickets)
+        Top-K de uma dimensão numa única passagem pelos tickets
+        
+        Exato por padrão (contagem por chave + seleção por heap). Com
+        `capacidade`, usa Space-Saving: memória limitada a `capacidade`
+        chaves e contagens aproximadas, para dimensões de cardinalidade
+        sem limite.
         
         Args:
-            tickets: Lista de Tickets
+            tickets: Tickets (TicketFrame, lista ou lotes já achatados), percorridos uma vez
+            dimensao: Nome da dimensão (ver DIMENSOES)
+            k: Quantidade de chaves
+            contagem: 'total' ou 'abertos'
+            capacidade: Máximo de chaves monitoradas (None = exato)
             
         Returns:
-            Lista de tuplas (servidor, count) ordenada decrescente
+            Lista de tuplas (chave, count) ordenada decrescente (empates pela chave)
         """
-        servidor_count = {}
-        
+        if capacidade is None:
+            return TicketAggregate.from_tickets(tickets, [dimensao]).top(dimensao, contagem, k)
+        
+        contador = SpaceSaving(capacidade)
+        if isinstance(tickets, TicketFrame):
+            # Códigos das categorias direto no contador, na ordem das linhas, sem montar Tickets
+            chaves, codigos = _codigos_frame(tickets, dimensao)
+            if contagem != 'total':
+                codigos = codigos[tickets.abertos]
+            for codigo in codigos.tolist():
+                contador.adicionar(chaves[codigo])
+            return contador.top(k)
+        
+        extrair = _extrator(dimensao)
         for ticket in tickets:
-            serv = ticket.servidor or "Não especificado"
-            servidor_count[serv] = servidor_count.get(serv, 0) + 1
-        
-        # Ordenar e retornar top 10
-        top_10 = sorted(servidor_count.items(), key=lambda x: x[1], reverse=True)[:10]
-        return top_10
+            if contagem == 'total' or ticket.esta_aberto:
+                contador.adicionar(extrair(ticket))
+        return contador.top(k)
     
     @staticmethod
-    def calcular_resumo_acumulado(tickets_periodo1: List[Ticket], tickets_periodo2: List[Ticket]) -> Dict[str, Any]:
+    def top_10_servidores_abertos(tickets: Union[ColecaoTickets, "TicketAggregate"]) -> List[tuple]:
         """
-        Calcula resumo acumulado entre dois períodos
+        Retorna top 10 servidores com mais tickets ABERTOS
         
         Args:
-            tickets_periodo1: Tickets do período anterior
-            tickets_periodo2: Tickets do período atual
+            tickets: Lista de Tickets, TicketFrame ou TicketAggregate
             
         Returns:
-            Dicionário com métricas acumuladas
+            Lista de tuplas (servidor, count) ordenada decrescente
         """
-        # Combinar tickets de ambos períodos
-        todos_tickets = tickets_periodo1 + tickets_periodo2
-        
-        abertos = sum(1 for t in todos_tickets if t.esta_aberto)
-        fechados = sum(1 for t in todos_tickets if not t.esta_aberto)
+        return _como_agregado(tickets, ['servidor']).top('servidor', 'abertos')
+    
+    @staticmethod
+    def top_10_servidores_por_total(tickets: Union[ColecaoTickets, "TicketAggregate"]) -> List[tuple]:
+        """
+        Retorna top 10 servidores com MAIS TICKETS NO TOTAL
+        (Útil para ver quais servidores mais geraram tickets)
         
-        return {
-            'total_abertos': abertos,
-            'total_fechados': fechados,
-            'total_geral': len(todos_tickets)
-        }    
+        Args:
+            tickets: Lista de Tickets, TicketFrame ou TicketAggregate
+            
+        Returns:
+            Lista de tuplas (servidor, count) ordenada decrescente
+        """
+        return _como_agregado(tickets, ['servidor']).top('servidor')
+    
     @staticmethod
-    def analisar_por_origem(tickets: List[Ticket]) -> Dict[str, Dict[str, int]]:
+    def calcular_resumo_acumulado(
+        tickets_periodo1: Union[ColecaoTickets, "TicketAggregate"],
+        tickets_periodo2: Union[ColecaoTickets, "TicketAggregate"]
+    ) -> Dict[str, Any]:
         """
-        Análise detalhada por origem (Database, Middleware, Infra)
+        Calcula resumo acumulado entre dois períodos
         
         Args:
-            tickets: Lista de Tickets
+            tickets_periodo1: Tickets (ou agregado) do período anterior
+            tickets_periodo2: Tickets (ou agregado) do período atual
             
         Returns:
-            Dicionário com análises por origem
+            Dicionário com métricas acumuladas
         """
-        resultado = {}
+        # Agregados dos dois períodos somados, sem juntar as listas
+        resumo = (_como_agregado(tickets_periodo1, ['tipologia']) + _como_agregado(tickets_periodo2, ['tipologia'])).resumo()
         
-        # Mapear componentes para origens
-        origem_map = {
-            'Database': 'Database',
-            'Middleware': 'Middleware',
-            'Infraestruturas': 'Infra'
+        return {
+            'total_abertos': resumo['total_abertos'],
+            'total_fechados': resumo['total_fechados'],
+            'total_geral': resumo['total_geral']
         }
-        
-        origens = set()
-        for t in tickets:
-            componente = t.componente or "Não especificado"
-            origem = origem_map.get(componente, componente)
-            origens.add(origem)
-        
-        for origem in origens:
-            tickets_origem = [t for t in tickets 
-                            if origem_map.get(t.componente or "Não especificado", t.componente or "Não especificado") == origem]
-            resultado[origem] = {
-                'total': len(tickets_origem),
-                'abertos': sum(1 for t in tickets_origem if t.esta_aberto),
-                'fechados': sum(1 for t in tickets_origem if not t.esta_aberto)
-            }
-        
-        return resultado
     
     @staticmethod
-    def tabela_tipologia(tickets_periodo1: List[Ticket], tickets_periodo2: List[Ticket]) -> List[Dict[str, Any]]:
+    def _linhas_comparativas(
+        agregado1: "TicketAggregate",
+        agregado2: "TicketAggregate",
+        dimensao: str,
+        chaves: Iterable[Any]
+    ) -> List[Dict[str, Any]]:
+        """Contagens das chaves de uma dimensão nos dois períodos, no formato das tabelas"""
+        vazio = {'total': 0, 'abertos': 0, 'fechados': 0}
+        contagens1 = agregado1.dimensao(dimensao)
+        contagens2 = agregado2.dimensao(dimensao)
+        
+        linhas = []
+        for chave in chaves:
+            c1 = contagens1.get(chave, vazio)
+            c2 = contagens2.get(chave, vazio)
+            linhas.append({
+                'chave': chave,
+                'abertos_anterior': c1['abertos'],
+                'abertos_atual': c2['abertos'],
+                'fechados_anterior': c1['fechados'],
+                'fechados_atual': c2['fechados'],
+                'total_anterior': c1['total'],
+                'total_atual': c2['total']
+            })
+        return linhas
+    
+    @staticmethod
+    def tabela_tipologia(
+        tickets_periodo1: Union[ColecaoTickets, "TicketAggregate"],
+        tickets_periodo2: Union[ColecaoTickets, "TicketAggregate"]
+    ) -> List[Dict[str, Any]]:
         """
         Gera tabela de tipologia com comparativo mês anterior vs atual
         
         Args:
-            tickets_periodo1: Tickets do período anterior
-            tickets_periodo2: Tickets do período atual
+            tickets_periodo1: Tickets (ou agregado) do período anterior
+            tickets_periodo2: Tickets (ou agregado) do período atual
             
         Returns:
             Lista de dicts com dados de tipologia
         """
-        resultado = []
-        tipologias_set = set()
-        
-        # Coletar todas as tipologias
-        for t in tickets_periodo1 + tickets_periodo2:
-            if t.tipologia:
-                tipologias_set.add(t.tipologia)
-        
-        for tipologia in sorted(tipologias_set):
-            # Período 1 (anterior)
-            tickets_t1 = [t for t in tickets_periodo1 if t.tipologia == tipologia]
-            abertos_p1 = sum(1 for t in tickets_t1 if t.esta_aberto)
-            fechados_p1 = sum(1 for t in tickets_t1 if not t.esta_aberto)
-            
-            # Período 2 (atual)
-            tickets_t2 = [t for t in tickets_periodo2 if t.tipologia == tipologia]
-            abertos_p2 = sum(1 for t in tickets_t2 if t.esta_aberto)
-            fechados_p2 = sum(1 for t in tickets_t2 if not t.esta_aberto)
-            
-            resultado.append({
-                'tipologia': tipologia,
-                'abertos_anterior': abertos_p1,
-                'abertos_atual': abertos_p2,
-                'fechados_anterior': fechados_p1,
-                'fechados_atual': fechados_p2,
-                'total_anterior': len(tickets_t1),
-                'total_atual': len(tickets_t2)
-            })
+        agregado1 = _como_agregado(tickets_periodo1, ['tipologia'])
+        agregado2 = _como_agregado(tickets_periodo2, ['tipologia'])
+        tipologias = {t for t in (*agregado1.dimensao('tipologia'), *agregado2.dimensao('tipologia')) if t}
         
+        resultado = []
+        for linha in AnalysisService._linhas_comparativas(agregado1, agregado2, 'tipologia', sorted(tipologias)):
+            resultado.append({'tipologia': linha.pop('chave'), **linha})
         return resultado
     
     @staticmethod
-    def tabela_top10_modulos(tickets_periodo1: List[Ticket], tickets_periodo2: List[Ticket]) -> List[Dict[str, Any]]:
+    def tabela_top10_modulos(
+        tickets_periodo1: Union[ColecaoTickets, "TicketAggregate"],
+        tickets_periodo2: Union[ColecaoTickets, "TicketAggregate"]
+    ) -> List[Dict[str, Any]]:
         """
         Gera tabela dos 10 módulos (servidores) com mais tickets
         
+        Os módulos são ordenados pelo total de tickets dos dois períodos.
+        
         Args:
-            tickets_periodo1: Tickets do período anterior
-            tickets_periodo2: Tickets do período atual
+            tickets_periodo1: Tickets (ou agregado) do período anterior
+            tickets_periodo2: Tickets (ou agregado) do período atual
             
         Returns:
             Lista de dicts com top 10 módulos
         """
-        resultado = []
-        
-        # Top 10 do período anterior
-        top10_p1 = AnalysisService.top_10_servidores_por_total(tickets_periodo1)
-        top10_p1_dict = dict(top10_p1)
-        
-        # Top 10 do período atual
-        top10_p2 = AnalysisService.top_10_servidores_por_total(tickets_periodo2)
-        top10_p2_dict = dict(top10_p2)
+        agregado1 = _como_agregado(tickets_periodo1, ['servidor'])
+        agregado2 = _como_agregado(tickets_periodo2, ['servidor'])
         
-        # Coletar todos os servidores de ambos períodos
-        todos_servidores = set(list(top10_p1_dict.keys()) + list(top10_p2_dict.keys()))
+        # Ranking pelo total dos dois períodos somados
+        top10 = [servidor for servidor, _ in (agregado1 + agregado2).top('servidor')]
         
-        # Análise detalhada por servidor para cada período
-        for servidor in sorted(todos_servidores)[:10]:
-            # Período anterior
-            tickets_srv_p1 = [t for t in tickets_periodo1 if (t.servidor or "Não especificado") == servidor]
-            abertos_p1 = sum(1 for t in tickets_srv_p1 if t.esta_aberto)
-            fechados_p1 = sum(1 for t in tickets_srv_p1 if not t.esta_aberto)
-            
-            # Período atual
-            tickets_srv_p2 = [t for t in tickets_periodo2 if (t.servidor or "Não especificado") == servidor]
-            abertos_p2 = sum(1 for t in tickets_srv_p2 if t.esta_aberto)
-            fechados_p2 = sum(1 for t in tickets_srv_p2 if not t.esta_aberto)
-            
+        resultado = []
+        for linha in AnalysisService._linhas_comparativas(agregado1, agregado2, 'servidor', top10):
             resultado.append({
-                'modulo': servidor,
-                'abertos_anterior': abertos_p1,
-                'abertos_atual': abertos_p2,
-                'fechados_anterior': fechados_p1,
-                'fechados_atual': fechados_p2
+                'modulo': linha['chave'],
+                'abertos_anterior': linha['abertos_anterior'],
+                'abertos_atual': linha['abertos_atual'],
+                'fechados_anterior': linha['fechados_anterior'],
+                'fechados_atual': linha['fechados_atual']
             })
-        
         return resultado
     
     @staticmethod
-    def tabela_origem(tickets_periodo1: List[Ticket], tickets_periodo2: List[Ticket]) -> List[Dict[str, Any]]:
+    def tabela_origem(
+        tickets_periodo1: Union[ColecaoTickets, "TicketAggregate"],
+        tickets_periodo2: Union[ColecaoTickets, "TicketAggregate"]
+    ) -> List[Dict[str, Any]]:
         """
         Gera tabela de origem com comparativo mês anterior vs atual
         
         Args:
-            tickets_periodo1: Tickets do período anterior
-            tickets_periodo2: Tickets do período atual
+            tickets_periodo1: Tickets (ou agregado) do período anterior
+            tickets_periodo2: Tickets (ou agregado) do período atual
             
         Returns:
             Lista de dicts com dados de origem
         """
-        resultado = []
-        
-        # Mapear componentes para origens
-        origem_map = {
-            'Database': 'Database',
-            'Middleware': 'Middleware',
-            'Infraestruturas': 'Infra'
-        }
+        agregado1 = _como_agregado(tickets_periodo1, ['origem'])
+        agregado2 = _como_agregado(tickets_periodo2, ['origem'])
+        total1, total2 = agregado1.total, agregado2.total
+        origens = set(agregado1.dimensao('origem')) | set(agregado2.dimensao('origem'))
         
-        # Coletar todas as origens
-        origens_set = set()
-        for t in tickets_periodo1 + tickets_periodo2:
-            componente = t.componente or "Não especificado"
-            origem = origem_map.get(componente, componente)
-            origens_set.add(origem)
-        
-        for origem in sorted(origens_set):
-            # Período 1
-            tickets_o1 = [t for t in tickets_periodo1 
-                         if origem_map.get(t.componente or "Não especificado", t.componente or "Não especificado") == origem]
-            abertos_p1 = sum(1 for t in tickets_o1 if t.esta_aberto)
-            fechados_p1 = sum(1 for t in tickets_o1 if not t.esta_aberto)
-            total_p1 = len(tickets_o1)
-            
-            # Período 2
-            tickets_o2 = [t for t in tickets_periodo2 
-                         if origem_map.get(t.componente or "Não especificado", t.componente or "Não especificado") == origem]
-            abertos_p2 = sum(1 for t in tickets_o2 if t.esta_aberto)
-            fechados_p2 = sum(1 for t in tickets_o2 if not t.esta_aberto)
-            total_p2 = len(tickets_o2)
-            
+        resultado = []
+        for linha in AnalysisService._linhas_comparativas(agregado1, agregado2, 'origem', sorted(origens)):
             # Calcular percentuais
-            pct_p1 = (total_p1 / len(tickets_periodo1) * 100) if tickets_periodo1 else 0
-            pct_p2 = (total_p2 / len(tickets_periodo2) * 100) if tickets_periodo2 else 0
+            pct_p1 = (linha['total_anterior'] / total1 * 100) if total1 else 0
+            pct_p2 = (linha['total_atual'] / total2 * 100) if total2 else 0
             
             resultado.append({
-                'origem': origem,
-                'abertos_anterior': abertos_p1,
-                'abertos_atual': abertos_p2,
-                'fechados_anterior': fechados_p1,
-                'fechados_atual': fechados_p2,
-                'total_anterior': total_p1,
-                'total_atual': total_p2,
+                'origem': linha.pop('chave'),
+                **linha,
                 'percentual_anterior': round(pct_p1, 1),
                 'percentual_atual': round(pct_p2, 1)
             })
+        return resultado
+        
+
+class TicketAggregate:
+    """
+    Contagens total/abertos/fechados de todas as dimensões de um período
+    
+    Montado uma única vez a partir dos tickets; agregados se somam com `+`
+    (as contagens são aditivas) e podem ser serializados, então resumos,
+    tops, tabelas comparativas e acumulados saem daqui sem reler os tickets.
+    """
+    
+    def __init__(self, contagens: Optional[Dict[str, Dict[Any, Dict[str, int]]]] = None):
+        """
+        Inicializa o agregado
+        
+        Args:
+            contagens: Resultado de AnalysisService.agrupar ({dimensao: {chave: contagem}})
+        """
+        self.contagens = contagens if contagens is not None else {}
+    
+    @classmethod
+    def from_tickets(cls, tickets: ColecaoTickets, dimensoes: Optional[Iterable[str]] = None) -> "TicketAggregate":
+        """Agrega os tickets numa única passagem (padrão: todas as dimensões)"""
+        return cls(AnalysisService.agrupar(tickets, dimensoes))
+    
+    @classmethod
+    def from_lotes(cls, lotes: Iterable[ColecaoTickets], dimensoes: Optional[Iterable[str]] = None) -> "TicketAggregate":
+        """Agrega tickets lidos em lotes (ex.: iterar_jira_csv), um lote de cada vez"""
+        return cls(AnalysisService.agrupar_lotes(lotes, dimensoes))
+    
+    def __add__(self, outro: "TicketAggregate") -> "TicketAggregate":
+        if not isinstance(outro, TicketAggregate):
+            return NotImplemented
+        return TicketAggregate(AnalysisService.somar_agrupamentos(self.contagens, outro.contagens))
+    
+    def __radd__(self, outro):
+        # Permite sum(agregados)
+        if outro == 0:
+            return self
+        return self.__add__(outro)
+    
+    def __eq__(self, outro) -> bool:
+        return isinstance(outro, TicketAggregate) and self.contagens == outro.contagens
+    
+    def __len__(self) -> int:
+        return self.total
+    
+    @property
+    def total(self) -> int:
+        """Quantidade de tickets agregados"""
+        return self.resumo()['total_geral']
+    
+    def dimensao(self, nome: str) -> Dict[Any, Dict[str, int]]:
+        """Contagens {chave: {'total', 'abertos', 'fechados'}} de uma dimensão"""
+        return self.contagens.get(nome, {})
+    
+    def resumo(self) -> Dict[str, Any]:
+        """Resumo executivo (mesmo formato de AnalysisService.calcular_resumo_executivo)"""
+        return AnalysisService.resumo_do_agrupamento(self.contagens)
+    
+    def top(self, dimensao: str, contagem: str = 'total', n: int = 10) -> List[tuple]:
+        """
+        Retorna as chaves de uma dimensão com maior contagem
+        
+        Args:
+            dimensao: Nome da dimensão (ver DIMENSOES)
+            contagem: 'total', 'abertos' ou 'fechados'
+            n: Quantidade de chaves (None para todas)
+            
+        Returns:
+            Lista de tuplas (chave, count) ordenada decrescente (empates pela chave)
+        """
+        pares = ((chave, c[contagem]) for chave, c in self.dimensao(dimensao).items())
+        if contagem != 'total':
+            pares = (par for par in pares if par[1])
+        return top_k(pares, n)
+    
+    def to_dict(self) -> Dict[str, List[list]]:
+        """Serializa em formato JSON: {dimensao: [[chave, total, abertos, fechados], ...]}"""
+        return {
+            dimensao: [[chave, c['total'], c['abertos'], c['fechados']] for chave, c in contagens.items()]
+            for dimensao, contagens in self.contagens.items()
+        }
+    
+    @classmethod
+    def from_dict(cls, dados: Dict[str, List[list]]) -> "TicketAggregate":
+        """Reconstrói um agregado serializado com to_dict"""
+        return cls({
+            dimensao: {
+                chave: {'total': total, 'abertos': abertos, 'fechados': fechados}
+                for chave, total, abertos, fechados in linhas
+            }
+            for dimensao, linhas in dados.items()
+        })
+
+
+class AcumuladoAnual:
+    """
+    Agregados parciais por mês e acumulado do ano até cada mês
+    
+    Cada mês guarda o seu TicketAggregate, somado quando chegam mais
+    tickets do mesmo mês. O acumulado até o mês N é o acumulado até N-1
+    mais o mês N, e fica guardado: depois de calcular novembro, dezembro
+    custa só a soma das contagens de dezembro.
+    """
+    
+    def __init__(self):
+        self.parciais: Dict[Optional[Tuple[int, int]], TicketAggregate] = {}
+        self._acumulados: Dict[Tuple[int, int], TicketAggregate] = {}
+    
+    def adicionar(self, mes: Optional[Tuple[int, int]], agregado: TicketAggregate):
+        """
+        Soma o agregado às contagens parciais de um mês
+        
+        Args:
+            mes: (ano, mes) ou None para tickets sem data
+            agregado: Agregado dos tickets do mês
+        """
+        self.parciais[mes] = self.parciais[mes] + agregado if mes in self.parciais else agregado
         
-        return resultado
\ No newline at end of file
+        # Acumulados a partir deste mês (no mesmo ano) deixam de valer
+        if mes is not None:
+            ano, numero = mes
+            for chave in [c for c in self._acumulados if c[0] == ano and c[1] >= numero]:
+                del self._acumulados[chave]
+    
+    def adicionar_tickets(self, tickets: ColecaoTickets, dimensoes: Optional[Iterable[str]] = None):
+        """Agrupa os tickets por mês de abertura e soma às contagens parciais"""
+        for mes, agrupamento in AnalysisService.agrupar_por_mes(tickets, dimensoes).items():
+            self.adicionar(mes, TicketAggregate(agrupamento))
+    
+    def ate(self, ano: int, mes: int) -> TicketAggregate:
+        """
+        Retorna o acumulado do ano (janeiro até `mes`, inclusive)
+        
+        Args:
+            ano: Ano
+            mes: Último mês (1-12)
+            
+        Returns:
+            Agregado com as contagens somadas
+        """
+        # Partir do último acumulado já calculado deste ano
+        inicio = mes
+        while inicio > 0 and (ano, inicio) not in self._acumulados:
+            inicio -= 1
+        acumulado = self._acumulados[(ano, inicio)] if inicio else TicketAggregate()
+        
+        for numero in range(inicio + 1, mes + 1):
+            if (ano, numero) in self.parciais:
+                acumulado = acumulado + self.parciais[(ano, numero)]
+            self._acumulados[(ano, numero)] = acumulado
+        return acumulado
+    
+    def total(self) -> TicketAggregate:
+        """Retorna a soma de todos os meses (inclusive tickets sem data)"""
+        return sum(self.parciais.values(), TicketAggregate())
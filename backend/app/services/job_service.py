@@ -0,0 +1,248 @@
+"""
+Jobs de geração de relatórios fora do event loop da API
+
+O POST só enfileira o trabalho e devolve o id do job; o processamento do CSV
+e a renderização do PDF rodam num pool limitado de processos. O cliente
+consulta o status e baixa o PDF quando o job termina.
+
+Os CSVs chegam ao job como arquivos temporários (só o caminho cruza a
+fronteira do processo), removidos quando o job termina, é rejeitado ou
+cancelado.
+
+Os jobs finalizados (com o PDF em memória) ficam retidos por um tempo
+limitado e em número limitado: ao passar do limite, os finalizados há mais
+tempo são descartados primeiro.
+"""
+
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from ..config import JOBS_FILA_MAXIMA, JOBS_PROCESSOS, JOBS_RETENCAO_SEGUNDOS, JOBS_RETIDOS_MAXIMO
+from ..utils import instrumentacao
+
+logger = logging.getLogger(__name__)
+
+
+class FilaCheiaError(RuntimeError):
+    """A fila de jobs atingiu o limite; o cliente deve tentar mais tarde"""
+
+
+def _inicializar_processo(medir_etapas: bool = False):
+    """Configura cada processo do pool de jobs"""
+    from ..utils import graficos
+    
+    # O pool de jobs já paraleliza entre relatórios: os gráficos de cada job são desenhados em série
+    graficos.GRAFICOS_PROCESSOS = 1
+    
+    # Etapas medidas no job voltam no resultado, para os observadores do processo da API
+    instrumentacao.medir_etapas(medir_etapas)
+
+
+@dataclass
+class Job:
+    """Um relatório enfileirado e, depois de concluído, seu resultado"""
+    
+    job_id: str
+    tipo: str
+    future: Future = field(repr=False)
+    criado_em: float = field(default_factory=time.time)
+    concluido_em: Optional[float] = None
+    arquivos: Tuple[Path, ...] = ()
+    
+    @property
+    def status(self) -> str:
+        """'na_fila', 'executando', 'concluido', 'erro' ou 'cancelado' (pool encerrado antes de executar)"""
+        if self.future.cancelled():
+            return 'cancelado'
+        if self.future.done():
+            return 'erro' if self.future.exception() is not None else 'concluido'
+        return 'executando' if self.future.running() else 'na_fila'
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado do job para a resposta da API (sem o PDF)"""
+        dados = {
+            'job_id': self.job_id,
+            'tipo': self.tipo,
+            'status': self.status,
+            'criado_em': self.criado_em,
+            'concluido_em': self.concluido_em,
+        }
+        if dados['status'] == 'concluido':
+            dados['resultado'] = self.future.result()['resultado']
+        elif dados['status'] == 'erro':
+            dados['erro'] = str(self.future.exception())
+        return dados
+
+
+class JobService:
+    """Fila de jobs com pool de processos, limite de concorrência e métricas"""
+    
+    def __init__(
+        self,
+        processos: int = JOBS_PROCESSOS,
+        fila_maxima: int = JOBS_FILA_MAXIMA,
+        retencao: float = JOBS_RETENCAO_SEGUNDOS,
+        retidos_maximo: int = JOBS_RETIDOS_MAXIMO
+    ):
+        """
+        Inicializa o serviço (o pool só é criado no primeiro job)
+        
+        Args:
+            processos: Jobs executados ao mesmo tempo
+            fila_maxima: Jobs aguardando além dos que estão em execução
+            retencao: Segundos que um job concluído fica disponível para consulta/download
+            retidos_maximo: Jobs finalizados mantidos no máximo (os mais antigos saem primeiro)
+        """
+        self.processos = processos
+        self.fila_maxima = fila_maxima
+        self.retencao = retencao
+        self.retidos_maximo = retidos_maximo
+        self.concluidos = 0
+        self.erros = 0
+        self.rejeitados = 0
+        self.cancelados = 0
+        self._jobs: Dict[str, Job] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def _obter_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: o servidor tem threads, e fork com threads não é seguro
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processos,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_inicializar_processo,
+                initargs=(instrumentacao.medindo(),)
+            )
+        return self._pool
+    
+    def _pendentes(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.future.done())
+    
+    def _remover_expirados(self):
+        """Descarta os jobs finalizados expirados e, acima de retidos_maximo, os mais antigos"""
+        limite = time.time() - self.retencao
+        finalizados = sorted((j for j in self._jobs.values() if j.concluido_em), key=lambda j: j.concluido_em)
+        excedente = len(finalizados) - self.retidos_maximo
+        for indice, job in enumerate(finalizados):
+            if indice < excedente or job.concluido_em < limite:
+                del self._jobs[job.job_id]
+    
+    @staticmethod
+    def _remover_arquivos(arquivos: Sequence[Path]):
+        for arquivo in arquivos:
+            Path(arquivo).unlink(missing_ok=True)
+    
+    def _ao_concluir(self, job: Job, future: Future):
+        job.concluido_em = time.time()
+        self._remover_arquivos(job.arquivos)
+        with self._lock:
+            if future.cancelled():
+                self.cancelados += 1
+                logger.info(f"Job {job.job_id} ({job.tipo}) cancelado")
+                return
+            if future.exception() is not None:
+                self.erros += 1
+                logger.error(f"Job {job.job_id} ({job.tipo}) falhou: {future.exception()}")
+            else:
+                self.concluidos += 1
+                logger.info(f"Job {job.job_id} ({job.tipo}) concluído em {job.concluido_em - job.criado_em:.1f}s")
+            # Também ao concluir, para que um servidor ocioso não acumule PDFs além do limite
+            self._remover_expirados()
+        
+        if future.exception() is None:
+            instrumentacao.emitir(future.result().get('etapas', []))
+    
+    def submeter(
+        self,
+        tipo: str,
+        funcao: Callable[..., Dict[str, Any]],
+        *args,
+        arquivos: Sequence[Path] = ()
+    ) -> Job:
+        """
+        Enfileira um job
+        
+        Args:
+            tipo: Descrição do job (ex.: 'relatorio', 'comparativo')
+            funcao: Função importável que retorna {'resultado', 'pdf', 'pdf_nome'}
+            *args: Argumentos da função (serializáveis)
+            arquivos: Arquivos temporários do job, removidos quando ele termina
+                (ou já aqui, se for rejeitado)
+        
+        Returns:
+            Job criado
+        
+        Raises:
+            FilaCheiaError: Se já houver processos + fila_maxima jobs pendentes
+        """
+        with self._lock:
+            self._remover_expirados()
+            if self._pendentes() >= self.processos + self.fila_maxima:
+                self.rejeitados += 1
+                self._remover_arquivos(arquivos)
+                raise FilaCheiaError("Fila de relatórios cheia, tente novamente em instantes")
+            
+            try:
+                try:
+                    future = self._obter_pool().submit(funcao, *args)
+                except BrokenProcessPool:
+                    # Um processo morreu (ex.: falta de memória): recria o pool
+                    logger.warning("Pool de jobs quebrado; recriando")
+                    self._pool = None
+                    future = self._obter_pool().submit(funcao, *args)
+            except Exception:
+                self._remover_arquivos(arquivos)
+                raise
+            
+            job = Job(uuid.uuid4().hex, tipo, future, arquivos=tuple(arquivos))
+            self._jobs[job.job_id] = job
+        
+        future.add_done_callback(lambda f: self._ao_concluir(job, f))
+        return job
+    
+    def obter(self, job_id: str) -> Optional[Job]:
+        """Retorna o job (None se não existir ou já tiver expirado)"""
+        with self._lock:
+            self._remover_expirados()
+            return self._jobs.get(job_id)
+    
+    def metricas(self) -> Dict[str, Any]:
+        """Capacidade, profundidade da fila e contadores dos jobs"""
+        with self._lock:
+            self._remover_expirados()
+            pendentes = self._pendentes()
+            # O executor marca como "running" um job a mais do que os processos (pré-carga da fila)
+            executando = min(pendentes, self.processos)
+            return {
+                'processos': self.processos,
+                'fila_maxima': self.fila_maxima,
+                'executando': executando,
+                'na_fila': pendentes - executando,
+                'concluidos': self.concluidos,
+                'erros': self.erros,
+                'rejeitados': self.rejeitados,
+                'cancelados': self.cancelados,
+                'retidos': len(self._jobs),
+            }
+    
+    def encerrar(self):
+        """Encerra o pool de processos, cancelando os jobs que ainda não começaram"""
+        with self._lock:
+            pendentes = [job.future for job in self._jobs.values() if not job.future.done()]
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+        
+        # Sem a referência ao pool, o executor pode não chegar a cancelar a fila:
+        # cancela aqui (fora do lock, pois os callbacks rodam nesta thread)
+        for future in pendentes:
+            future.cancel()
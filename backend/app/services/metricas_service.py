@@ -0,0 +1,108 @@
+"""
+Métricas do pipeline de relatórios expostas em /metrics
+
+As métricas das etapas (leitura, gráficos, relatório) vêm das etapas da
+instrumentação: `registrar_etapa` é registrado como observador no processo
+da API e também recebe as etapas devolvidas pelos jobs.
+"""
+
+import threading
+from typing import Any, Dict
+
+from ..utils.metricas import Registro
+
+registro = Registro()
+
+requisicao_duracao = registro.histograma(
+    'agt_http_requisicao_duracao_segundos', "Latência das requisições HTTP por endpoint",
+    ('metodo', 'endpoint', 'status')
+)
+requisicoes_em_andamento = registro.medidor(
+    'agt_http_requisicoes_em_andamento', "Requisições HTTP sendo atendidas"
+)
+upload_tamanho = registro.histograma(
+    'agt_upload_tamanho_bytes', "Tamanho dos CSVs recebidos", (),
+    tuple(2 ** n * 1024 for n in range(0, 19, 2))  # 1 KB a 256 MB
+)
+parse_linhas_por_segundo = registro.histograma(
+    'agt_parse_linhas_por_segundo', "Vazão da leitura dos CSVs do Jira", (),
+    (1e3, 5e3, 1e4, 2.5e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 5e6)
+)
+parse_linhas = registro.contador('agt_parse_linhas_total', "Tickets lidos dos CSVs")
+parse_erros = registro.contador(
+    'agt_parse_erros_total', "Valores inválidos nos CSVs por coluna ('(linha)': linha descartada)", ('coluna',)
+)
+relatorio_duracao = registro.histograma(
+    'agt_relatorio_duracao_segundos', "Geração completa do relatório (leitura, análise e PDF)", ('tipo',)
+)
+graficos_duracao = registro.histograma(
+    'agt_graficos_duracao_segundos', "Renderização dos gráficos de um relatório"
+)
+pdf_montagem_duracao = registro.histograma(
+    'agt_pdf_montagem_duracao_segundos', "Montagem do PDF (ReportLab), sem os gráficos"
+)
+jobs_executando = registro.medidor('agt_jobs_executando', "Jobs de relatório em execução")
+jobs_na_fila = registro.medidor('agt_jobs_na_fila', "Jobs de relatório aguardando um processo")
+jobs_processos = registro.medidor('agt_jobs_processos', "Processos do pool de jobs")
+jobs_finalizados = registro.contador(
+    'agt_jobs_finalizados_total', "Jobs concluídos, com erro, rejeitados (fila cheia) ou cancelados", ('resultado',)
+)
+build_info = registro.medidor(
+    'agt_build_info', "Versão em execução (valor sempre 1)", ('versao', 'commit', 'origem')
+)
+
+# Últimos totais lidos de JobService.metricas(), para incrementar o contador pela diferença
+_jobs_finalizados_vistos: Dict[str, int] = {}
+_jobs_lock = threading.Lock()
+
+
+def registrar_etapa(etapa: Dict[str, Any]):
+    """
+    Atualiza as métricas a partir de uma etapa concluída (Etapa.to_dict())
+    
+    Args:
+        etapa: Dicionário com 'etapa' (nome aninhado), 'duracao_ms' e os campos
+    """
+    nome = etapa['etapa'].rsplit('.', 1)[-1]
+    segundos = etapa['duracao_ms'] / 1000
+    
+    if nome == 'parse':
+        linhas = etapa.get('linhas', 0)
+        parse_linhas.incrementar(linhas)
+        if linhas and segundos > 0:
+            parse_linhas_por_segundo.observar(linhas / segundos)
+        for coluna, quantidade in (etapa.get('datas_invalidas') or {}).items():
+            if quantidade:
+                parse_erros.incrementar(quantidade, coluna=coluna)
+        if etapa.get('linhas_descartadas'):
+            parse_erros.incrementar(etapa['linhas_descartadas'], coluna='(linha)')
+    elif nome in ('relatorio', 'relatorio_comparativo'):
+        relatorio_duracao.observar(segundos, tipo=nome)
+    elif nome == 'graficos':
+        graficos_duracao.observar(segundos)
+    elif nome == 'montagem':
+        pdf_montagem_duracao.observar(segundos)
+
+
+def atualizar_jobs(metricas_jobs: Dict[str, Any]):
+    """
+    Copia o estado da fila de jobs (JobService.metricas()) para as métricas
+    
+    Os totais de jobs finalizados são acumulados desde o início do serviço;
+    o contador recebe só o que aumentou desde a leitura anterior (ou o total,
+    se o serviço de jobs foi recriado e os totais recomeçaram do zero).
+    """
+    jobs_executando.definir(metricas_jobs['executando'])
+    jobs_na_fila.definir(metricas_jobs['na_fila'])
+    jobs_processos.definir(metricas_jobs['processos'])
+    with _jobs_lock:
+        for resultado in ('concluidos', 'erros', 'rejeitados', 'cancelados'):
+            total = metricas_jobs[resultado]
+            anterior = _jobs_finalizados_vistos.get(resultado, 0)
+            jobs_finalizados.incrementar(total - anterior if total >= anterior else total, resultado=resultado)
+            _jobs_finalizados_vistos[resultado] = total
+
+
+def registrar_versao(versao: Dict[str, str]):
+    """Publica a versão (app.utils.versao.obter_versao()) em agt_build_info"""
+    build_info.definir(1, versao=versao['versao'], commit=versao['commit'], origem=versao['origem'])
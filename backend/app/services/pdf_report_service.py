@@ -3,149 +3,43 @@ Serviço de geração de relatórios em PDF
 """
 
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 from pathlib import Path
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
 from io import BytesIO
-import tempfile
-import os
+
+from ..models.ticket_frame import ColecaoTickets
+from ..utils.graficos import renderizar_graficos
+from ..utils.instrumentacao import etapa, medir
+from .analysis_service import AnalysisService
 
 logger = logging.getLogger(__name__)
 
+# Versão do layout dos relatórios; incrementar ao mudar o PDF invalida os PDFs em cache
+VERSAO_MODELO = 1
+
 
 class PDFReportService:
     """Serviço responsável pela geração de relatórios em PDF"""
     
-    def __init__(self, output_path: Path):
+    def __init__(self, output_path: Optional[Path] = None):
         """
         Inicializa o serviço de PDF
         
         Args:
-            output_path: Caminho onde o PDF será salvo
+            output_path: Caminho onde o PDF será salvo (None gera o PDF em memória)
         """
         self.output_path = output_path
-        self.output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    @staticmethod
-    def _gerar_grafico_barras(dados: Dict[str, int], titulo: str, temp_path: str) -> str:
-        """
-        Gera gráfico de barras
-        
-        Args:
-            dados: Dicionário com dados
-            titulo: Título do gráfico
-            temp_path: Caminho temporário para salvar
-            
-        Returns:
-            Caminho do arquivo de imagem
-        """
-        fig, ax = plt.subplots(figsize=(10, 5))
-        
-        labels = list(dados.keys())
-        values = list(dados.values())
-        colors_list = ['#1f4788', '#2e5c8a', '#3d7a9e', '#4c98b2', '#5bb3c8']
-        
-        ax.bar(labels, values, color=colors_list[:len(labels)])
-        ax.set_title(titulo, fontsize=12, fontweight='bold', color='#1f4788')
-        ax.set_ylabel('Quantidade', fontsize=10)
-        ax.grid(axis='y', alpha=0.3)
-        
-        # Adicionar valores nas barras
-        for i, v in enumerate(values):
-            ax.text(i, v + max(values) * 0.01, str(v), ha='center', fontweight='bold')
-        
-        plt.tight_layout()
-        plt.savefig(temp_path, dpi=100, bbox_inches='tight')
-        plt.close(fig)
-        
-        return temp_path
-    
-    @staticmethod
-    def _gerar_grafico_barras_horizontal(dados: Dict[str, int], titulo: str, temp_path: str) -> str:
-        """
-        Gera gráfico de barras horizontais (ideal para muitos itens)
-        
-        Args:
-            dados: Dicionário com dados
-            titulo: Título do gráfico
-            temp_path: Caminho temporário para salvar
-            
-        Returns:
-            Caminho do arquivo de imagem
-        """
-        fig, ax = plt.subplots(figsize=(10, max(6, len(dados) * 0.4)))
-        
-        labels = list(dados.keys())
-        values = list(dados.values())
-        colors_list = ['#1f4788', '#2e5c8a', '#3d7a9e', '#4c98b2', '#5bb3c8', '#6accd9']
-        
-        # Gráfico horizontal
-        ax.barh(labels, values, color=colors_list[:len(labels)])
-        ax.set_title(titulo, fontsize=12, fontweight='bold', color='#1f4788')
-        ax.set_xlabel('Quantidade', fontsize=10)
-        ax.grid(axis='x', alpha=0.3)
-        
-        # Adicionar valores nas barras
-        for i, v in enumerate(values):
-            ax.text(v + max(values) * 0.01, i, str(v), va='center', fontweight='bold', fontsize=9)
-        
-        plt.tight_layout()
-        plt.savefig(temp_path, dpi=100, bbox_inches='tight')
-        plt.close(fig)
-        
-        return temp_path
-    
-    @staticmethod
-    def _gerar_grafico_pizza(dados: Dict[str, int], titulo: str, temp_path: str) -> str:
-        """
-        Gera gráfico de pizza
-        
-        Args:
-            dados: Dicionário com dados
-            titulo: Título do gráfico
-            temp_path: Caminho temporário para salvar
-            
-        Returns:
-            Caminho do arquivo de imagem
-        """
-        fig, ax = plt.subplots(figsize=(8, 6))
-        
-        labels = list(dados.keys())
-        values = list(dados.values())
-        colors_list = ['#1f4788', '#2e5c8a', '#3d7a9e', '#4c98b2', '#5bb3c8']
-        
-        wedges, texts, autotexts = ax.pie(
-            values, 
-            labels=labels, 
-            autopct='%1.1f%%',
-            colors=colors_list[:len(labels)],
-            startangle=90
-        )
-        
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
-        
-        ax.set_title(titulo, fontsize=12, fontweight='bold', color='#1f4788')
-        
-        plt.tight_layout()
-        plt.savefig(temp_path, dpi=100, bbox_inches='tight')
-        plt.close(fig)
-        
-        return temp_path
+        if self.output_path is not None:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
     
     @staticmethod
     def _criar_estilos():
         """Cria estilos personalizados para o relatório"""
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        
         styles = getSampleStyleSheet()
         
         titulo = ParagraphStyle(
@@ -185,6 +79,7 @@ class PDFReportService:
         
         return styles, titulo, subtitulo, secao, normal
     
+    @medir('pdf')
     def gerar_relatorio(
         self,
         periodo: str,
@@ -202,7 +97,7 @@ class PDFReportService:
         tabela_tipologia: List[Dict[str, Any]] = None,
         tabela_top10_modulos: List[Dict[str, Any]] = None,
         tabela_origem: List[Dict[str, Any]] = None
-    ) -> Path:
+    ) -> Union[Path, BytesIO]:
         """
         Gera relatório em PDF
         
@@ -216,11 +111,17 @@ class PDFReportService:
             comparativo: Dados de comparativo (opcional)
             
         Returns:
-            Path do arquivo PDF gerado
+            Path do arquivo PDF gerado, ou BytesIO (na posição 0) sem output_path
         """
+        # ReportLab é importado só aqui: a API e os dashboards sobem sem ele
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.lib.units import cm
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
         
+        destino = BytesIO() if self.output_path is None else str(self.output_path)
         doc = SimpleDocTemplate(
-            str(self.output_path),
+            destino,
             pagesize=landscape(A4),
             rightMargin=1*cm,
             leftMargin=1*cm,
@@ -231,6 +132,17 @@ class PDFReportService:
         story = []
         styles, titulo, subtitulo, secao, normal = self._criar_estilos()
         
+        # Gráficos renderizados em paralelo antes de montar o documento
+        graficos = [
+            ('pizza', {k: v['total'] for k, v in sorted(analises_tipologia.items())}, "Distribuição por Tipologia"),
+            ('barras', {k: v['total'] for k, v in sorted(analises_componente.items())}, "Tickets por Componente"),
+        ]
+        if analises_servidor:
+            graficos.append(
+                ('barras_horizontal', {k: v['total'] for k, v in sorted(analises_servidor.items())}, "Tickets por Servidor/Cluster")
+            )
+        png_tipologia, png_componente, *png_servidor = renderizar_graficos(graficos)
+        
         # Header
         story.append(Paragraph("RELATÓRIO DE MIDDLEWARE E INFRAESTRUTURA", titulo))
         story.append(Paragraph("AGT 4.0", subtitulo))
@@ -290,13 +202,7 @@ class PDFReportService:
         story.append(Spacer(1, 0.3*cm))
         
         # Gráfico de tipologia
-        grafico_tipo_path = os.path.join(tempfile.gettempdir(), f"grafico_tipologia_{datetime.now().timestamp()}.png")
-        self._gerar_grafico_pizza(
-            {k: v['total'] for k, v in sorted(analises_tipologia.items())},
-            "Distribuição por Tipologia",
-            grafico_tipo_path
-        )
-        story.append(Image(grafico_tipo_path, width=14*cm, height=9*cm))
+        story.append(Image(BytesIO(png_tipologia), width=14*cm, height=9*cm))
         story.append(Spacer(1, 0.5*cm))
         
         # Análise por Componente
@@ -325,13 +231,7 @@ class PDFReportService:
         story.append(Spacer(1, 0.3*cm))
         
         # Gráfico de componentes
-        grafico_comp_path = os.path.join(tempfile.gettempdir(), f"grafico_componente_{datetime.now().timestamp()}.png")
-        self._gerar_grafico_barras(
-            {k: v['total'] for k, v in sorted(analises_componente.items())},
-            "Tickets por Componente",
-            grafico_comp_path
-        )
-        story.append(Image(grafico_comp_path, width=14*cm, height=7*cm))
+        story.append(Image(BytesIO(png_componente), width=14*cm, height=7*cm))
         story.append(Spacer(1, 0.5*cm))
         
         # Análise por Origem
@@ -386,13 +286,7 @@ class PDFReportService:
             story.append(Spacer(1, 0.3*cm))
             
             # Gráfico de servidores
-            grafico_serv_path = os.path.join(tempfile.gettempdir(), f"grafico_servidor_{datetime.now().timestamp()}.png")
-            self._gerar_grafico_barras_horizontal(
-                {k: v['total'] for k, v in sorted(analises_servidor.items())},
-                "Tickets por Servidor/Cluster",
-                grafico_serv_path
-            )
-            story.append(Image(grafico_serv_path, width=14*cm, height=10*cm))
+            story.append(Image(BytesIO(png_servidor[0]), width=14*cm, height=10*cm))
             story.append(Spacer(1, 0.5*cm))
         
         # Análise por Prioridade se fornecida
@@ -631,7 +525,39 @@ class PDFReportService:
             story.append(ori_table)
         
         # Build PDF
-        doc.build(story)
-        logger.info(f"PDF gerado com sucesso: {self.output_path}")
+        with etapa('montagem', elementos=len(story)) as medida:
+            doc.build(story)
+            if medida and self.output_path is None:
+                medida['bytes'] = destino.getbuffer().nbytes
         
+        if self.output_path is None:
+            destino.seek(0)
+            logger.info(f"PDF gerado em memória ({destino.getbuffer().nbytes} bytes)")
+            return destino
+        
+        logger.info(f"PDF gerado com sucesso: {self.output_path}")
         return self.output_path
+
+    def gerar_relatorio_de_tickets(self, periodo: str, tickets: ColecaoTickets, **kwargs) -> Union[Path, BytesIO]:
+        """
+        Gera relatório em PDF calculando as análises a partir dos tickets
+        
+        Args:
+            periodo: Período do relatório
+            tickets: Lista de Tickets ou TicketFrame
+            **kwargs: Demais argumentos de gerar_relatorio (comparativo, tabelas...)
+            
+        Returns:
+            Path do arquivo PDF gerado (ou BytesIO, como em gerar_relatorio)
+        """
+        analises = AnalysisService.agrupar(tickets)
+        return self.gerar_relatorio(
+            periodo=periodo,
+            resumo=AnalysisService.calcular_resumo_executivo(tickets),
+            analises_tipologia=analises['tipologia'],
+            analises_componente=analises['componente'],
+            analises_origem=analises['origem'],
+            analises_prioridade=analises['prioridade'],
+            analises_servidor=analises['servidor'],
+            **kwargs
+        )
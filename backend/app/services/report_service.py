@@ -2,13 +2,43 @@
 Serviço de geração de relatórios
 """
 
+import functools
 import logging
-from typing import Dict, Any
+from typing import Callable, Dict, Any
 from datetime import datetime
 
+from ..utils.cache_relatorios import CacheRelatorios, cache_relatorios, hash_conteudo
+from ..utils.instrumentacao import ativa, coletar, etapa, perfil
+from ..utils.jira_parser import OrigemCSV, iterar_jira_csv, parser_jira_csv
+from ..utils.upload_stream import FluxoUpload
+from .analysis_service import AnalysisService, TicketAggregate
+from .pdf_report_service import PDFReportService, VERSAO_MODELO
+
 logger = logging.getLogger(__name__)
 
 
+def _instrumentado(nome: str) -> Callable:
+    """
+    Mede a geração do relatório como uma etapa (com perfil opcional)
+    
+    Se as etapas forem medidas, vão em relatorio['etapas'] (os jobs as
+    devolvem ao processo da API); com a instrumentação ativa, também em
+    resultado['etapas'], para aparecerem na resposta da API e dos jobs.
+    """
+    def decorador(funcao: Callable) -> Callable:
+        @functools.wraps(funcao)
+        def medido(*args, **kwargs):
+            with perfil(nome), coletar() as etapas, etapa(nome) as medida:
+                relatorio = funcao(*args, **kwargs)
+            if medida:
+                relatorio['etapas'] = [e.to_dict() for e in etapas]
+                if ativa():
+                    relatorio['resultado']['etapas'] = relatorio['etapas']
+            return relatorio
+        return medido
+    return decorador
+
+
 class ReportService:
     """Serviço responsável pela geração de relatórios"""
     
@@ -92,3 +122,190 @@ class ReportService:
         linhas.append("\n" + "=" * 90)
         
         return "\n".join(linhas)
+
+    @staticmethod
+    def periodo_do_arquivo(nome_arquivo: str, padrao: str) -> str:
+        """Extrai o período do nome do CSV (ex.: JIRAS_Outubro_2025.csv -> Outubro)"""
+        return nome_arquivo.split("_")[1] if "_" in nome_arquivo else padrao
+    
+    @staticmethod
+    @_instrumentado('relatorio')
+    def gerar_pdf_periodo(csv: OrigemCSV, nome_arquivo: str) -> Dict[str, Any]:
+        """
+        Processa o CSV de um período e gera o PDF em memória
+        
+        O agrupamento e o PDF vêm do cache quando o mesmo CSV já foi processado.
+        Um FluxoUpload é agrupado enquanto chega; seu hash só é conhecido no
+        fim, então apenas o PDF pode vir do cache.
+        
+        Args:
+            csv: Conteúdo do CSV (bytes, arquivo binário aberto ou FluxoUpload)
+            nome_arquivo: Nome original do CSV (define o período e o nome do PDF)
+            
+        Returns:
+            Dicionário com 'resultado' (dados para a resposta), 'pdf' (bytes) e 'pdf_nome'
+        """
+        # Processar em lotes (memória constante, sem manter a lista de tickets)
+        if isinstance(csv, FluxoUpload):
+            analises = AnalysisService.agrupar_lotes(iterar_jira_csv(csv))
+            hash_csv = csv.hash
+            cache_relatorios.guardar(CacheRelatorios.chave('agrupamento', hash_csv), analises)
+        else:
+            hash_csv = hash_conteudo(csv)
+            analises = cache_relatorios.obter_ou_calcular(
+                CacheRelatorios.chave('agrupamento', hash_csv),
+                lambda: AnalysisService.agrupar_lotes(iterar_jira_csv(csv))
+            )
+        resumo = AnalysisService.resumo_do_agrupamento(analises)
+        if not resumo['total_geral']:
+            raise ValueError("O arquivo não contém registros de tickets")
+        
+        periodo = ReportService.periodo_do_arquivo(nome_arquivo, "Período")
+        pdf = cache_relatorios.obter_ou_calcular(
+            CacheRelatorios.chave('pdf', hash_csv, periodo, VERSAO_MODELO),
+            lambda: PDFReportService().gerar_relatorio(
+                periodo=periodo,
+                resumo=resumo,
+                analises_tipologia=analises['tipologia'],
+                analises_componente=analises['componente'],
+                analises_origem=analises['origem'],
+                analises_prioridade=analises['prioridade'],
+                analises_servidor=analises['servidor']
+            ).getvalue()
+        )
+        
+        return {
+            'resultado': {
+                "arquivo": nome_arquivo,
+                "total_tickets": resumo['total_geral'],
+                "resumo": resumo,
+            },
+            'pdf': pdf,
+            'pdf_nome': f"relatorio_{nome_arquivo.replace('.csv', '.pdf')}",
+        }
+    
+    @staticmethod
+    def montar_relatorio_comparativo(
+        agregado_ant: TicketAggregate,
+        agregado_atu: TicketAggregate,
+        periodo_anterior: str,
+        periodo_atual: str
+    ) -> Dict[str, Any]:
+        """
+        Monta os dados do relatório comparativo a partir dos agregados dos dois períodos
+        
+        Args:
+            agregado_ant: Agregado do período anterior
+            agregado_atu: Agregado do período atual
+            periodo_anterior: Nome do período anterior
+            periodo_atual: Nome do período atual
+            
+        Returns:
+            Argumentos de PDFReportService.gerar_relatorio (inclui 'comparativo')
+        """
+        resumo_ant = agregado_ant.resumo()
+        resumo_atu = agregado_atu.resumo()
+        analises = agregado_atu.contagens
+        
+        # Top 10 servidores com mais tickets (total do período e soma dos dois períodos)
+        top_10_servidores_atual = agregado_atu.top('servidor')
+        top_10_servidores_acumulado = (agregado_ant + agregado_atu).top('servidor')
+        resumo_acumulado = AnalysisService.calcular_resumo_acumulado(agregado_ant, agregado_atu)
+        
+        comparativo = {
+            'periodo_anterior': periodo_anterior,
+            'periodo_atual': periodo_atual,
+            'total_anterior': resumo_ant['total_geral'],
+            'total_atual': resumo_atu['total_geral'],
+            'variacao_total': resumo_atu['total_geral'] - resumo_ant['total_geral'],
+            'abertos_anterior': resumo_ant['total_abertos'],
+            'abertos_atual': resumo_atu['total_abertos'],
+            'variacao_abertos': resumo_atu['total_abertos'] - resumo_ant['total_abertos'],
+            'fechados_anterior': resumo_ant['total_fechados'],
+            'fechados_atual': resumo_atu['total_fechados'],
+            'variacao_fechados': resumo_atu['total_fechados'] - resumo_ant['total_fechados'],
+            'backlog_anterior': resumo_ant['backlog_final'],
+            'backlog_atual': resumo_atu['backlog_final'],
+            'variacao_backlog': resumo_atu['backlog_final'] - resumo_ant['backlog_final'],
+            'top_10_servidores_atual': top_10_servidores_atual,
+            'top_10_servidores_acumulado': top_10_servidores_acumulado,
+            'resumo_acumulado': resumo_acumulado
+        }
+        
+        return {
+            'periodo': f"{periodo_anterior} vs {periodo_atual}",
+            'resumo': resumo_atu,
+            'analises_tipologia': analises['tipologia'],
+            'analises_componente': analises['componente'],
+            'analises_origem': analises['origem'],
+            'analises_prioridade': analises['prioridade'],
+            'analises_servidor': analises['servidor'],
+            'comparativo': comparativo,
+            'resumo_anterior': resumo_ant,
+            'resumo_acumulado': resumo_acumulado,
+            'top_10_servidores_atual': top_10_servidores_atual,
+            'top_10_servidores_acumulado': top_10_servidores_acumulado,
+            'tabela_tipologia': AnalysisService.tabela_tipologia(agregado_ant, agregado_atu),
+            'tabela_top10_modulos': AnalysisService.tabela_top10_modulos(agregado_ant, agregado_atu),
+            'tabela_origem': AnalysisService.tabela_origem(agregado_ant, agregado_atu),
+        }
+    
+    @staticmethod
+    @_instrumentado('relatorio_comparativo')
+    def gerar_pdf_comparativo(
+        csv_anterior: OrigemCSV,
+        nome_anterior: str,
+        csv_atual: OrigemCSV,
+        nome_atual: str
+    ) -> Dict[str, Any]:
+        """
+        Processa os CSVs de dois períodos e gera o PDF comparativo em memória
+        
+        Args:
+            csv_anterior: Conteúdo do CSV do período anterior
+            nome_anterior: Nome original do CSV anterior
+            csv_atual: Conteúdo do CSV do período atual
+            nome_atual: Nome original do CSV atual
+            
+        Returns:
+            Dicionário com 'resultado' (dados para a resposta), 'pdf' (bytes) e 'pdf_nome'
+        """
+        # Agregado de cada período (do cache pelo hash do CSV, se já processado)
+        hash_ant = hash_conteudo(csv_anterior)
+        agregado_ant = cache_relatorios.obter_ou_calcular(
+            CacheRelatorios.chave('agregado', hash_ant),
+            lambda: TicketAggregate.from_tickets(parser_jira_csv(csv_anterior))
+        )
+        hash_atu = hash_conteudo(csv_atual)
+        agregado_atu = cache_relatorios.obter_ou_calcular(
+            CacheRelatorios.chave('agregado', hash_atu),
+            lambda: TicketAggregate.from_tickets(parser_jira_csv(csv_atual))
+        )
+        
+        dados = ReportService.montar_relatorio_comparativo(
+            agregado_ant,
+            agregado_atu,
+            ReportService.periodo_do_arquivo(nome_anterior, "Anterior"),
+            ReportService.periodo_do_arquivo(nome_atual, "Atual")
+        )
+        comparativo = dados['comparativo']
+        
+        chave_pdf = CacheRelatorios.chave(
+            'pdf_comparativo', hash_ant, hash_atu,
+            comparativo['periodo_anterior'], comparativo['periodo_atual'], VERSAO_MODELO
+        )
+        pdf = cache_relatorios.obter_ou_calcular(
+            chave_pdf, lambda: PDFReportService().gerar_relatorio(**dados).getvalue()
+        )
+        
+        return {
+            'resultado': {
+                "arquivo_anterior": nome_anterior,
+                "arquivo_atual": nome_atual,
+                "tickets_anterior": len(agregado_ant),
+                "tickets_atual": len(agregado_atu),
+                "comparativo": comparativo,
+            },
+            'pdf': pdf,
+            'pdf_nome': f"relatorio_comparativo_{comparativo['periodo_anterior']}_vs_{comparativo['periodo_atual']}.pdf",
+        }
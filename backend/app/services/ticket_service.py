@@ -3,9 +3,11 @@ Serviço de processamento de tickets
 """
 
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
+
 from ..models.ticket import Ticket
+from ..models.ticket_frame import TicketFrame, ColecaoTickets
 
 logger = logging.getLogger(__name__)
 
@@ -14,14 +16,14 @@ class TicketService:
     """Serviço responsável pelo processamento de tickets"""
     
     def __init__(self):
-        self.tickets: List[Ticket] = []
+        self.tickets: ColecaoTickets = []
     
-    def carregar_tickets(self, tickets: List[Ticket]) -> int:
+    def carregar_tickets(self, tickets: ColecaoTickets) -> int:
         """
         Carrega tickets
         
         Args:
-            tickets: Lista de objetos Ticket
+            tickets: Lista de objetos Ticket ou TicketFrame
             
         Returns:
             Quantidade de tickets carregados
@@ -30,59 +32,62 @@ class TicketService:
         logger.info(f"Carregados {len(self.tickets)} tickets")
         return len(self.tickets)
     
-    def contar_por_status(self) -> Dict[str, int]:
-        """Conta tickets por status"""
+    def _contar(self, campo: str, padrao: Optional[str] = None) -> Dict[str, int]:
+        """Conta tickets por valor de um campo (valores vazios usam o padrão)"""
         contagem = {}
-        for ticket in self.tickets:
-            status = ticket.status
-            contagem[status] = contagem.get(status, 0) + 1
+        if isinstance(self.tickets, TicketFrame):
+            import pandas as pd
+            contagens = self.tickets.dados[campo].value_counts(sort=False, dropna=False)
+            itens = ((None if pd.isna(valor) else valor, int(n)) for valor, n in contagens.items() if n)
+        else:
+            itens = ((getattr(ticket, campo), 1) for ticket in self.tickets)
+        
+        for valor, n in itens:
+            if padrao is not None:
+                valor = valor or padrao
+            contagem[valor] = contagem.get(valor, 0) + n
         return contagem
     
+    def contar_por_status(self) -> Dict[str, int]:
+        """Conta tickets por status"""
+        return self._contar('status')
+    
     def contar_por_tipologia(self) -> Dict[str, int]:
         """Conta tickets por tipologia (Support, Task, Incident, Bug)"""
-        contagem = {}
-        for ticket in self.tickets:
-            tipologia = ticket.tipologia
-            contagem[tipologia] = contagem.get(tipologia, 0) + 1
-        return contagem
+        return self._contar('tipologia')
     
     def contar_por_componente(self) -> Dict[str, int]:
         """Conta tickets por componente/módulo"""
-        contagem = {}
-        for ticket in self.tickets:
-            componente = ticket.componente
-            contagem[componente] = contagem.get(componente, 0) + 1
-        return contagem
+        return self._contar('componente')
     
     def contar_por_origem(self) -> Dict[str, int]:
         """Conta tickets por origem"""
-        contagem = {}
-        for ticket in self.tickets:
-            origem = ticket.origem
-            contagem[origem] = contagem.get(origem, 0) + 1
-        return contagem
+        return self._contar('origem')
     
     def contar_por_prioridade(self) -> Dict[str, int]:
         """Conta tickets por prioridade"""
-        contagem = {}
-        for ticket in self.tickets:
-            prioridade = ticket.prioridade or "Não especificada"
-            contagem[prioridade] = contagem.get(prioridade, 0) + 1
-        return contagem
+        return self._contar('prioridade', "Não especificada")
     
-    def obter_tickets_abertos(self) -> List[Ticket]:
+    def obter_tickets_abertos(self) -> ColecaoTickets:
         """Retorna apenas tickets abertos"""
+        if isinstance(self.tickets, TicketFrame):
+            return self.tickets.filtrar(self.tickets.abertos)
         return [t for t in self.tickets if t.esta_aberto]
     
-    def obter_tickets_fechados(self) -> List[Ticket]:
+    def obter_tickets_fechados(self) -> ColecaoTickets:
         """Retorna apenas tickets fechados"""
+        if isinstance(self.tickets, TicketFrame):
+            return self.tickets.filtrar(~self.tickets.abertos)
         return [t for t in self.tickets if not t.esta_aberto]
     
     def contar_tickets(self) -> Dict[str, int]:
         """Retorna contagem geral de tickets"""
         total = len(self.tickets)
-        abertos = len(self.obter_tickets_abertos())
-        fechados = len(self.obter_tickets_fechados())
+        if isinstance(self.tickets, TicketFrame):
+            abertos = int(self.tickets.abertos.sum())
+        else:
+            abertos = sum(1 for t in self.tickets if t.esta_aberto)
+        fechados = total - abertos
         
         return {
             'total': total,
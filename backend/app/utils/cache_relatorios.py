@@ -0,0 +1,198 @@
+"""
+Cache em disco endereçado por conteúdo (tickets, agregados e PDFs)
+
+A chave de cada entrada é derivada do hash MD5 dos CSVs de entrada (o mesmo
+de calcular_hash_arquivo no dashboard), do tipo da entrada e de versões/
+parâmetros que alteram o resultado (ex.: VERSAO_MODELO do PDF e o nome do
+período). Reenviar o mesmo arquivo reaproveita o resultado em vez de
+reprocessar o CSV e redesenhar o relatório.
+
+O tamanho total é limitado; ao passar do limite, as entradas usadas há mais
+tempo (mtime, atualizado a cada acerto) são removidas primeiro. O total é
+somado a cada gravação e o diretório só é percorrido quando ele passa do
+limite (ou na primeira gravação do processo).
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Optional
+
+from .. import __version__
+from ..config import CACHE_RELATORIOS_DIR, CACHE_RELATORIOS_TAMANHO_MB
+
+logger = logging.getLogger(__name__)
+
+# Bytes lidos por vez ao calcular o hash de um arquivo aberto
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+
+def hash_conteudo(origem: Any) -> str:
+    """
+    Calcula o hash MD5 de um CSV (caminho, bytes ou arquivo binário aberto)
+    
+    Arquivos são lidos em blocos; os já abertos voltam à posição inicial.
+    
+    Args:
+        origem: Caminho do arquivo, conteúdo em bytes ou arquivo binário
+    
+    Returns:
+        Hash hexadecimal
+    """
+    if isinstance(origem, (bytes, bytearray, memoryview)):
+        return hashlib.md5(origem).hexdigest()
+    if isinstance(origem, (str, Path)):
+        with open(origem, 'rb') as arquivo:
+            return hash_conteudo(arquivo)
+    
+    inicio = origem.tell()
+    md5 = hashlib.md5()
+    for bloco in iter(lambda: origem.read(TAMANHO_BLOCO_HASH), b''):
+        md5.update(bloco)
+    origem.seek(inicio)
+    return md5.hexdigest()
+
+
+class CacheRelatorios:
+    """Cache em disco com chaves derivadas do conteúdo e remoção LRU por tamanho"""
+    
+    def __init__(self, diretorio: Path = CACHE_RELATORIOS_DIR,
+                 tamanho_maximo: int = CACHE_RELATORIOS_TAMANHO_MB * 1024 * 1024):
+        """
+        Inicializa o cache
+        
+        Args:
+            diretorio: Diretório das entradas (criado no primeiro uso)
+            tamanho_maximo: Tamanho total máximo em bytes
+        """
+        self.diretorio = Path(diretorio)
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+        # Soma aproximada dos tamanhos das entradas (None até o primeiro levantamento)
+        self._tamanho_total: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def chave(tipo: str, *partes: Any) -> str:
+        """
+        Monta a chave de uma entrada
+        
+        Args:
+            tipo: Tipo da entrada (ex.: 'tickets', 'agregado', 'pdf')
+            *partes: Hashes dos CSVs e demais parâmetros que alteram o resultado
+        
+        Returns:
+            Chave hexadecimal (SHA-256)
+        """
+        texto = '\x1f'.join([tipo, __version__] + [str(p) for p in partes])
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+    
+    def _caminho(self, chave: str) -> Path:
+        return self.diretorio / chave[:2] / chave
+    
+    def obter(self, chave: str) -> Optional[Any]:
+        """
+        Busca uma entrada
+        
+        Args:
+            chave: Chave retornada por chave()
+        
+        Returns:
+            Valor guardado, ou None se não estiver no cache
+        """
+        if self.tamanho_maximo <= 0:
+            return None
+        
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as f:
+                valor = pickle.load(f)
+            os.utime(caminho)
+        except FileNotFoundError:
+            with self._lock:
+                self.falhas += 1
+            return None
+        except Exception as e:
+            # Entrada corrompida ou de outra versão das classes: descarta
+            logger.warning(f"Descartando entrada inválida do cache {chave[:12]}: {e}")
+            caminho.unlink(missing_ok=True)
+            with self._lock:
+                self.falhas += 1
+            return None
+        
+        with self._lock:
+            self.acertos += 1
+        return valor
+    
+    def guardar(self, chave: str, valor: Any):
+        """Grava uma entrada (atomicamente) e aplica o limite de tamanho"""
+        if self.tamanho_maximo <= 0:
+            return
+        
+        caminho = self._caminho(chave)
+        try:
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=caminho.parent, delete=False) as tmp:
+                pickle.dump(valor, tmp, protocol=pickle.HIGHEST_PROTOCOL)
+                tamanho = tmp.tell()
+            try:
+                anterior = caminho.stat().st_size
+            except FileNotFoundError:
+                anterior = 0
+            os.replace(tmp.name, caminho)
+        except Exception as e:
+            logger.warning(f"Não foi possível gravar no cache: {e}")
+            return
+        
+        with self._lock:
+            if self._tamanho_total is not None:
+                self._tamanho_total += tamanho - anterior
+            if self._tamanho_total is None or self._tamanho_total > self.tamanho_maximo:
+                self._remover_excedente()
+    
+    def obter_ou_calcular(self, chave: str, calcular: Callable[[], Any]) -> Any:
+        """Retorna a entrada guardada ou calcula, guarda e retorna o valor"""
+        valor = self.obter(chave)
+        if valor is None:
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+    
+    def _remover_excedente(self):
+        """
+        Remove as entradas usadas há mais tempo até caber no tamanho máximo
+        
+        Percorre o diretório e corrige o total somado (que não vê entradas
+        gravadas ou removidas por outros processos). Chamado com o lock.
+        """
+        entradas = []
+        for caminho in self.diretorio.glob('*/*'):
+            try:
+                info = caminho.stat()
+            except FileNotFoundError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, caminho))
+        
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas, key=lambda e: e[0]):
+            if total <= self.tamanho_maximo:
+                break
+            caminho.unlink(missing_ok=True)
+            total -= tamanho
+        self._tamanho_total = total
+    
+    def limpar(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            for caminho in self.diretorio.glob('*/*'):
+                caminho.unlink(missing_ok=True)
+            self._tamanho_total = 0
+
+
+# Cache compartilhado pela API e pelo dashboard
+cache_relatorios = CacheRelatorios()
@@ -0,0 +1,98 @@
+"""
+Conversão de datas do Jira ("DD/MM/YYYY HH:MM")
+"""
+
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+# pandas/numpy só são carregados ao converter colunas inteiras
+if TYPE_CHECKING:
+    import numpy as np
+
+# Formato das colunas 'Criado' e 'Atualizado(a)' do export do Jira
+FORMATO_DATA_JIRA = "%d/%m/%Y %H:%M"
+
+
+@lru_cache(maxsize=65536)
+def converter_data_jira(valor: str) -> Optional[datetime]:
+    """
+    Converte uma data do Jira para datetime
+    
+    Usa fatiamento direto quando a string está no formato fixo de 16
+    caracteres e só recorre ao strptime nos demais casos. Como as datas
+    têm resolução de minuto, valores repetidos são servidos pelo cache.
+    
+    Args:
+        valor: String no formato "DD/MM/YYYY HH:MM"
+    
+    Returns:
+        datetime ou None se o valor for vazio ou inválido
+    """
+    texto = valor.strip()
+    if not texto:
+        return None
+    
+    if len(texto) == 16 and texto[2] == '/' and texto[5] == '/' and texto[10] == ' ' and texto[13] == ':':
+        digitos = texto[0:2] + texto[3:5] + texto[6:10] + texto[11:13] + texto[14:16]
+        if digitos.isdigit():
+            try:
+                return datetime(
+                    int(texto[6:10]), int(texto[3:5]), int(texto[0:2]),
+                    int(texto[11:13]), int(texto[14:16])
+                )
+            except ValueError:
+                return None
+    
+    try:
+        return datetime.strptime(texto, FORMATO_DATA_JIRA)
+    except ValueError:
+        return None
+
+
+def converter_coluna_datas(valores: Sequence[Optional[str]]) -> Tuple["np.ndarray", int]:
+    """
+    Converte uma coluna inteira de datas do Jira para datetime64[ns]
+    
+    Cada valor distinto é convertido uma única vez. Valores vazios viram
+    NaT sem contar como erro; valores preenchidos e inválidos viram NaT e
+    são contados.
+    
+    Args:
+        valores: Strings de data (None ou vazio para ausente)
+    
+    Returns:
+        Tupla (array datetime64[ns], quantidade de valores inválidos)
+    """
+    import numpy as np
+    import pandas as pd
+    
+    serie = pd.Series(valores, dtype=object).str.strip()
+    preenchidos = serie.notna() & (serie != '')
+    
+    unicos = pd.unique(serie[preenchidos])
+    convertidos = pd.to_datetime(pd.Series(unicos, dtype=object), format=FORMATO_DATA_JIRA, errors='coerce')
+    
+    datas = np.full(len(serie), np.datetime64('NaT'), dtype='datetime64[ns]')
+    posicoes = pd.Index(unicos).get_indexer(serie[preenchidos])
+    datas[preenchidos.to_numpy()] = convertidos.to_numpy()[posicoes]
+    
+    erros = int(np.isnat(datas[preenchidos.to_numpy()]).sum())
+    return datas, erros
+
+
+def formatar_datas_postgres(valores: Sequence[Optional[str]]) -> List[Optional[str]]:
+    """
+    Converte uma coluna de datas do Jira para texto "YYYY-MM-DD HH:MM:SS"
+    
+    Args:
+        valores: Strings de data no formato do Jira
+    
+    Returns:
+        Lista com o texto aceito pelo PostgreSQL (None para vazio ou inválido)
+    """
+    import numpy as np
+    
+    datas, _ = converter_coluna_datas(valores)
+    textos = np.datetime_as_string(datas, unit='s').tolist()
+    return [None if texto == 'NaT' else texto.replace('T', ' ') for texto in textos]
@@ -0,0 +1,211 @@
+"""
+Renderização dos gráficos dos relatórios (matplotlib, backend Agg)
+
+Os gráficos de um relatório são independentes entre si e são desenhados
+em paralelo num pool de processos; cada um volta como PNG em memória,
+pronto para ser embutido pelo ReportLab sem passar por arquivos temporários.
+
+Processos spawn reimportam o `__main__` de quem os cria. No Streamlit o
+`__main__` é a própria página (dashboard.py), que seria executada de novo
+em cada processo do pool; por isso, lá os gráficos são desenhados em série.
+"""
+
+import atexit
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+import multiprocessing
+from typing import Dict, List, Tuple
+
+from ..config import GRAFICOS_PROCESSOS
+from .instrumentacao import etapa
+
+logger = logging.getLogger(__name__)
+
+# (tipo, dados, titulo); tipo é uma chave de _DESENHOS
+Grafico = Tuple[str, Dict[str, int], str]
+
+_CORES = ['#1f4788', '#2e5c8a', '#3d7a9e', '#4c98b2', '#5bb3c8']
+
+_plt = None
+
+
+def _pyplot():
+    """matplotlib.pyplot com o backend Agg, importado só no primeiro gráfico (~0,4 s)"""
+    global _plt
+    if _plt is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        _plt = plt
+    return _plt
+
+
+def _barras(dados: Dict[str, int], titulo: str):
+    """Gráfico de barras verticais"""
+    fig, ax = _pyplot().subplots(figsize=(10, 5))
+    
+    labels = list(dados.keys())
+    values = list(dados.values())
+    
+    ax.bar(labels, values, color=_CORES[:len(labels)])
+    ax.set_title(titulo, fontsize=12, fontweight='bold', color='#1f4788')
+    ax.set_ylabel('Quantidade', fontsize=10)
+    ax.grid(axis='y', alpha=0.3)
+    
+    # Adicionar valores nas barras
+    for i, v in enumerate(values):
+        ax.text(i, v + max(values) * 0.01, str(v), ha='center', fontweight='bold')
+    
+    return fig
+
+
+def _barras_horizontal(dados: Dict[str, int], titulo: str):
+    """Gráfico de barras horizontais (ideal para muitos itens)"""
+    fig, ax = _pyplot().subplots(figsize=(10, max(6, len(dados) * 0.4)))
+    
+    labels = list(dados.keys())
+    values = list(dados.values())
+    
+    ax.barh(labels, values, color=(_CORES + ['#6accd9'])[:len(labels)])
+    ax.set_title(titulo, fontsize=12, fontweight='bold', color='#1f4788')
+    ax.set_xlabel('Quantidade', fontsize=10)
+    ax.grid(axis='x', alpha=0.3)
+    
+    # Adicionar valores nas barras
+    for i, v in enumerate(values):
+        ax.text(v + max(values) * 0.01, i, str(v), va='center', fontweight='bold', fontsize=9)
+    
+    return fig
+
+
+def _pizza(dados: Dict[str, int], titulo: str):
+    """Gráfico de pizza"""
+    fig, ax = _pyplot().subplots(figsize=(8, 6))
+    
+    labels = list(dados.keys())
+    values = list(dados.values())
+    
+    wedges, texts, autotexts = ax.pie(
+        values,
+        labels=labels,
+        autopct='%1.1f%%',
+        colors=_CORES[:len(labels)],
+        startangle=90
+    )
+    
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+    
+    ax.set_title(titulo, fontsize=12, fontweight='bold', color='#1f4788')
+    
+    return fig
+
+
+_DESENHOS = {
+    'barras': _barras,
+    'barras_horizontal': _barras_horizontal,
+    'pizza': _pizza,
+}
+
+
+def renderizar_grafico(tipo: str, dados: Dict[str, int], titulo: str) -> bytes:
+    """
+    Desenha um gráfico e retorna o PNG em memória
+    
+    Args:
+        tipo: 'barras', 'barras_horizontal' ou 'pizza'
+        dados: Dicionário rótulo -> quantidade
+        titulo: Título do gráfico
+    
+    Returns:
+        Conteúdo do PNG (dpi=100)
+    """
+    with etapa('grafico', tipo=tipo, itens=len(dados)) as medida:
+        fig = _DESENHOS[tipo](dados, titulo)
+        try:
+            fig.tight_layout()
+            buffer = BytesIO()
+            fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+            medida['bytes'] = buffer.getbuffer().nbytes
+            return buffer.getvalue()
+        finally:
+            _pyplot().close(fig)
+
+
+def _renderizar(grafico: Grafico) -> bytes:
+    """Ponto de entrada dos processos do pool"""
+    return renderizar_grafico(*grafico)
+
+
+# Pool compartilhado entre relatórios (criado no primeiro uso)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _obter_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos, criando-o na primeira chamada"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: o servidor (uvicorn) tem threads, e fork com threads não é seguro
+            _pool = ProcessPoolExecutor(
+                max_workers=GRAFICOS_PROCESSOS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def _pool_permitido() -> bool:
+    """Indica se o pool pode ser usado (não dentro de uma página do Streamlit)"""
+    # Sem streamlit já importado não há página rodando (e a API não paga o import)
+    if 'streamlit' not in sys.modules:
+        return True
+    from streamlit import runtime
+    return not runtime.exists()
+
+
+def encerrar_pool():
+    """Encerra o pool de processos (chamado também na saída do interpretador)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(encerrar_pool)
+
+
+def renderizar_graficos(graficos: List[Grafico]) -> List[bytes]:
+    """
+    Renderiza todos os gráficos de um relatório em paralelo
+    
+    Com um único gráfico, GRAFICOS_PROCESSOS=1 ou dentro do Streamlit
+    desenha no próprio processo; se o pool falhar, refaz os gráficos em série.
+    
+    Args:
+        graficos: Lista de (tipo, dados, titulo)
+    
+    Returns:
+        PNGs na mesma ordem de `graficos`
+    """
+    with etapa('graficos', quantidade=len(graficos)) as medida:
+        if len(graficos) <= 1 or GRAFICOS_PROCESSOS == 1 or not _pool_permitido():
+            medida['processos'] = 1
+            return [_renderizar(g) for g in graficos]
+        
+        # No pool, cada gráfico é registrado pelo processo que o desenhou
+        try:
+            pngs = list(_obter_pool().map(_renderizar, graficos))
+            medida['processos'] = GRAFICOS_PROCESSOS or os.cpu_count()
+            return pngs
+        except Exception as e:
+            logger.warning(f"Pool de gráficos indisponível ({e}); renderizando em série")
+            encerrar_pool()
+            medida['processos'] = 1
+            return [_renderizar(g) for g in graficos]
@@ -0,0 +1,295 @@
+"""
+Instrumentação das etapas do pipeline (leitura, agregação, gráficos, PDF, carga no banco)
+
+Cada etapa é medida com `etapa(nome, **campos)`, um context manager que
+registra a duração e os campos (linhas, bytes...) como campos estruturados
+do log (`extra`), aninhando o nome sob a etapa em andamento
+(ex.: 'relatorio.pdf.graficos'). Desativada (padrão), `etapa` devolve um
+objeto nulo compartilhado: nenhum relógio é lido e nada é registrado.
+
+Observadores (`observar`) recebem cada etapa concluída como dicionário, com
+ou sem log: é assim que a API alimenta as métricas de /metrics.
+
+`perfil(nome)` grava um perfil cProfile (.prof) ou pyinstrument (.html)
+do bloco em PERFIL_DIR quando PERFIL está configurado.
+
+Ativação: INSTRUMENTACAO=1 / PERFIL=cprofile|pyinstrument no ambiente
+(vale também para os processos dos pools), ou `ativar()` nos scripts.
+"""
+
+import contextvars
+import functools
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ..config import INSTRUMENTACAO, PERFIL, PERFIL_DIR
+
+logger = logging.getLogger(__name__)
+
+_ativa = INSTRUMENTACAO
+_perfil = PERFIL
+
+# Mede as etapas sem registrá-las no log (ex.: processos de jobs, cujas etapas voltam no resultado)
+_medir = False
+_observadores: List[Callable[[Dict[str, Any]], None]] = []
+
+# Etapa em andamento (para o nome aninhado) e listas que coletam as etapas concluídas
+_etapa_atual = contextvars.ContextVar('etapa_atual', default=None)
+_coletores = contextvars.ContextVar('coletores', default=())
+
+_SEM_EFEITO = nullcontext()
+
+
+class Etapa:
+    """Etapa medida: nome completo, campos e duração (ms)"""
+    
+    __slots__ = ('nome', 'campos', 'duracao_ms', '_pai', '_inicio', '_suspenso')
+    
+    def __init__(self, nome: str, campos: Dict[str, Any], pai: Optional["Etapa"] = None):
+        self.nome = f"{pai.nome}.{nome}" if pai else nome
+        self.campos = campos
+        self.duracao_ms = None
+        self._pai = pai
+        self._inicio = time.perf_counter()
+        self._suspenso = 0.0
+    
+    def __bool__(self) -> bool:
+        return True
+    
+    def __setitem__(self, campo: str, valor: Any):
+        self.campos[campo] = valor
+    
+    def somar(self, campo: str, valor: float):
+        """Acumula um valor num campo (ex.: linhas de vários lotes)"""
+        self.campos[campo] = self.campos.get(campo, 0) + valor
+    
+    @contextmanager
+    def cronometrar(self, campo: str) -> Iterator[None]:
+        """Acumula no campo `campo` o tempo (ms) gasto no bloco"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.somar(campo, round((time.perf_counter() - inicio) * 1000, 3))
+    
+    @contextmanager
+    def suspensa(self) -> Iterator[None]:
+        """
+        Desconta o bloco da duração e devolve o aninhamento à etapa pai
+        
+        Usado no `yield` de um gerador: enquanto o consumidor trabalha, o
+        tempo dele não conta nesta etapa e as etapas dele não ficam sob ela.
+        """
+        inicio = time.perf_counter()
+        _etapa_atual.set(self._pai)
+        try:
+            yield
+        finally:
+            _etapa_atual.set(self)
+            self._suspenso += time.perf_counter() - inicio
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Nome, duração e campos num único dicionário (para JSON)"""
+        return {'etapa': self.nome, 'duracao_ms': self.duracao_ms, **self.campos}
+
+
+class _EtapaNula:
+    """Etapa da instrumentação desativada: aceita as mesmas operações sem fazer nada"""
+    
+    __slots__ = ()
+    
+    def __bool__(self) -> bool:
+        return False
+    
+    def __setitem__(self, campo: str, valor: Any):
+        pass
+    
+    def somar(self, campo: str, valor: float):
+        pass
+    
+    def cronometrar(self, campo: str):
+        return _SEM_EFEITO
+    
+    def suspensa(self):
+        return _SEM_EFEITO
+
+
+_ETAPA_NULA = _EtapaNula()
+
+
+def ativar(instrumentacao: bool = True, perfil: Optional[str] = None):
+    """
+    Liga/desliga a instrumentação no processo atual
+    
+    Args:
+        instrumentacao: Registrar as etapas
+        perfil: 'cprofile', 'pyinstrument' ou None (sem perfil)
+    """
+    global _ativa, _perfil
+    _ativa = instrumentacao
+    _perfil = perfil
+
+
+def ativa() -> bool:
+    """Indica se as etapas estão sendo registradas no log"""
+    return _ativa
+
+
+def medir_etapas(ligado: bool = True):
+    """Mede as etapas (para coletar() e observadores) mesmo sem registrá-las no log"""
+    global _medir
+    _medir = ligado
+
+
+def medindo() -> bool:
+    """Indica se as etapas estão sendo medidas (log, medir_etapas ou observadores)"""
+    return _ativa or _medir or bool(_observadores)
+
+
+def observar(funcao: Callable[[Dict[str, Any]], None]):
+    """
+    Registra uma função chamada com cada etapa concluída neste processo
+    
+    Args:
+        funcao: Recebe Etapa.to_dict(); exceções são registradas e ignoradas
+    """
+    _observadores.append(funcao)
+
+
+def emitir(etapas: List[Dict[str, Any]]):
+    """Entrega aos observadores etapas medidas em outro processo (ex.: resultado de um job)"""
+    for dados in etapas:
+        for funcao in _observadores:
+            try:
+                funcao(dados)
+            except Exception as e:
+                logger.warning(f"Observador de etapas falhou: {e}")
+
+
+@contextmanager
+def etapa(nome: str, **campos: Any) -> Iterator[Etapa]:
+    """
+    Mede uma etapa do pipeline
+    
+    Args:
+        nome: Nome da etapa (prefixado pelo da etapa em andamento)
+        **campos: Campos registrados com a duração (outros podem ser
+            definidos no bloco: `e['linhas'] = n`)
+    
+    Yields:
+        Etapa (ou um objeto nulo, falso em `if`, com a instrumentação desativada)
+    """
+    if not (_ativa or _medir or _observadores):
+        yield _ETAPA_NULA
+        return
+    
+    pai = _etapa_atual.get()
+    atual = Etapa(nome, campos, pai)
+    _etapa_atual.set(atual)
+    erro = None
+    try:
+        yield atual
+    except BaseException as e:
+        erro = e
+        raise
+    finally:
+        _etapa_atual.set(pai)
+        atual.duracao_ms = round((time.perf_counter() - atual._inicio - atual._suspenso) * 1000, 3)
+        if erro is not None:
+            atual.campos['erro'] = type(erro).__name__
+        for coletadas in _coletores.get():
+            coletadas.append(atual)
+        if _observadores:
+            emitir([atual.to_dict()])
+        
+        if _ativa:
+            detalhes = ' '.join(f"{k}={v}" for k, v in atual.campos.items())
+            logger.info(
+                f"etapa {atual.nome}: {atual.duracao_ms:.1f} ms {detalhes}".rstrip(),
+                extra={'etapa': atual.nome, 'duracao_ms': atual.duracao_ms, 'campos': atual.campos}
+            )
+
+
+def medir(nome: str) -> Callable:
+    """
+    Decorador que mede cada chamada da função como uma etapa
+    
+    Args:
+        nome: Nome da etapa
+    """
+    def decorador(funcao: Callable) -> Callable:
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if not (_ativa or _medir or _observadores):
+                return funcao(*args, **kwargs)
+            with etapa(nome):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorador
+
+
+@contextmanager
+def coletar() -> Iterator[List[Etapa]]:
+    """
+    Coleta as etapas concluídas dentro do bloco (no mesmo processo e contexto)
+    
+    Yields:
+        Lista preenchida com as Etapa na ordem em que terminam
+    """
+    coletadas = []
+    token = _coletores.set(_coletores.get() + (coletadas,))
+    try:
+        yield coletadas
+    finally:
+        _coletores.reset(token)
+
+
+@contextmanager
+def perfil(nome: str) -> Iterator[None]:
+    """
+    Grava o perfil do bloco em PERFIL_DIR, se PERFIL estiver configurado
+    
+    Args:
+        nome: Prefixo do arquivo (ex.: 'relatorio')
+    """
+    if not _perfil:
+        yield
+        return
+    
+    PERFIL_DIR.mkdir(parents=True, exist_ok=True)
+    base = PERFIL_DIR / f"{nome}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    
+    if _perfil == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            Profiler = None
+        if Profiler is None:
+            logger.warning("pyinstrument não instalado; perfil não gravado")
+            yield
+            return
+        
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            destino = base.with_suffix('.html')
+            destino.write_text(profiler.output_html(), encoding='utf-8')
+            logger.info(f"Perfil gravado em {destino}")
+        return
+    
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        destino = base.with_suffix('.prof')
+        profiler.dump_stats(str(destino))
+        logger.info(f"Perfil gravado em {destino}")
@@ -2,12 +2,20 @@
 Parser específico para CSVs do Jira
 """
 
+import codecs
+import csv
+import io
 import logging
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import BinaryIO, List, Dict, Iterator, Optional, Tuple, Union
 from datetime import datetime
+
+from ..config import BATCH_SIZE
 from ..models.ticket import Ticket
-from .csv_parser import ler_csv
+from ..models.ticket_frame import TicketFrame, CAMPOS_TICKET
+from .date_parser import converter_data_jira, converter_coluna_datas
+from .instrumentacao import etapa
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +54,91 @@ COMPONENTE_ORIGEM_MAP = {
 }
 
 
-def converter_data(data_str: str) -> datetime:
+# Quantidade de bytes lidos do início do arquivo para detectar o encoding
+TAMANHO_AMOSTRA_ENCODING = 64 * 1024
+
+
+def _decodificar_como_latin1(erro: UnicodeDecodeError) -> Tuple[str, int]:
+    """Decodifica como latin1 os bytes inválidos que aparecem após a amostra"""
+    return erro.object[erro.start:erro.end].decode('latin1'), erro.end
+
+
+codecs.register_error('jira_latin1', _decodificar_como_latin1)
+
+
+def detectar_encoding(prefixo: bytes) -> str:
+    """
+    Detecta o encoding do CSV a partir do início do arquivo
+    
+    Args:
+        prefixo: Primeiros bytes do arquivo
+    
+    Returns:
+        Nome do encoding ('utf-8-sig', 'utf-8', 'cp1252' ou 'latin1')
+    """
+    if prefixo.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    
+    # Decodificador incremental tolera um caractere cortado no fim da amostra
+    for encoding in ('utf-8', 'cp1252'):
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(prefixo, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin1'
+
+
+# Caminho do CSV, conteúdo em bytes ou arquivo binário já aberto (ex.: upload)
+OrigemCSV = Union[Path, str, bytes, BinaryIO]
+
+
+@contextmanager
+def _abrir_csv(origem: OrigemCSV) -> Iterator[io.TextIOWrapper]:
+    """
+    Abre a origem do CSV como texto, com o encoding detectado
+    
+    Arquivos recebidos já abertos são lidos a partir da posição atual e
+    não são fechados ao final.
+    
+    Args:
+        origem: Caminho, bytes ou arquivo binário
+    
+    Yields:
+        Stream de texto pronto para o csv.DictReader
+    """
+    if isinstance(origem, (str, Path)):
+        arquivo = open(origem, 'rb')
+    elif isinstance(origem, (bytes, bytearray, memoryview)):
+        arquivo = io.BytesIO(origem)
+    else:
+        arquivo = origem
+    
+    envolvido = None
+    try:
+        if arquivo.seekable():
+            inicio = arquivo.tell()
+            encoding = detectar_encoding(arquivo.read(TAMANHO_AMOSTRA_ENCODING))
+            arquivo.seek(inicio)
+        else:
+            # Stream sem seek (ex.: upload ainda chegando): amostra lida sem consumir
+            envolvido = io.BufferedReader(arquivo, TAMANHO_AMOSTRA_ENCODING)
+            encoding = detectar_encoding(envolvido.peek(TAMANHO_AMOSTRA_ENCODING))
+        logger.info(f"Encoding detectado: {encoding}")
+        
+        texto = io.TextIOWrapper(envolvido or arquivo, encoding=encoding, errors='jira_latin1', newline='')
+        try:
+            yield texto
+        finally:
+            texto.detach()
+    finally:
+        if envolvido is not None:
+            envolvido.detach()
+        if arquivo is not origem:
+            arquivo.close()
+
+
+def converter_data(data_str: str) -> Optional[datetime]:
     """
     Converte string de data do Jira para datetime
     
@@ -54,13 +146,9 @@ def converter_data(data_str: str) -> datetime:
         data_str: String no formato "DD/MM/YYYY HH:MM"
         
     Returns:
-        datetime object
+        datetime object, ou None se a data for vazia ou inválida
     """
-    try:
-        return datetime.strptime(data_str.strip(), "%d/%m/%Y %H:%M")
-    except ValueError:
-        logger.warning(f"Não foi possível converter data: {data_str}")
-        return datetime.now()
+    return converter_data_jira(data_str)
 
 
 def mapear_tipologia(tipo_jira: str) -> str:
@@ -73,83 +161,224 @@ def obter_origem(componente: str) -> str:
     return COMPONENTE_ORIGEM_MAP.get(componente, componente)
 
 
-def parser_jira_csv(caminho: Path) -> List[Ticket]:
+def _converter_linha(linha: Dict[str, str], idx: int) -> Tuple:
     """
-    Parser específico para CSV do Jira
+    Extrai de uma linha do CSV do Jira os campos de um Ticket
+    
+    As datas ficam como texto para serem convertidas por lote.
     
     Args:
-        caminho: Caminho do arquivo CSV do Jira
-        
+        linha: Linha lida pelo csv.DictReader
+        idx: Número da linha (base 1) usado no ID
+    
     Returns:
-        Lista de objetos Ticket
+        Tupla (idx, campos na ordem de CAMPOS_TICKET sem o ticket_id)
     """
+    # Extrair dados
+    tipo_jira = linha.get('Tipo de item', '').strip()
+    componente = linha.get('Componentes', '').strip()
+    status = linha.get('Status', '').strip()
+    data_abertura_str = linha.get('Criado', '').strip()
+    data_atualizacao_str = linha.get('Atualizado(a)', '').strip()
+    
+    return (
+        idx,
+        f"{tipo_jira} - {componente}",
+        f"{componente} - {status}",
+        mapear_tipologia(tipo_jira),
+        obter_origem(componente),
+        componente,
+        linha.get('Servidores / Cluster', '').strip(),
+        status,
+        data_abertura_str,
+        data_atualizacao_str if status.lower() == 'fechada' else None,
+        linha.get('Responsável', '').strip(),
+        linha.get('Relator', '').strip(),
+        linha.get('Prioridade', '').strip()
+    )
+
+
+# Colunas do CSV de onde vêm as datas de abertura e fechamento
+COLUNAS_DATA_JIRA = ('Criado', 'Atualizado(a)')
+
+# Colunas sem as quais o arquivo não é uma exportação do Jira
+COLUNAS_OBRIGATORIAS_JIRA = ('Tipo de item', 'Status', 'Criado')
+
+
+def validar_cabecalho(inicio: bytes):
+    """
+    Confere se o início do arquivo é o cabeçalho de um CSV do Jira
+    
+    Permite recusar um upload inválido logo no primeiro bloco recebido.
+    
+    Args:
+        inicio: Primeiros bytes do arquivo (ao menos a linha de cabeçalho)
+    
+    Raises:
+        ValueError: Se o arquivo estiver vazio, não usar ';' ou faltar coluna obrigatória
+    """
+    encoding = detectar_encoding(inicio)
+    cabecalho = codecs.decode(inicio.split(b'\n', 1)[0], encoding, errors='replace').strip()
+    if not cabecalho:
+        raise ValueError("O arquivo está vazio")
+    if ';' not in cabecalho:
+        raise ValueError("O CSV do Jira deve usar ';' como separador")
+    
+    colunas = {coluna.strip().strip('"') for coluna in cabecalho.split(';')}
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS_JIRA if coluna not in colunas]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes no CSV: {', '.join(faltando)}")
+
+
+def _bytes_lidos(texto: io.TextIOWrapper) -> Optional[int]:
+    """Posição (em bytes) da origem do CSV, ou None se o stream não a informa"""
     try:
-        # Ler CSV com delimitador de ponto e vírgula
-        # Tentar diferentes encodings
-        dados_brutos = []
-        encodings = ['latin1', 'utf-8', 'cp1252', 'iso-8859-1']
+        return texto.buffer.tell()
+    except (OSError, ValueError):
+        return None
+
+
+def _montar_lote(linhas: List[Tuple], como_frame: bool, erros: Dict[str, int]) -> Union[List[Ticket], TicketFrame]:
+    """
+    Monta um lote de tickets a partir das tuplas extraídas
+    
+    Args:
+        linhas: Tuplas de _converter_linha
+        como_frame: Se True, monta um TicketFrame convertendo as datas por coluna
+        erros: Contagem de datas inválidas por coluna do CSV (atualizada)
+    
+    Returns:
+        Lista de Ticket ou TicketFrame
+    """
+    if como_frame:
+        import numpy as np
         
-        for encoding in encodings:
-            try:
-                with open(caminho, 'r', encoding=encoding) as f:
-                    import csv
-                    reader = csv.DictReader(f, delimiter=';')
-                    dados_brutos = list(reader)
-                logger.info(f"CSV lido com sucesso usando encoding: {encoding}")
-                break
-            except UnicodeDecodeError:
-                continue
+        # Montar as colunas diretamente, sem criar objetos Ticket
+        idxs, *colunas = zip(*linhas)
+        colunas = dict(zip(CAMPOS_TICKET[1:], colunas))
+        for campo, coluna_csv in zip(('data_abertura', 'data_fechamento'), COLUNAS_DATA_JIRA):
+            colunas[campo], invalidas = converter_coluna_datas(colunas[campo])
+            erros[coluna_csv] = erros.get(coluna_csv, 0) + invalidas
         
-        if not dados_brutos:
-            raise ValueError("Não foi possível ler o arquivo com nenhum dos encodings suportados")
+        # Criar IDs únicos
+        dias = np.char.replace(np.datetime_as_string(colunas['data_abertura'], unit='D'), '-', '')
+        colunas['ticket_id'] = [
+            f"JIRA-{dia if dia != 'NaT' else 'SEMDATA'}-{idx:04d}" for dia, idx in zip(dias.tolist(), idxs)
+        ]
+        return TicketFrame.from_colunas(colunas)
+    
+    tickets = []
+    for idx, titulo, descricao, tipologia, origem, componente, servidor, status, \
+            abertura_str, fechamento_str, responsavel, relator, prioridade in linhas:
+        data_abertura = converter_data_jira(abertura_str)
+        if data_abertura is None and abertura_str:
+            erros['Criado'] = erros.get('Criado', 0) + 1
+        data_fechamento = converter_data_jira(fechamento_str) if fechamento_str else None
+        if data_fechamento is None and fechamento_str:
+            erros['Atualizado(a)'] = erros.get('Atualizado(a)', 0) + 1
         
-        logger.info(f"Lidos {len(dados_brutos)} registros do Jira CSV")
+        # Criar ID único
+        dia = data_abertura.strftime('%Y%m%d') if data_abertura else 'SEMDATA'
+        tickets.append(Ticket(
+            f"JIRA-{dia}-{idx:04d}", titulo, descricao, tipologia, origem, componente, servidor,
+            status, data_abertura, data_fechamento, responsavel, relator, prioridade
+        ))
+    return tickets
+
+
+def iterar_jira_csv(
+    caminho: OrigemCSV,
+    tamanho_lote: Optional[int] = BATCH_SIZE,
+    como_frame: bool = False,
+    erros: Optional[Dict[str, int]] = None
+) -> Iterator[Union[List[Ticket], TicketFrame]]:
+    """
+    Lê o CSV do Jira em lotes, sem carregar o arquivo inteiro em memória
+    
+    Datas inválidas ficam como None/NaT e são contadas por coluna, com um
+    único aviso por coluna no final da leitura.
+    
+    Args:
+        caminho: Caminho do CSV do Jira, seu conteúdo em bytes ou arquivo binário aberto
+        tamanho_lote: Tickets por lote (None para um único lote)
+        como_frame: Se True, cada lote é um TicketFrame em vez de lista de Ticket
+        erros: Dicionário opcional que recebe {coluna: datas inválidas}
+    
+    Yields:
+        Lotes de tickets na ordem do arquivo
+    """
+    if erros is None:
+        erros = {}
+    
+    total = 0
+    descartadas = 0
+    # Etapa 'parse': leitura + decodificação + separação das colunas; 'normalizar_ms'
+    # é a parte gasta montando os lotes (datas, tickets). O consumo dos lotes não conta.
+    with etapa('parse', como_frame=como_frame) as medida, _abrir_csv(caminho) as f:
+        medida['encoding'] = f.encoding
         
-        tickets = []
+        # Ler CSV com delimitador de ponto e vírgula
+        reader = csv.DictReader(f, delimiter=';')
+        linhas = []
         
-        for idx, linha in enumerate(dados_brutos, 1):
+        for idx, linha in enumerate(reader, 1):
             try:
-                # Extrair dados
-                tipo_jira = linha.get('Tipo de item', '').strip()
-                componente = linha.get('Componentes', '').strip()
-                status = linha.get('Status', '').strip()
-                data_abertura_str = linha.get('Criado', '').strip()
-                data_atualizacao_str = linha.get('Atualizado(a)', '').strip()
-                
-                # Mapear valores
-                tipologia = mapear_tipologia(tipo_jira)
-                origem = obter_origem(componente)
-                data_abertura = converter_data(data_abertura_str)
-                data_fechamento = converter_data(data_atualizacao_str) if status.lower() == 'fechada' else None
-                
-                # Criar ID único
-                ticket_id = f"JIRA-{data_abertura.strftime('%Y%m%d')}-{idx:04d}"
-                
-                # Criar ticket
-                ticket = Ticket(
-                    ticket_id=ticket_id,
-                    titulo=f"{tipo_jira} - {componente}",
-                    descricao=f"{componente} - {status}",
-                    tipologia=tipologia,
-                    origem=origem,
-                    componente=componente,
-                    servidor=linha.get('Servidores / Cluster', '').strip(),
-                    status=status,
-                    data_abertura=data_abertura,
-                    data_fechamento=data_fechamento,
-                    responsavel=linha.get('Responsável', '').strip(),
-                    relator=linha.get('Relator', '').strip(),
-                    prioridade=linha.get('Prioridade', '').strip()
-                )
-                
-                tickets.append(ticket)
-            
+                linhas.append(_converter_linha(linha, idx))
             except Exception as e:
                 logger.error(f"Erro ao processar linha {idx}: {e}")
+                descartadas += 1
                 continue
+            
+            if tamanho_lote and len(linhas) >= tamanho_lote:
+                total += len(linhas)
+                with medida.cronometrar('normalizar_ms'):
+                    lote = _montar_lote(linhas, como_frame, erros)
+                with medida.suspensa():
+                    yield lote
+                linhas = []
+        
+        if linhas:
+            total += len(linhas)
+            with medida.cronometrar('normalizar_ms'):
+                lote = _montar_lote(linhas, como_frame, erros)
+            with medida.suspensa():
+                yield lote
+        
+        if medida:
+            medida['linhas'] = total
+            medida['bytes'] = _bytes_lidos(f)
+            medida['linhas_descartadas'] = descartadas
+            medida['datas_invalidas'] = dict(erros)
+    
+    for coluna, quantidade in erros.items():
+        if quantidade:
+            logger.warning(f"{quantidade} datas inválidas na coluna '{coluna}'")
+    logger.info(f"Convertidos {total} tickets com sucesso")
+
+
+def parser_jira_csv(
+    caminho: OrigemCSV,
+    como_frame: bool = False,
+    erros: Optional[Dict[str, int]] = None
+) -> Union[List[Ticket], TicketFrame]:
+    """
+    Parser específico para CSV do Jira
+    
+    Args:
+        caminho: Caminho do CSV do Jira, seu conteúdo em bytes ou arquivo binário aberto
+        como_frame: Se True, retorna um TicketFrame colunar em vez de objetos Ticket
+        erros: Dicionário opcional que recebe {coluna: datas inválidas}
+        
+    Returns:
+        Lista de objetos Ticket (ou TicketFrame)
+    """
+    try:
+        lotes = list(iterar_jira_csv(caminho, tamanho_lote=None, como_frame=como_frame, erros=erros))
+        
+        if not lotes:
+            raise ValueError("O arquivo não contém registros de tickets")
         
-        logger.info(f"Convertidos {len(tickets)} tickets com sucesso")
-        return tickets
+        return lotes[0]
     
     except Exception as e:
         logger.error(f"Erro ao fazer parser do Jira CSV: {e}")
@@ -0,0 +1,238 @@
+"""
+Métricas no formato de texto do Prometheus (sem dependências externas)
+
+Contadores, medidores e histogramas com rótulos, guardados em memória no
+processo e exportados por `Registro.formatar()` no formato de exposição
+0.0.4, que o Prometheus (ou um scrape local com curl) lê diretamente.
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites padrão dos histogramas de duração (segundos)
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escapar(valor: str) -> str:
+    """Escapa um valor de rótulo (barra invertida, aspas e quebra de linha)"""
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _numero(valor: float) -> str:
+    """Formata um valor como o Prometheus espera (+Inf, inteiros sem casas decimais)"""
+    if math.isinf(valor):
+        return '+Inf' if valor > 0 else '-Inf'
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+def _rotulos(nomes: Sequence[str], valores: Sequence[str], extra: str = '') -> str:
+    """Monta '{a="1",b="2"}' (vazio se não houver rótulos)"""
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+class _Metrica:
+    """Base das métricas: nome, ajuda, rótulos e valores por combinação de rótulos"""
+    
+    tipo = ''
+    
+    def __init__(self, nome: str, ajuda: str, rotulos: Iterable[str] = ()):
+        """
+        Inicializa a métrica
+        
+        Args:
+            nome: Nome da métrica (ex.: 'agt_parse_linhas_total')
+            ajuda: Descrição exibida no # HELP
+            rotulos: Nomes dos rótulos, na ordem usada na exportação
+        """
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        self._lock = threading.Lock()
+    
+    def _chave(self, rotulos: Dict[str, str]) -> Tuple[str, ...]:
+        if set(rotulos) != set(self.rotulos):
+            raise ValueError(f"{self.nome}: rótulos esperados {self.rotulos}, recebidos {tuple(rotulos)}")
+        return tuple(str(rotulos[n]) for n in self.rotulos)
+    
+    def _linhas(self) -> List[str]:
+        raise NotImplementedError
+    
+    def formatar(self) -> str:
+        """Bloco # HELP / # TYPE e as amostras da métrica"""
+        with self._lock:
+            amostras = self._linhas()
+        return '\n'.join([f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}", *amostras])
+
+
+class Contador(_Metrica):
+    """Valor que só aumenta (ex.: erros, linhas processadas)"""
+    
+    tipo = 'counter'
+    
+    def incrementar(self, valor: float = 1, **rotulos: str):
+        """Soma `valor` (>= 0) ao contador dos rótulos dados"""
+        if valor < 0:
+            raise ValueError(f"{self.nome}: contador não pode diminuir")
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+    
+    def _linhas(self) -> List[str]:
+        return [f"{self.nome}{_rotulos(self.rotulos, k)} {_numero(v)}" for k, v in sorted(self._valores.items())]
+
+
+class Medidor(Contador):
+    """Valor que sobe e desce (ex.: requisições em andamento, jobs na fila)"""
+    
+    tipo = 'gauge'
+    
+    def incrementar(self, valor: float = 1, **rotulos: str):
+        """Soma `valor` (pode ser negativo) ao medidor dos rótulos dados"""
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+    
+    def definir(self, valor: float, **rotulos: str):
+        """Define o valor atual do medidor"""
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = valor
+
+
+class Histograma(_Metrica):
+    """Distribuição de observações em faixas cumulativas (+ soma e contagem)"""
+    
+    tipo = 'histogram'
+    
+    def __init__(self, nome: str, ajuda: str, rotulos: Iterable[str] = (), buckets: Sequence[float] = BUCKETS_SEGUNDOS):
+        """
+        Inicializa o histograma
+        
+        Args:
+            nome: Nome da métrica
+            ajuda: Descrição exibida no # HELP
+            rotulos: Nomes dos rótulos
+            buckets: Limites superiores das faixas, em ordem crescente (+Inf é acrescentado)
+        """
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observar(self, valor: float, **rotulos: str):
+        """Registra uma observação"""
+        chave = self._chave(rotulos)
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            contagens, soma = self._valores.get(chave, ([0] * (len(self.buckets) + 1), 0.0))
+            contagens[indice] += 1
+            self._valores[chave] = (contagens, soma + valor)
+    
+    def _linhas(self) -> List[str]:
+        linhas = []
+        for chave, (contagens, soma) in sorted(self._valores.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + (math.inf,), contagens):
+                acumulado += contagem
+                le = f'le="{_numero(limite)}"'
+                linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos, chave, le)} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {_numero(soma)}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, chave)} {acumulado}")
+        return linhas
+
+
+class Registro:
+    """Conjunto de métricas exportadas juntas"""
+    
+    def __init__(self):
+        """Inicializa o registro vazio"""
+        self._metricas: Dict[str, _Metrica] = {}
+    
+    def adicionar(self, metrica: _Metrica) -> _Metrica:
+        """Registra a métrica (nomes repetidos são recusados) e a retorna"""
+        if metrica.nome in self._metricas:
+            raise ValueError(f"Métrica já registrada: {metrica.nome}")
+        self._metricas[metrica.nome] = metrica
+        return metrica
+    
+    def contador(self, nome: str, ajuda: str, rotulos: Iterable[str] = ()) -> Contador:
+        """Cria e registra um Contador"""
+        return self.adicionar(Contador(nome, ajuda, rotulos))
+    
+    def medidor(self, nome: str, ajuda: str, rotulos: Iterable[str] = ()) -> Medidor:
+        """Cria e registra um Medidor"""
+        return self.adicionar(Medidor(nome, ajuda, rotulos))
+    
+    def histograma(
+        self,
+        nome: str,
+        ajuda: str,
+        rotulos: Iterable[str] = (),
+        buckets: Sequence[float] = BUCKETS_SEGUNDOS
+    ) -> Histograma:
+        """Cria e registra um Histograma"""
+        return self.adicionar(Histograma(nome, ajuda, rotulos, buckets))
+    
+    def formatar(self) -> str:
+        """Todas as métricas no formato de exposição de texto"""
+        return '\n'.join(m.formatar() for m in self._metricas.values()) + '\n'
+
+
+class MedirRequisicoes:
+    """
+    Middleware ASGI que mede a latência e as requisições HTTP em andamento
+    
+    O endpoint é o caminho da rota (ex.: '/jobs/{job_id}'), e não a URL,
+    para que ids e nomes de arquivo não criem uma série por requisição.
+    """
+    
+    def __init__(self, app, latencia: Histograma, em_andamento: Optional[Medidor] = None):
+        """
+        Inicializa o middleware
+        
+        Args:
+            app: Aplicação ASGI
+            latencia: Histograma com os rótulos ('metodo', 'endpoint', 'status')
+            em_andamento: Medidor sem rótulos das requisições em andamento
+        """
+        self.app = app
+        self.latencia = latencia
+        self.em_andamento = em_andamento
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem['type'] == 'http.response.start':
+                status = mensagem['status']
+            await send(mensagem)
+        
+        inicio = time.perf_counter()
+        if self.em_andamento is not None:
+            self.em_andamento.incrementar(1)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            if self.em_andamento is not None:
+                self.em_andamento.incrementar(-1)
+            rota = scope.get('route')
+            self.latencia.observar(
+                time.perf_counter() - inicio,
+                metodo=scope['method'],
+                endpoint=getattr(rota, 'path', 'nao_encontrado'),
+                status=str(status)
+            )
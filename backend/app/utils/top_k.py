@@ -0,0 +1,86 @@
+"""
+Seleção dos K maiores (top-K) sobre contagens por chave
+"""
+
+import heapq
+import itertools
+from typing import Any, Hashable, Iterable, List, Optional, Tuple
+
+
+def _ordem(par: Tuple[Any, int]) -> Tuple[int, str]:
+    """Maior contagem primeiro; empates pela chave em ordem crescente (None como '')"""
+    chave, contagem = par
+    return -contagem, '' if chave is None else str(chave)
+
+
+def top_k(pares: Iterable[Tuple[Any, int]], k: Optional[int] = 10) -> List[Tuple[Any, int]]:
+    """
+    Seleciona os k pares (chave, contagem) de maior contagem
+    
+    Usa um heap de tamanho k (O(n log k)) em vez de ordenar todas as chaves.
+    O desempate pela chave torna o resultado independente da ordem de entrada.
+    
+    Args:
+        pares: Pares (chave, contagem), percorridos uma única vez
+        k: Quantidade de pares (None para todos, ordenados)
+    
+    Returns:
+        Lista de pares do maior para o menor
+    """
+    if k is None:
+        return sorted(pares, key=_ordem)
+    return heapq.nsmallest(k, pares, key=_ordem)
+
+
+class SpaceSaving:
+    """
+    Contagem aproximada dos mais frequentes com memória limitada (Space-Saving)
+    
+    Guarda no máximo `capacidade` chaves. Uma chave nova substitui a de menor
+    contagem e herda essa contagem (o erro máximo da chave). Toda chave com
+    frequência real maior que total/capacidade está garantidamente presente.
+    """
+    
+    def __init__(self, capacidade: int = 1000):
+        """
+        Inicializa o contador
+        
+        Args:
+            capacidade: Máximo de chaves monitoradas
+        """
+        self.capacidade = capacidade
+        self.contagens = {}
+        self.erros = {}
+        self._heap = []
+        self._sequencia = itertools.count()
+    
+    def adicionar(self, chave: Hashable, peso: int = 1):
+        """Conta uma ocorrência (ou `peso` ocorrências) da chave"""
+        if chave in self.contagens:
+            self.contagens[chave] += peso
+        elif len(self.contagens) < self.capacidade:
+            self.contagens[chave] = peso
+            self.erros[chave] = 0
+        else:
+            menor, _ = self._remover_menor()
+            self.contagens[chave] = menor + peso
+            self.erros[chave] = menor
+        
+        # Entradas antigas da chave no heap ficam obsoletas e são descartadas na remoção
+        heapq.heappush(self._heap, (self.contagens[chave], next(self._sequencia), chave))
+        if len(self._heap) > 4 * self.capacidade:
+            self._heap = [(c, next(self._sequencia), k) for k, c in self.contagens.items()]
+            heapq.heapify(self._heap)
+    
+    def _remover_menor(self) -> Tuple[int, Hashable]:
+        """Remove a chave de menor contagem e retorna (contagem, chave)"""
+        while True:
+            contagem, _, chave = heapq.heappop(self._heap)
+            if self.contagens.get(chave) == contagem:
+                del self.contagens[chave]
+                del self.erros[chave]
+                return contagem, chave
+    
+    def top(self, k: Optional[int] = 10) -> List[Tuple[Any, int]]:
+        """Retorna os k pares (chave, contagem estimada) de maior contagem"""
+        return top_k(self.contagens.items(), k)
@@ -0,0 +1,248 @@
+"""
+Recebimento de uploads em streaming, com limite de tamanho
+
+O corpo da requisição é repassado em blocos a um leitor em outra thread
+(o parser do CSV) enquanto ainda está chegando. O hash é calculado no caminho,
+e arquivos grandes demais ou com cabeçalho inválido são recusados no primeiro
+bloco, sem esperar o upload terminar. Se o leitor parar antes do fim (ex.: erro
+no CSV), os blocos seguintes são descartados em vez de esperar por ele.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import queue
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional
+
+# Blocos aguardando o parser antes de o recebimento esperar (contrapressão)
+BLOCOS_EM_ESPERA = 16
+
+# Espera máxima (s) de cada tentativa de entregar um bloco com a fila cheia;
+# entre as tentativas verifica-se se o leitor ainda está lendo
+ESPERA_ENTREGA = 0.5
+
+# Quantidade de bytes acumulados para validar o início do arquivo
+TAMANHO_INICIO = 64 * 1024
+
+_FIM = object()
+
+
+def _mensagem_limite(tamanho_maximo: int) -> str:
+    return f"Upload maior que o limite de {tamanho_maximo // (1024 * 1024)} MB"
+
+
+class UploadRejeitadoError(ValueError):
+    """Upload recusado; `status` é o código HTTP da resposta (400 ou 413)"""
+    
+    def __init__(self, mensagem: str, status: int = 400):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class FluxoUpload(io.RawIOBase):
+    """
+    Arquivo binário somente leitura alimentado em blocos por outra thread
+    
+    O leitor (parser) é iniciado com `iniciar_leitor` e lê como de um arquivo
+    comum, bloqueando até o próximo bloco; o recebimento chama `alimentar` a
+    cada bloco e `finalizar` no fim.
+    """
+    
+    def __init__(self, tamanho_maximo: int, validar_inicio: Optional[Callable[[bytes], None]] = None):
+        """
+        Inicializa o fluxo
+        
+        Args:
+            tamanho_maximo: Tamanho máximo em bytes (acima dele, erro 413)
+            validar_inicio: Função chamada com o início do arquivo; deve lançar
+                ValueError se o conteúdo for inválido
+        """
+        super().__init__()
+        self.tamanho_maximo = tamanho_maximo
+        self.tamanho = 0
+        self._validar_inicio = validar_inicio
+        self._inicio = b''
+        self._md5 = hashlib.md5()
+        self._fila = queue.Queue(BLOCOS_EM_ESPERA)
+        self._pendente = b''
+        self._erro = None
+        self._terminou = False
+        self._leitor: Optional[asyncio.Future] = None
+    
+    @property
+    def hash(self) -> str:
+        """MD5 do conteúdo recebido (o mesmo de hash_conteudo sobre o arquivo inteiro)"""
+        return self._md5.hexdigest()
+    
+    def readable(self) -> bool:
+        return True
+    
+    def _registrar(self, bloco: bytes):
+        """Conta o tamanho, atualiza o hash e valida o início do arquivo"""
+        self.tamanho += len(bloco)
+        if self.tamanho > self.tamanho_maximo:
+            raise UploadRejeitadoError(_mensagem_limite(self.tamanho_maximo), status=413)
+        self._md5.update(bloco)
+        
+        if self._validar_inicio is not None:
+            self._inicio += bloco
+            if b'\n' in self._inicio or len(self._inicio) >= TAMANHO_INICIO:
+                self._validar_agora()
+    
+    def _validar_agora(self):
+        validar, self._validar_inicio = self._validar_inicio, None
+        try:
+            validar(self._inicio)
+        except ValueError as e:
+            raise UploadRejeitadoError(str(e)) from e
+        finally:
+            self._inicio = b''
+    
+    def iniciar_leitor(self, executor: Executor, funcao: Callable[..., Any], *args) -> asyncio.Future:
+        """
+        Executa o leitor `funcao(self, *args)` no executor
+        
+        O executor deve ser só dos leitores: cada leitor fica bloqueado enquanto
+        o upload chega e, no executor padrão, poderia ocupar as threads de que a
+        entrega dos blocos (asyncio.to_thread) depende.
+        
+        Args:
+            executor: Executor dos leitores de upload
+            funcao: Leitor, que recebe este fluxo como primeiro argumento
+            *args: Demais argumentos do leitor
+        
+        Returns:
+            Future com o resultado do leitor
+        """
+        self._leitor = asyncio.get_running_loop().run_in_executor(executor, funcao, self, *args)
+        return self._leitor
+    
+    def _lendo(self) -> bool:
+        """Indica se o leitor ainda consome a fila (não terminou nem foi abortado)"""
+        return self._erro is None and not (self._leitor is not None and self._leitor.done())
+    
+    async def _entregar(self, item) -> bool:
+        """Põe um item na fila; desiste (False) se o leitor parar de ler"""
+        try:
+            self._fila.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        
+        # Espera em tentativas curtas: um leitor que morreu com a fila cheia não a esvazia mais
+        while self._lendo():
+            try:
+                await asyncio.to_thread(self._fila.put, item, True, ESPERA_ENTREGA)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    async def alimentar(self, bloco: bytes) -> bool:
+        """
+        Entrega um bloco ao leitor (espera sem bloquear o event loop se o leitor estiver atrasado)
+        
+        Returns:
+            False se o leitor já parou de ler; o bloco é descartado e o
+            resultado (ou o erro) do leitor diz o que houve
+        """
+        if not bloco:
+            return self._lendo()
+        self._registrar(bloco)
+        return await self._entregar(bloco)
+    
+    async def finalizar(self):
+        """Sinaliza o fim do upload (nada a fazer se o leitor já parou)"""
+        if self._validar_inicio is not None:
+            self._validar_agora()
+        await self._entregar(_FIM)
+    
+    def abortar(self, erro: Exception):
+        """Interrompe o leitor com o erro informado"""
+        self._erro = erro
+        try:
+            self._fila.put_nowait(_FIM)
+        except queue.Full:
+            pass
+    
+    def readinto(self, destino) -> int:
+        if not self._pendente and not self._terminou:
+            bloco = self._fila.get()
+            if self._erro is not None:
+                raise self._erro
+            if bloco is _FIM:
+                self._terminou = True
+            else:
+                self._pendente = bloco
+        
+        n = min(len(destino), len(self._pendente))
+        destino[:n] = self._pendente[:n]
+        self._pendente = self._pendente[n:]
+        return n
+
+
+class LimiteTamanhoRequisicao:
+    """
+    Middleware ASGI que recusa (413) corpos acima do limite
+    
+    Usa o Content-Length quando informado, antes de ler o corpo; sem ele,
+    conta os bytes recebidos e interrompe a leitura ao passar do limite
+    (inclusive quando o parser de formulário transforma o erro em 400).
+    """
+    
+    def __init__(self, app, tamanho_maximo: int):
+        self.app = app
+        self.tamanho_maximo = tamanho_maximo
+    
+    async def _recusar(self, send):
+        corpo = json.dumps({"detail": _mensagem_limite(self.tamanho_maximo)}).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(corpo)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': corpo})
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        
+        tamanho = dict(scope['headers']).get(b'content-length')
+        if tamanho is not None and tamanho.isdigit() and int(tamanho) > self.tamanho_maximo:
+            return await self._recusar(send)
+        
+        recebido = 0
+        excedeu = False
+        iniciou = False
+        substituida = False
+        
+        async def receive_limitado():
+            nonlocal recebido, excedeu
+            mensagem = await receive()
+            if mensagem['type'] == 'http.request':
+                recebido += len(mensagem.get('body', b''))
+                if recebido > self.tamanho_maximo:
+                    excedeu = True
+                    raise UploadRejeitadoError(_mensagem_limite(self.tamanho_maximo), status=413)
+            return mensagem
+        
+        async def send_registrado(mensagem):
+            nonlocal iniciou, substituida
+            if substituida:
+                return
+            if excedeu and not iniciou:
+                # A resposta de erro da aplicação é trocada pelo 413
+                substituida = iniciou = True
+                await self._recusar(send)
+                return
+            iniciou = iniciou or mensagem['type'] == 'http.response.start'
+            await send(mensagem)
+        
+        try:
+            await self.app(scope, receive_limitado, send_registrado)
+        except UploadRejeitadoError:
+            if iniciou:
+                raise
+            await self._recusar(send)
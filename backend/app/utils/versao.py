@@ -0,0 +1,91 @@
+"""
+Versão do sistema (data e hash do commit), resolvida uma vez por processo
+
+A versão vem do módulo gerado no build (app/_versao_build.py, escrito por
+`gravar_versao()`); sem ele, de um único `git log` na primeira chamada; e,
+sem git, da data local. O resultado fica em cache: o rodapé das páginas, a
+raiz da API e /metrics não criam processos a cada requisição.
+"""
+
+import functools
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Tuple
+
+# backend/app/_versao_build.py (fora do controle de versão)
+ARQUIVO_GERADO = Path(__file__).resolve().parent.parent / "_versao_build.py"
+_RAIZ_REPOSITORIO = ARQUIVO_GERADO.parents[2]
+
+
+def _ler_git() -> Tuple[str, str]:
+    """
+    Lê o hash curto e a data do último commit com um único subprocesso
+    
+    Returns:
+        Tupla (hash curto, data 'AAAA-MM-DD')
+    """
+    saida = subprocess.check_output(
+        ['git', 'log', '-1', '--format=%h %ai'],
+        cwd=_RAIZ_REPOSITORIO,
+        stderr=subprocess.DEVNULL,
+        timeout=5
+    ).decode('utf-8').split()
+    if len(saida) < 2:
+        raise ValueError("git log sem commits")
+    return saida[0], saida[1]
+
+
+@functools.lru_cache(maxsize=None)
+def _resolver() -> Tuple[str, str, str]:
+    """Resolve (commit, data, origem) na primeira chamada do processo"""
+    try:
+        from .._versao_build import COMMIT, DATA
+        return COMMIT, DATA, 'build'
+    except ImportError:
+        pass
+    
+    try:
+        commit, data = _ler_git()
+        return commit, data, 'git'
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return 'local', datetime.now().strftime('%Y-%m-%d'), 'local'
+
+
+def obter_versao() -> Dict[str, str]:
+    """
+    Metadados da versão do processo
+    
+    Returns:
+        Dicionário com 'versao' (ex.: 'v2025-01-31 (a1b2c3d)'), 'commit',
+        'data' e 'origem' ('build', 'git' ou 'local')
+    """
+    commit, data, origem = _resolver()
+    return {'versao': f"v{data} ({commit})", 'commit': commit, 'data': data, 'origem': origem}
+
+
+def versao_texto() -> str:
+    """Versão para exibição (ex.: 'v2025-01-31 (a1b2c3d)')"""
+    return obter_versao()['versao']
+
+
+def gravar_versao(destino: Path = ARQUIVO_GERADO) -> Path:
+    """
+    Grava a versão atual do git num módulo Python, para imagens e deploys sem git
+    
+    Args:
+        destino: Arquivo gerado (padrão: app/_versao_build.py)
+    
+    Returns:
+        Path do arquivo gravado
+    """
+    commit, data = _ler_git()
+    destino = Path(destino)
+    destino.write_text(
+        '"""Versão gravada no build por `python version.py --gravar` (não editar)"""\n'
+        '\n'
+        f'COMMIT = {commit!r}\n'
+        f'DATA = {data!r}\n',
+        encoding='utf-8'
+    )
+    return destino
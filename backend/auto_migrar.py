@@ -1,145 +1,425 @@
 """
 Função auxiliar para migração automática de CSV para PostgreSQL
 Integrada ao dashboard para sincronizar automaticamente após upload
+
+Os tickets normalizados são enviados em um único COPY FROM STDIN para uma
+tabela temporária e aplicados em `tickets` na mesma transação: em caso de
+erro nada é alterado e os leitores nunca veem a tabela pela metade.
+
+Depois de aplicar os tickets, a mesma transação recalcula os rollups
+mensais (backend.rollups) lidos pelos dashboards.
+
+Modos:
+- 'incremental' (padrão): insere/atualiza só as linhas novas ou alteradas
+  (pela chave natural e hash do conteúdo) e remove as que sumiram do CSV;
+- 'completo': substitui todo o conteúdo da tabela.
 """
 
+import io
+import hashlib
 import pandas as pd
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Tuple, Dict
+from typing import Iterator, List, Optional, Tuple, Dict
+
+from app.utils.instrumentacao import etapa, medir
+from backend.rollups import SQL_GARANTIR_TABELAS_ROLLUP, sql_atualizar_rollups, sql_marcar_meses
 
 logger = logging.getLogger(__name__)
 
 
-def converter_data_postgres(data_str):
-    """Converte data de DD/MM/YYYY HH:MM para YYYY-MM-DD HH:MM:SS"""
-    if not data_str or pd.isna(data_str):
-        return None
+# Colunas de `tickets` preenchidas a partir do CSV (na ordem do COPY)
+COLUNAS_TICKETS = [
+    'tipo_item', 'responsavel', 'relator', 'componente', 'prioridade',
+    'status', 'data_criacao', 'data_atualizacao', 'servidor_cluster'
+]
+
+# Colunas de texto: vazio vira '' (e não NULL) no COPY
+COLUNAS_TEXTO = [c for c in COLUNAS_TICKETS if not c.startswith('data_')]
+
+# Campos que não mudam ao longo da vida do ticket (o export não traz a chave do Jira)
+COLUNAS_CHAVE_NATURAL = ['tipo_item', 'relator', 'data_criacao']
+
+# Colunas enviadas no COPY: as do CSV + chave natural e hash do conteúdo
+COLUNAS_COPY = COLUNAS_TICKETS + ['chave_natural', 'hash_conteudo']
+
+# Colunas de controle da sincronização incremental (idempotente, fora da transação)
+SQL_GARANTIR_COLUNAS_SYNC = [
+    "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS chave_natural VARCHAR(32);",
+    "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS hash_conteudo VARCHAR(32);",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_chave_natural ON tickets (chave_natural);",
+]
+
+# Índices compostos das consultas dos dashboards (mesmos de models.Ticket.__table_args__)
+SQL_GARANTIR_INDICES = [
+    "CREATE INDEX IF NOT EXISTS idx_tickets_data_status ON tickets (data_criacao, status) "
+    "INCLUDE (componente, servidor_cluster, responsavel, tipo_item, relator);",
+    "CREATE INDEX IF NOT EXISTS idx_tickets_servidor_status ON tickets (servidor_cluster, status);",
+    "CREATE INDEX IF NOT EXISTS idx_tickets_componente_status ON tickets (componente, status);",
+]
+
+MODOS_CARGA = ('incremental', 'completo')
+
+# Meses cujos rollups a carga incremental recalcula (lido antes de aplicar a staging):
+# os de tickets inseridos, alterados (data antiga e nova) ou removidos, e os
+# meses do CSV que ainda não têm Snapshot
+SQL_MESES_ALTERADOS = (
+    "SELECT date_trunc('month', v.data_criacao)::date AS mes_ref"
+    " FROM tickets_staging s FULL JOIN tickets t ON t.chave_natural = s.chave_natural"
+    " CROSS JOIN LATERAL (VALUES (s.data_criacao), (t.data_criacao)) AS v (data_criacao)"
+    " WHERE v.data_criacao IS NOT NULL AND (s.chave_natural IS NULL OR t.chave_natural IS NULL"
+    " OR t.hash_conteudo IS DISTINCT FROM s.hash_conteudo)"
+    " UNION SELECT date_trunc('month', s.data_criacao)::date FROM tickets_staging s"
+    " WHERE s.data_criacao IS NOT NULL AND NOT EXISTS (SELECT 1 FROM snapshots n"
+    " WHERE n.data_snapshot = date_trunc('month', s.data_criacao)::date)"
+)
+
+# Coluna de `tickets` -> nomes possíveis no CSV do Jira
+MAPA_COLUNAS_CSV = {
+    'tipo_item': ('Tipo de item',),
+    'responsavel': ('Responsável', 'Responsavel'),
+    'relator': ('Relator',),
+    'componente': ('Componentes',),
+    'prioridade': ('Prioridade',),
+    'status': ('Status',),
+    'servidor_cluster': ('Servidores / Cluster',),
+}
+
+# Linhas convertidas para CSV por vez ao enviar o COPY
+LINHAS_POR_BLOCO_COPY = 50000
+
+
+def ler_csv_normalizado(csv_path: Path) -> pd.DataFrame:
+    """
+    Lê o CSV do Jira e normaliza para as colunas da tabela `tickets`
+    
+    Args:
+        csv_path: Caminho do arquivo CSV
+    
+    Returns:
+        DataFrame com as colunas de COLUNAS_TICKETS (datas já no formato do PostgreSQL)
+    """
+    from app.utils.jira_parser import detectar_encoding, TAMANHO_AMOSTRA_ENCODING
+    from app.utils.date_parser import formatar_datas_postgres
+    
+    with open(csv_path, 'rb') as f:
+        encoding = detectar_encoding(f.read(TAMANHO_AMOSTRA_ENCODING))
+    
+    df = pd.read_csv(
+        csv_path, sep=';', dtype=str, keep_default_na=False,
+        encoding=encoding, encoding_errors='jira_latin1'
+    )
+    
+    normalizado = pd.DataFrame(index=df.index)
+    for coluna, nomes_csv in MAPA_COLUNAS_CSV.items():
+        nome = next((n for n in nomes_csv if n in df.columns), None)
+        normalizado[coluna] = df[nome].str.strip() if nome else ''
+    
+    vazio = pd.Series('', index=df.index)
+    normalizado['data_criacao'] = formatar_datas_postgres(df.get('Criado', vazio))
+    normalizado['data_atualizacao'] = formatar_datas_postgres(df.get('Atualizado(a)', vazio))
+    
+    return normalizado[COLUNAS_TICKETS]
+
+
+def _md5(partes: pd.DataFrame) -> List[str]:
+    """Hash MD5 (hex) de cada linha, com os campos unidos por um separador"""
+    textos = partes.fillna('').astype(str)
+    textos = textos.iloc[:, 0].str.cat(textos.iloc[:, 1:], sep='\x1f')
+    return [hashlib.md5(t.encode('utf-8')).hexdigest() for t in textos]
+
+
+def calcular_chaves(tickets: pd.DataFrame) -> pd.DataFrame:
+    """
+    Acrescenta a chave natural e o hash do conteúdo de cada ticket
+    
+    A chave usa os campos imutáveis (COLUNAS_CHAVE_NATURAL) mais a ordem de
+    ocorrência entre linhas iguais nesses campos, para que tickets criados no
+    mesmo minuto pelo mesmo relator continuem distintos.
+    
+    Args:
+        tickets: DataFrame normalizado (ler_csv_normalizado)
+    
+    Returns:
+        Cópia do DataFrame com as colunas de COLUNAS_COPY
+    """
+    tickets = tickets.copy()
+    campos = tickets[COLUNAS_CHAVE_NATURAL].fillna('')
+    ocorrencia = campos.groupby(COLUNAS_CHAVE_NATURAL, sort=False).cumcount()
+    tickets['chave_natural'] = _md5(campos.assign(ocorrencia=ocorrencia))
+    tickets['hash_conteudo'] = _md5(tickets[COLUNAS_TICKETS])
+    return tickets[COLUNAS_COPY]
+
+
+def _blocos_csv(tickets: pd.DataFrame) -> Iterator[str]:
+    """Gera o conteúdo do COPY (CSV sem cabeçalho) em blocos de linhas"""
+    for inicio in range(0, len(tickets), LINHAS_POR_BLOCO_COPY):
+        bloco = tickets.iloc[inicio:inicio + LINHAS_POR_BLOCO_COPY]
+        yield bloco.to_csv(index=False, header=False, lineterminator='\n')
+
+
+def _sql_criar_staging() -> str:
+    """Tabela temporária com as colunas do COPY (descartada no COMMIT)"""
+    colunas = ', '.join(COLUNAS_COPY)
+    return (
+        "CREATE TEMP TABLE tickets_staging ON COMMIT DROP AS "
+        f"SELECT {colunas} FROM tickets WITH NO DATA;"
+    )
+
+
+def _sql_copy() -> str:
+    """COPY do CSV para a tabela temporária"""
+    colunas = ', '.join(COLUNAS_COPY)
+    texto = ', '.join(COLUNAS_TEXTO)
+    return f"COPY tickets_staging ({colunas}) FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL ({texto}));"
+
+
+def _sql_aplicar(modo: str) -> List[str]:
+    """
+    Comandos que aplicam a tabela temporária em `tickets`
+    
+    O primeiro comando que retorna linhas devolve (inseridos, atualizados,
+    removidos); o último devolve o total de tickets após a carga. Os
+    comandos dos rollups mensais não retornam linhas: no modo incremental,
+    só os meses com tickets inseridos, alterados ou removidos (e os que
+    ainda não têm Snapshot) são recalculados.
+    
+    Args:
+        modo: 'incremental' ou 'completo'
+    
+    Returns:
+        Lista de comandos SQL
+    """
+    colunas = ', '.join(COLUNAS_COPY)
+    
+    if modo == 'completo':
+        return [
+            "SELECT (SELECT COUNT(*) FROM tickets_staging), 0, (SELECT COUNT(*) FROM tickets);",
+            "TRUNCATE tickets;",
+            f"INSERT INTO tickets ({colunas}, criado_em, atualizado_em) "
+            f"SELECT {colunas}, NOW(), NOW() FROM tickets_staging;",
+            "SELECT COUNT(*) FROM tickets;",
+        ] + sql_marcar_meses() + sql_atualizar_rollups()
+    
+    atualizacoes = ', '.join(f"{c} = EXCLUDED.{c}" for c in COLUNAS_TICKETS + ['hash_conteudo'])
+    return sql_marcar_meses(SQL_MESES_ALTERADOS) + [
+        # Remoções e upserts atingem linhas disjuntas, então podem ir no mesmo comando
+        "WITH removidos AS ("
+        " DELETE FROM tickets t WHERE t.chave_natural IS NULL OR NOT EXISTS"
+        " (SELECT 1 FROM tickets_staging s WHERE s.chave_natural = t.chave_natural)"
+        " RETURNING 1"
+        "), gravados AS ("
+        f" INSERT INTO tickets ({colunas}, criado_em, atualizado_em)"
+        f" SELECT {colunas}, NOW(), NOW() FROM tickets_staging"
+        f" ON CONFLICT (chave_natural) DO UPDATE SET {atualizacoes}, atualizado_em = NOW()"
+        " WHERE tickets.hash_conteudo IS DISTINCT FROM EXCLUDED.hash_conteudo"
+        " RETURNING (xmax = 0) AS inserido"
+        ") SELECT"
+        " (SELECT COUNT(*) FROM gravados WHERE inserido),"
+        " (SELECT COUNT(*) FROM gravados WHERE NOT inserido),"
+        " (SELECT COUNT(*) FROM removidos);",
+        "SELECT COUNT(*) FROM tickets;",
+    ] + sql_atualizar_rollups()
+
+
+def _montar_resultado(linhas: List[Tuple]) -> Dict:
+    """Monta o resultado da carga a partir das linhas retornadas pelos comandos"""
+    inseridos, atualizados, removidos = (int(v) for v in linhas[0])
+    return {
+        'inseridos': inseridos,
+        'atualizados': atualizados,
+        'removidos': removidos,
+        'total_banco': int(linhas[-1][0]),
+    }
+
+
+def carregar_via_psycopg2(tickets: pd.DataFrame, database_url: str, modo: str = 'incremental') -> Dict:
+    """
+    Aplica os tickets em `tickets` usando uma conexão direta (copy_expert)
+    
+    Args:
+        tickets: DataFrame com as colunas de COLUNAS_COPY (calcular_chaves)
+        database_url: URL de conexão do PostgreSQL
+        modo: 'incremental' ou 'completo'
+    
+    Returns:
+        Dict com inseridos, atualizados, removidos e total_banco
+    """
+    import psycopg2
+    
+    buffer = io.BytesIO()
+    for bloco in _blocos_csv(tickets):
+        buffer.write(bloco.encode('utf-8'))
+    buffer.seek(0)
+    
+    conn = psycopg2.connect(database_url)
     try:
-        dt = datetime.strptime(str(data_str).strip(), "%d/%m/%Y %H:%M")
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
-    except:
-        return None
+        conn.set_client_encoding('UTF8')
+        
+        with conn, conn.cursor() as cur:
+            for sql in SQL_GARANTIR_COLUNAS_SYNC + SQL_GARANTIR_INDICES + SQL_GARANTIR_TABELAS_ROLLUP:
+                cur.execute(sql)
+        
+        # `with conn` faz COMMIT no sucesso e ROLLBACK em qualquer erro
+        linhas = []
+        with conn, conn.cursor() as cur:
+            cur.execute(_sql_criar_staging())
+            cur.copy_expert(_sql_copy(), buffer)
+            for sql in _sql_aplicar(modo):
+                cur.execute(sql)
+                if cur.description is not None:
+                    linhas.append(cur.fetchone())
+        return _montar_resultado(linhas)
+    finally:
+        conn.close()
 
 
-def migrar_csv_para_banco(csv_path: Path) -> Tuple[bool, Dict]:
+def carregar_via_ssh(tickets: pd.DataFrame, tunnel, container_id: str, modo: str = 'incremental') -> Dict:
+    """
+    Aplica os tickets em `tickets` com um único psql no container (via SSH)
+    
+    O script (comandos + dados do COPY) é enviado pelo stdin de um só canal
+    SSH; com ON_ERROR_STOP o psql aborta no primeiro erro e a transação é
+    desfeita.
+    
+    Args:
+        tickets: DataFrame com as colunas de COLUNAS_COPY (calcular_chaves)
+        tunnel: SSHTunnelManager já conectado
+        container_id: ID do container PostgreSQL
+        modo: 'incremental' ou 'completo'
+    
+    Returns:
+        Dict com inseridos, atualizados, removidos e total_banco
+    """
+    from backend.ssh_tunnel import POSTGRES_USER, POSTGRES_DB
+    
+    cmd = f"docker exec -i {container_id} psql -U {POSTGRES_USER} -d {POSTGRES_DB} -v ON_ERROR_STOP=1 -q -t -A"
+    ssh_stdin, ssh_stdout, ssh_stderr = tunnel.ssh_client.exec_command(cmd)
+    
+    # Os dados do COPY são enviados em UTF-8, qualquer que seja o padrão do servidor
+    preparacao = '\n'.join(
+        ["SET client_encoding TO 'UTF8';"]
+        + SQL_GARANTIR_COLUNAS_SYNC + SQL_GARANTIR_INDICES + SQL_GARANTIR_TABELAS_ROLLUP
+    )
+    ssh_stdin.write(f"{preparacao}\nBEGIN;\n{_sql_criar_staging()}\n{_sql_copy()}\n".encode('utf-8'))
+    for bloco in _blocos_csv(tickets):
+        ssh_stdin.write(bloco.encode('utf-8'))
+    aplicar = '\n'.join(_sql_aplicar(modo))
+    ssh_stdin.write(f"\\.\n{aplicar}\nCOMMIT;\n".encode('utf-8'))
+    ssh_stdin.channel.shutdown_write()
+    
+    output = ssh_stdout.read().decode()
+    stderr = ssh_stderr.read().decode()
+    if ssh_stdout.channel.recv_exit_status() != 0:
+        raise RuntimeError(f"Erro ao carregar tickets: {stderr.strip()}")
+    
+    # Com -t -A cada linha retornada vem como "v1|v2|..."
+    linhas = [tuple(l.split('|')) for l in output.splitlines() if l.strip()]
+    return _montar_resultado(linhas)
+
+
+def executar_via_ssh(tunnel, container_id: str, comandos: List[str]) -> None:
+    """
+    Executa comandos SQL numa única transação com um psql no container (via SSH)
+    
+    Usado pelos scripts que alteram `tickets` fora da carga para recalcular
+    os rollups na mesma transação (ex.: DELETE + sql_recalcular_rollups).
+    
+    Args:
+        tunnel: SSHTunnelManager já conectado
+        container_id: ID do container PostgreSQL
+        comandos: Lista de comandos SQL
+    
+    Raises:
+        RuntimeError: se algum comando falhar (nada é alterado)
+    """
+    from backend.ssh_tunnel import POSTGRES_USER, POSTGRES_DB
+    
+    cmd = f"docker exec -i {container_id} psql -U {POSTGRES_USER} -d {POSTGRES_DB} -v ON_ERROR_STOP=1 -q -t -A"
+    ssh_stdin, ssh_stdout, ssh_stderr = tunnel.ssh_client.exec_command(cmd)
+    script = '\n'.join(comandos)
+    ssh_stdin.write(f"BEGIN;\n{script}\nCOMMIT;\n".encode('utf-8'))
+    ssh_stdin.channel.shutdown_write()
+    
+    ssh_stdout.read()
+    stderr = ssh_stderr.read().decode()
+    if ssh_stdout.channel.recv_exit_status() != 0:
+        raise RuntimeError(f"Erro ao executar comandos: {stderr.strip()}")
+
+
+@medir('ingestao')
+def migrar_csv_para_banco(
+    csv_path: Path,
+    database_url: Optional[str] = None,
+    modo: str = 'incremental'
+) -> Tuple[bool, Dict]:
     """
     Migra um CSV para PostgreSQL automaticamente
     
     Args:
         csv_path: Caminho do arquivo CSV
+        database_url: URL para conexão direta; se None, usa o container via SSH
+        modo: 'incremental' (upsert das diferenças) ou 'completo' (substitui tudo)
         
     Returns:
         (sucesso: bool, resultado: dict com status e contagem)
     """
+    if modo not in MODOS_CARGA:
+        raise ValueError(f"Modo de carga inválido: {modo}")
+    
     try:
-        from backend.ssh_tunnel import SSHTunnelManager
-        
-        # Ler CSV
-        try:
-            df = pd.read_csv(csv_path, sep=';', encoding='latin-1')
-        except:
-            df = pd.read_csv(csv_path, sep=';', encoding='utf-8')
-        
-        total_linhas = len(df)
-        
-        # Normalizar dados
-        tickets = []
-        for idx, row in df.iterrows():
-            ticket = {
-                'tipo_item': str(row.get('Tipo de item', '')).strip(),
-                'responsavel': str(row.get('Responsavel', '')).strip(),
-                'relator': str(row.get('Relator', '')).strip(),
-                'componente': str(row.get('Componentes', '')).strip(),
-                'prioridade': str(row.get('Prioridade', '')).strip(),
-                'status': str(row.get('Status', '')).strip(),
-                'data_criacao': converter_data_postgres(row.get('Criado', '')),
-                'data_atualizacao': converter_data_postgres(row.get('Atualizado(a)', '')),
-                'servidor_cluster': str(row.get('Servidores / Cluster', '')).strip(),
-            }
-            tickets.append(ticket)
+        inicio = datetime.now()
+        with etapa('leitura') as medida:
+            tickets = calcular_chaves(ler_csv_normalizado(csv_path))
+            medida['linhas'] = len(tickets)
+            if medida:
+                medida['bytes'] = Path(csv_path).stat().st_size
+        total_linhas = len(tickets)
         
-        # Conectar SSH
-        tunnel = SSHTunnelManager()
-        tunnel.conectar()
+        # Um CSV vazio no modo incremental apagaria a tabela inteira
+        if not total_linhas:
+            raise ValueError("O arquivo não contém registros de tickets")
         
-        try:
-            # Encontrar container
-            ssh_stdin, ssh_stdout, ssh_stderr = tunnel.ssh_client.exec_command(
-                "docker ps -aq -f 'ancestor=postgres:17' | head -1"
-            )
-            container_id = ssh_stdout.read().decode().strip()
+        if database_url:
+            with etapa('carga', modo=modo, linhas=total_linhas):
+                resultado = carregar_via_psycopg2(tickets, database_url, modo)
+        else:
+            from backend.ssh_tunnel import SSHTunnelManager
             
-            if not container_id:
-                return False, {'erro': 'Container PostgreSQL não encontrado'}
+            # Conectar SSH
+            tunnel = SSHTunnelManager()
+            tunnel.conectar()
             
-            # Limpar tickets antigos
-            cmd = f"docker exec {container_id} psql -U adelmosilva -d pythonai_db -c 'DELETE FROM tickets;'"
-            tunnel.ssh_client.exec_command(cmd)
-            
-            # Inserir novos tickets em lotes
-            sql_inserts = []
-            for idx, ticket in enumerate(tickets, 1):
-                # Escapar aspas
-                campos = {
-                    'tipo_item': ticket['tipo_item'].replace("'", "''"),
-                    'responsavel': ticket['responsavel'].replace("'", "''"),
-                    'relator': ticket['relator'].replace("'", "''"),
-                    'componente': ticket['componente'].replace("'", "''"),
-                    'prioridade': ticket['prioridade'].replace("'", "''"),
-                    'status': ticket['status'].replace("'", "''"),
-                    'data_criacao': ticket['data_criacao'] if ticket['data_criacao'] else 'NULL',
-                    'data_atualizacao': ticket['data_atualizacao'] if ticket['data_atualizacao'] else 'NULL',
-                    'servidor_cluster': ticket['servidor_cluster'].replace("'", "''"),
-                }
-                
-                # Construir INSERT
-                data_criacao = f"'{campos['data_criacao']}'::timestamp" if campos['data_criacao'] != 'NULL' else 'NULL'
-                data_atualizacao = f"'{campos['data_atualizacao']}'::timestamp" if campos['data_atualizacao'] != 'NULL' else 'NULL'
-                
-                sql = f"""
-                INSERT INTO tickets (tipo_item, responsavel, relator, componente, prioridade, status, data_criacao, data_atualizacao, servidor_cluster, criado_em, atualizado_em)
-                VALUES ('{campos['tipo_item']}', '{campos['responsavel']}', '{campos['relator']}', '{campos['componente']}', '{campos['prioridade']}', '{campos['status']}', {data_criacao}, {data_atualizacao}, '{campos['servidor_cluster']}', NOW(), NOW());
-                """
+            try:
+                # Encontrar container
+                ssh_stdin, ssh_stdout, ssh_stderr = tunnel.ssh_client.exec_command(
+                    "docker ps -aq -f 'ancestor=postgres:17' | head -1"
+                )
+                container_id = ssh_stdout.read().decode().strip()
                 
-                sql_inserts.append(sql)
+                if not container_id:
+                    return False, {'erro': 'Container PostgreSQL não encontrado'}
                 
-                # Inserir em lotes de 100
-                if idx % 100 == 0 or idx == len(tickets):
-                    batch_sql = " ".join(sql_inserts)
-                    cmd = f"docker exec {container_id} psql -U adelmosilva -d pythonai_db -c \"{batch_sql}\""
-                    
-                    ssh_stdin, ssh_stdout, ssh_stderr = tunnel.ssh_client.exec_command(cmd)
-                    stderr = ssh_stderr.read().decode()
-                    
-                    if stderr and 'ERROR' in stderr.upper():
-                        return False, {'erro': f'Erro ao inserir lote: {stderr}', 'linhas_processadas': idx}
-                    
-                    sql_inserts = []
+                with etapa('carga', modo=modo, linhas=total_linhas):
+                    resultado = carregar_via_ssh(tickets, tunnel, container_id, modo)
             
-            # Verificar contagem final
-            cmd = f"docker exec {container_id} psql -U adelmosilva -d pythonai_db -c 'SELECT COUNT(*) FROM tickets;'"
-            ssh_stdin, ssh_stdout, ssh_stderr = tunnel.ssh_client.exec_command(cmd)
-            output = ssh_stdout.read().decode()
-            
-            # Parse contagem
-            linhas = output.strip().split('\n')
-            count = 0
-            if len(linhas) >= 2:
-                try:
-                    count = int(linhas[2])
-                except:
-                    pass
-            
-            return True, {
-                'total_csv': total_linhas,
-                'total_banco': count,
-                'status': 'Sincronizado com sucesso'
-            }
+            finally:
+                tunnel.fechar()
+        
+        # Resultados em cache dos dashboards refletem o conteúdo anterior
+        from backend.cache_consultas import invalidar_caches
+        invalidar_caches()
         
-        finally:
-            tunnel.fechar()
+        logger.info(
+            f"Carga {modo}: {resultado['inseridos']} inseridos, {resultado['atualizados']} atualizados, "
+            f"{resultado['removidos']} removidos em {(datetime.now() - inicio).total_seconds():.1f}s"
+        )
+        return True, {
+            'total_csv': total_linhas,
+            **resultado,
+            'status': 'Sincronizado com sucesso'
+        }
     
     except Exception as e:
         logger.error(f"Erro ao migrar CSV: {e}")
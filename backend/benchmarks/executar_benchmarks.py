@@ -0,0 +1,222 @@
+"""
+Benchmarks do pipeline de relatórios sobre CSVs sintéticos do Jira
+
+Etapas medidas, para cada tamanho de entrada:
+- parse_lista / parse_frame: parser_jira_csv (lista de Ticket / TicketFrame);
+- agrupar_lotes: leitura em lotes + agrupamento (caminho do /upload-csv);
+- agregar: TicketAggregate dos dois períodos a partir dos tickets já lidos;
+- comparativo: tabelas e resumos do relatório comparativo;
+- pdf: geração do PDF comparativo em memória (gráficos incluídos);
+- ingestao_banco: migrar_csv_para_banco no modo 'completo' (só com --database-url).
+
+O cache de relatórios é desligado durante as medições. O resultado é um JSON
+que pode ser comparado entre versões com --comparar.
+
+Uso:
+    python benchmarks/executar_benchmarks.py --tamanhos 1000,10000 --saida base.json
+    python benchmarks/executar_benchmarks.py --comparar base.json novo.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Adicionar pastas ao path (app.* a partir de backend/, backend.* a partir da raiz)
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(1, str(BACKEND_DIR.parent))
+
+from app.utils import instrumentacao
+from app.utils.cache_relatorios import cache_relatorios
+from app.utils.jira_parser import iterar_jira_csv, parser_jira_csv
+from app.services.analysis_service import AnalysisService, TicketAggregate
+from app.services.pdf_report_service import PDFReportService
+from app.services.report_service import ReportService
+from benchmarks.gerar_jira_csv import gerar_csv_jira
+
+TAMANHOS_PADRAO = [1000, 10000, 100000, 1000000]
+
+
+def _medir(funcao: Callable[[], Any], repeticoes: int) -> Dict[str, float]:
+    """Executa `funcao` `repeticoes` vezes e retorna os tempos (segundos)"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {'min': min(tempos), 'mediana': statistics.median(tempos), 'max': max(tempos)}
+
+
+def _csvs(dir_dados: Path, linhas: int, semente: int) -> List[Path]:
+    """CSVs dos dois períodos (sementes diferentes), gerados só na primeira vez"""
+    caminhos = []
+    for i, periodo in enumerate(("Anterior", "Atual")):
+        caminho = dir_dados / f"JIRAS_{periodo}_{linhas}_s{semente + i}.csv"
+        if not caminho.exists():
+            gerar_csv_jira(caminho, linhas, semente=semente + i)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def executar(
+    tamanhos: List[int],
+    repeticoes: int = 3,
+    dir_dados: Optional[Path] = None,
+    database_url: Optional[str] = None,
+    semente: int = 42
+) -> Dict[str, Any]:
+    """
+    Executa todas as etapas para cada tamanho
+    
+    Args:
+        tamanhos: Quantidade de linhas de cada CSV
+        repeticoes: Execuções de cada etapa (registra mínimo, mediana e máximo)
+        dir_dados: Pasta dos CSVs gerados (reaproveitados entre execuções)
+        database_url: URL do PostgreSQL para a etapa de ingestão (omitida se None)
+        semente: Semente do gerador (a do período atual é semente + 1)
+    
+    Returns:
+        Dicionário com 'metadados' e a lista de 'resultados'
+    """
+    from backend.version import get_version
+    
+    dir_dados = Path(dir_dados or Path(tempfile.gettempdir()) / "benchmarks_jira")
+    cache_relatorios.tamanho_maximo = 0
+    
+    resultados = []
+    for linhas in tamanhos:
+        csv_ant, csv_atu = _csvs(dir_dados, linhas, semente)
+        print(f"\n{linhas} linhas ({csv_atu.stat().st_size / 1024 / 1024:.1f} MB por CSV)")
+        
+        tickets_ant = parser_jira_csv(csv_ant)
+        tickets_atu = parser_jira_csv(csv_atu)
+        agregado_ant = TicketAggregate.from_tickets(tickets_ant)
+        agregado_atu = TicketAggregate.from_tickets(tickets_atu)
+        dados_pdf = ReportService.montar_relatorio_comparativo(agregado_ant, agregado_atu, "Anterior", "Atual")
+        
+        etapas = {
+            'parse_lista': lambda: parser_jira_csv(csv_atu),
+            'parse_frame': lambda: parser_jira_csv(csv_atu, como_frame=True),
+            'agrupar_lotes': lambda: AnalysisService.agrupar_lotes(iterar_jira_csv(csv_atu)),
+            'agregar': lambda: (TicketAggregate.from_tickets(tickets_ant), TicketAggregate.from_tickets(tickets_atu)),
+            'comparativo': lambda: ReportService.montar_relatorio_comparativo(
+                agregado_ant, agregado_atu, "Anterior", "Atual"
+            ),
+            'pdf': lambda: PDFReportService().gerar_relatorio(**dados_pdf),
+        }
+        if database_url:
+            from backend.auto_migrar import migrar_csv_para_banco
+            
+            def ingerir():
+                sucesso, resultado = migrar_csv_para_banco(csv_atu, database_url, modo='completo')
+                if not sucesso:
+                    raise RuntimeError(resultado.get('erro', resultado))
+            etapas['ingestao_banco'] = ingerir
+        
+        for etapa, funcao in etapas.items():
+            with instrumentacao.perfil(f"benchmark_{etapa}_{linhas}"):
+                tempos = _medir(funcao, repeticoes)
+            resultados.append({
+                'etapa': etapa,
+                'linhas': linhas,
+                'repeticoes': repeticoes,
+                'segundos': tempos,
+                'linhas_por_segundo': round(linhas / tempos['mediana']) if tempos['mediana'] else None,
+            })
+            print(f"  {etapa:<16} {tempos['mediana']:>9.4f}s  (min {tempos['min']:.4f}s)")
+    
+    return {
+        'metadados': {
+            'versao': get_version(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'semente': semente,
+        },
+        'resultados': resultados,
+    }
+
+
+def comparar(base: Dict[str, Any], novo: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compara as medianas de dois resultados por (etapa, linhas)
+    
+    Args:
+        base: Resultado de referência
+        novo: Resultado a comparar
+    
+    Returns:
+        Lista com as medianas e a razão novo/base (< 1 é mais rápido)
+    """
+    medianas_base = {(r['etapa'], r['linhas']): r['segundos']['mediana'] for r in base['resultados']}
+    
+    linhas = []
+    for r in novo['resultados']:
+        chave = (r['etapa'], r['linhas'])
+        if chave not in medianas_base:
+            continue
+        antes, depois = medianas_base[chave], r['segundos']['mediana']
+        linhas.append({
+            'etapa': r['etapa'],
+            'linhas': r['linhas'],
+            'base': antes,
+            'novo': depois,
+            'razao': depois / antes if antes else None,
+        })
+    return linhas
+
+
+def main():
+    """Executa os benchmarks (ou compara dois resultados) a partir da linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline de relatórios")
+    parser.add_argument('--tamanhos', default=','.join(map(str, TAMANHOS_PADRAO)),
+                        help="Linhas por CSV, separadas por vírgula")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--dir-dados', type=Path, help="Pasta dos CSVs gerados")
+    parser.add_argument('--database-url', default=os.getenv('BENCHMARK_DATABASE_URL'),
+                        help="PostgreSQL para a etapa de ingestão (ou BENCHMARK_DATABASE_URL)")
+    parser.add_argument('--saida', type=Path, help="Arquivo JSON com os resultados")
+    parser.add_argument('--instrumentar', action='store_true',
+                        help="Registra no log o tempo de cada etapa interna (distorce as medições)")
+    parser.add_argument('--perfil', choices=['cprofile', 'pyinstrument'],
+                        help="Grava um perfil de cada etapa em PERFIL_DIR")
+    parser.add_argument('--comparar', nargs=2, type=Path, metavar=('BASE', 'NOVO'),
+                        help="Compara dois arquivos de resultado em vez de executar")
+    args = parser.parse_args()
+    
+    if args.comparar:
+        base, novo = (json.loads(p.read_text(encoding='utf-8')) for p in args.comparar)
+        print(f"{'etapa':<16} {'linhas':>9} {'base':>10} {'novo':>10} {'razão':>7}")
+        for linha in comparar(base, novo):
+            razao = f"{linha['razao']:.2f}x" if linha['razao'] is not None else '-'
+            print(
+                f"{linha['etapa']:<16} {linha['linhas']:>9} "
+                f"{linha['base']:>9.4f}s {linha['novo']:>9.4f}s {razao:>7}"
+            )
+        return
+    
+    if args.instrumentar or args.perfil:
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+        instrumentacao.ativar(args.instrumentar, args.perfil)
+    
+    tamanhos = [int(t) for t in args.tamanhos.split(',') if t.strip()]
+    resultado = executar(tamanhos, args.repeticoes, args.dir_dados, args.database_url, args.semente)
+    
+    if args.saida:
+        args.saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\nResultados gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
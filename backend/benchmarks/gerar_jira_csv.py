@@ -0,0 +1,135 @@
+"""
+Gerador determinístico de CSVs sintéticos no formato da exportação do Jira
+
+Gera as colunas de JIRA_COLUMN_MAP, separadas por ';', com valores dos
+mapas do parser (tipologias, componentes) e cardinalidade configurável de
+servidores, responsáveis e relatores. A mesma semente gera sempre o mesmo
+arquivo, para que benchmarks de versões diferentes leiam a mesma entrada.
+
+Uso:
+    python benchmarks/gerar_jira_csv.py saida.csv --linhas 100000 --servidores 80
+"""
+
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+# Adicionar pasta ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.jira_parser import COMPONENTE_ORIGEM_MAP, JIRA_COLUMN_MAP, TIPOLOGIA_MAP
+
+# Distribuição padrão dos status (aproximada dos exports reais)
+STATUS_PADRAO = {'Fechada': 0.55, 'Aberta': 0.2, 'Em Progresso': 0.15, 'Cancelado': 0.1}
+
+PRIORIDADES = ['Low', 'Medium', 'High', 'Critical', '']
+
+# Nomes com acentos para exercitar a detecção de encoding
+NOMES = ['Ana', 'João', 'Luís', 'Márcia', 'Zé', 'Rita', 'Sérgio', 'Conceição', 'André', 'Inês']
+
+# Linhas acumuladas antes de cada escrita no arquivo
+LINHAS_POR_ESCRITA = 10000
+
+
+def _pessoas(prefixo: str, quantidade: int) -> list:
+    """Nomes distintos (com acentos) para responsáveis ou relatores"""
+    return [f"{NOMES[i % len(NOMES)]} {prefixo}{i // len(NOMES)}" for i in range(quantidade)]
+
+
+def gerar_csv_jira(
+    destino: Path,
+    linhas: int,
+    servidores: int = 50,
+    responsaveis: int = 20,
+    relatores: int = 30,
+    status: Optional[Dict[str, float]] = None,
+    encoding: str = 'utf-8-sig',
+    semente: int = 42,
+    inicio: datetime = datetime(2025, 1, 1),
+    dias: int = 365
+) -> Path:
+    """
+    Escreve um CSV sintético do Jira
+    
+    Args:
+        destino: Caminho do arquivo gerado
+        linhas: Quantidade de tickets
+        servidores: Servidores/clusters distintos
+        responsaveis: Responsáveis distintos
+        relatores: Relatores distintos
+        status: Proporção de cada status (padrão: STATUS_PADRAO)
+        encoding: 'utf-8-sig', 'utf-8', 'cp1252' ou 'latin1'
+        semente: Semente do gerador (mesma semente, mesmo arquivo)
+        inicio: Data de criação mais antiga
+        dias: Intervalo de datas de criação a partir de `inicio`
+    
+    Returns:
+        Caminho do arquivo gerado
+    """
+    status = status or STATUS_PADRAO
+    rng = random.Random(semente)
+    
+    tipos = list(TIPOLOGIA_MAP)
+    componentes = list(COMPONENTE_ORIGEM_MAP) + ['']
+    nomes_servidores = [f"srv-{i:03d}" for i in range(servidores)] + ['']
+    nomes_responsaveis = _pessoas('R', responsaveis) + ['']
+    nomes_relatores = _pessoas('Q', relatores)
+    nomes_status = list(status)
+    pesos_status = list(status.values())
+    minutos = dias * 24 * 60
+    
+    destino = Path(destino)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    with open(destino, 'w', encoding=encoding, newline='') as f:
+        f.write(';'.join(JIRA_COLUMN_MAP) + '\r\n')
+        
+        bloco = []
+        for _ in range(linhas):
+            criado = inicio + timedelta(minutes=rng.randrange(minutos))
+            atualizado = criado + timedelta(minutes=rng.randrange(60 * 24 * 30))
+            bloco.append(';'.join((
+                rng.choice(tipos),
+                rng.choice(nomes_responsaveis),
+                rng.choice(nomes_relatores),
+                rng.choice(componentes),
+                rng.choice(PRIORIDADES),
+                rng.choices(nomes_status, pesos_status)[0],
+                criado.strftime('%d/%m/%Y %H:%M'),
+                atualizado.strftime('%d/%m/%Y %H:%M'),
+                rng.choice(nomes_servidores),
+            )))
+            
+            if len(bloco) >= LINHAS_POR_ESCRITA:
+                f.write('\r\n'.join(bloco) + '\r\n')
+                bloco = []
+        
+        if bloco:
+            f.write('\r\n'.join(bloco) + '\r\n')
+    
+    return destino
+
+
+def main():
+    """Gera um CSV a partir dos argumentos da linha de comando"""
+    parser = argparse.ArgumentParser(description="Gera um CSV sintético no formato do Jira")
+    parser.add_argument('destino', type=Path)
+    parser.add_argument('--linhas', type=int, default=10000)
+    parser.add_argument('--servidores', type=int, default=50)
+    parser.add_argument('--responsaveis', type=int, default=20)
+    parser.add_argument('--relatores', type=int, default=30)
+    parser.add_argument('--encoding', default='utf-8-sig', choices=['utf-8-sig', 'utf-8', 'cp1252', 'latin1'])
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+    
+    destino = gerar_csv_jira(
+        args.destino, args.linhas, args.servidores, args.responsaveis, args.relatores,
+        encoding=args.encoding, semente=args.semente
+    )
+    print(f"{args.linhas} tickets gravados em {destino}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Cache em memória dos resultados de consultas ao banco (TTL + LRU)
+
+Cada serviço de tickets tem seu próprio cache; todos ficam registrados
+para que a carga de um novo CSV (auto_migrar) invalide os resultados de
+uma vez. Cada invalidação avança a geração do cache: uma consulta que já
+estava em andamento guarda o resultado só se a geração não mudou, para não
+repor no cache um resultado anterior à carga.
+"""
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Tempo de vida (s) e quantidade máxima de resultados guardados por serviço
+CACHE_TTL_SEGUNDOS = float(os.getenv('CACHE_CONSULTAS_TTL', '300'))
+CACHE_TAMANHO_MAXIMO = int(os.getenv('CACHE_CONSULTAS_TAMANHO', '256'))
+
+# Caches vivos, para invalidação global
+_caches = weakref.WeakSet()
+
+
+class CacheConsultas:
+    """Cache LRU com expiração por tempo e contadores de acertos/falhas"""
+    
+    def __init__(self, ttl: float = CACHE_TTL_SEGUNDOS, tamanho_maximo: int = CACHE_TAMANHO_MAXIMO):
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+        self.geracao = 0
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+        _caches.add(self)
+    
+    def obter(self, chave: Hashable) -> Tuple[bool, Any]:
+        """
+        Busca um resultado no cache
+        
+        Args:
+            chave: Chave da consulta
+        
+        Returns:
+            Tupla (encontrado, valor)
+        """
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is not None and item[0] > time.monotonic():
+                self._dados.move_to_end(chave)
+                self.acertos += 1
+                return True, item[1]
+            
+            if item is not None:
+                del self._dados[chave]
+            self.falhas += 1
+            return False, None
+    
+    def guardar(self, chave: Hashable, valor: Any, geracao: Optional[int] = None):
+        """
+        Guarda um resultado, descartando o menos usado se o cache estiver cheio
+        
+        Args:
+            chave: Chave da consulta
+            valor: Resultado
+            geracao: Geração lida antes de executar a consulta; se o cache foi
+                invalidado depois disso, o resultado não é guardado
+        """
+        with self._lock:
+            if geracao is not None and geracao != self.geracao:
+                return
+            self._dados[chave] = (time.monotonic() + self.ttl, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho_maximo:
+                self._dados.popitem(last=False)
+    
+    def invalidar(self):
+        """Descarta todos os resultados guardados"""
+        with self._lock:
+            self.geracao += 1
+            self._dados.clear()
+    
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna tamanho atual e contadores de acertos/falhas"""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'itens': len(self._dados),
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+            }
+
+
+def invalidar_caches():
+    """Invalida o cache de todos os serviços (ex.: após carregar um novo CSV)"""
+    for cache in list(_caches):
+        cache.invalidar()
@@ -3,13 +3,11 @@ Dashboard Streamlit para AGT 4.0
 """
 
 import streamlit as st
-import pandas as pd
 from pathlib import Path
 import tempfile
 import shutil
 from datetime import datetime
 import sys
-import matplotlib.pyplot as plt
 import hashlib
 import json
 
@@ -18,10 +16,13 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.utils.jira_parser import parser_jira_csv
 from app.services.ticket_service import TicketService
-from app.services.analysis_service import AnalysisService
-from app.services.pdf_report_service import PDFReportService
+from app.services.analysis_service import AnalysisService, TicketAggregate
+from app.services.pdf_report_service import PDFReportService, VERSAO_MODELO
+from app.utils.cache_relatorios import CacheRelatorios, cache_relatorios
 from app.config import REPORTS_OUTPUT_DIR, UPLOADS_DIR
-from backend.auto_migrar import migrar_csv_para_banco
+
+# pandas, matplotlib e a migração (pandas/psycopg2) são importados onde são usados:
+# a página abre sem eles e só os carrega quando há um CSV para exibir
 
 # ========== SISTEMA DE VALIDAÇÃO DE CSVs ==========
 
@@ -166,6 +167,7 @@ if opcao == "📈 Análise de Período":
                 
                 # Migrar automaticamente para o banco de dados
                 st.info("⏳ Sincronizando com banco de dados...")
+                from backend.auto_migrar import migrar_csv_para_banco
                 sucesso, resultado = migrar_csv_para_banco(csv_path)
                 
                 if sucesso:
@@ -173,23 +175,33 @@ if opcao == "📈 Análise de Período":
                     total_banco = resultado.get('total_banco', 0)
                     st.success(f"✅ Banco de dados sincronizado!\n\n"
                               f"- Tickets no CSV: {total_csv}\n"
-                              f"- Tickets no banco: {total_banco}")
+                              f"- Tickets no banco: {total_banco}\n"
+                              f"- Inseridos: {resultado.get('inseridos', 0)}, "
+                              f"atualizados: {resultado.get('atualizados', 0)}, "
+                              f"removidos: {resultado.get('removidos', 0)}")
                 else:
                     erro = resultado.get('erro', 'Erro desconhecido')
                     st.error(f"❌ Erro ao sincronizar banco de dados:\n{erro}")
                 
-                # Processar
-                tickets = parser_jira_csv(csv_path)
+                # Processar (o mesmo CSV reaproveita os tickets do cache)
+                tickets = cache_relatorios.obter_ou_calcular(
+                    CacheRelatorios.chave('tickets', file_hash),
+                    lambda: parser_jira_csv(csv_path)
+                )
                 
                 service = TicketService()
                 service.carregar_tickets(tickets)
                 
                 resumo = AnalysisService.calcular_resumo_executivo(tickets)
-                analises_tipologia = AnalysisService.analisar_por_tipologia(tickets)
-                analises_componente = AnalysisService.analisar_por_componente(tickets)
-                analises_origem = AnalysisService.analisar_por_origem(tickets)
-                analises_prioridade = AnalysisService.analisar_por_prioridade(tickets)
-                analises_servidor = AnalysisService.analisar_por_servidor(tickets)
+                analises = AnalysisService.agrupar(tickets)
+                analises_tipologia = analises['tipologia']
+                analises_componente = analises['componente']
+                analises_origem = analises['origem']
+                analises_prioridade = analises['prioridade']
+                analises_servidor = analises['servidor']
+            
+            import matplotlib.pyplot as plt
+            import pandas as pd
             
             # Resumo Executivo
             st.subheader("📋 Resumo Executivo")
@@ -299,25 +311,27 @@ if opcao == "📈 Análise de Período":
                     pdf_filename = f"relatorio_{periodo.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
                     pdf_path = REPORTS_OUTPUT_DIR / pdf_filename
                     
-                    pdf_service = PDFReportService(pdf_path)
-                    pdf_service.gerar_relatorio(
-                        periodo=periodo,
-                        resumo=resumo,
-                        analises_tipologia=analises_tipologia,
-                        analises_componente=analises_componente,
-                        analises_origem=analises_origem,
-                        analises_prioridade=analises_prioridade,
-                        analises_servidor=analises_servidor
+                    pdf = cache_relatorios.obter_ou_calcular(
+                        CacheRelatorios.chave('pdf', file_hash, periodo, VERSAO_MODELO),
+                        lambda: PDFReportService().gerar_relatorio(
+                            periodo=periodo,
+                            resumo=resumo,
+                            analises_tipologia=analises_tipologia,
+                            analises_componente=analises_componente,
+                            analises_origem=analises_origem,
+                            analises_prioridade=analises_prioridade,
+                            analises_servidor=analises_servidor
+                        ).getvalue()
                     )
+                    pdf_path.write_bytes(pdf)
                     
-                    with open(pdf_path, "rb") as pdf_file:
-                        st.download_button(
-                            label="⬇️ Baixar PDF",
-                            data=pdf_file,
-                            file_name=pdf_filename,
-                            mime="application/pdf",
-                            use_container_width=True
-                        )
+                    st.download_button(
+                        label="⬇️ Baixar PDF",
+                        data=pdf,
+                        file_name=pdf_filename,
+                        mime="application/pdf",
+                        use_container_width=True
+                    )
                     
                     st.success(f"✅ PDF gerado: {pdf_filename}")
         
@@ -393,6 +407,7 @@ elif opcao == "📊 Comparativo de Períodos":
                 
                 # Migrar automaticamente o arquivo atual (mais recente) para o banco
                 st.info("⏳ Sincronizando período atual com banco de dados...")
+                from backend.auto_migrar import migrar_csv_para_banco
                 sucesso, resultado = migrar_csv_para_banco(csv_atu_path)
                 
                 if sucesso:
@@ -400,37 +415,45 @@ elif opcao == "📊 Comparativo de Períodos":
                     total_banco = resultado.get('total_banco', 0)
                     st.success(f"✅ Banco de dados sincronizado com período atual!\n\n"
                               f"- Tickets no CSV: {total_csv}\n"
-                              f"- Tickets no banco: {total_banco}")
+                              f"- Tickets no banco: {total_banco}\n"
+                              f"- Inseridos: {resultado.get('inseridos', 0)}, "
+                              f"atualizados: {resultado.get('atualizados', 0)}, "
+                              f"removidos: {resultado.get('removidos', 0)}")
                 else:
                     erro = resultado.get('erro', 'Erro desconhecido')
                     st.error(f"❌ Erro ao sincronizar banco de dados:\n{erro}")
                 
-                # Processar anterior
-                tickets_ant = parser_jira_csv(csv_ant_path)
-                service_ant = TicketService()
-                service_ant.carregar_tickets(tickets_ant)
-                resumo_ant = AnalysisService.calcular_resumo_executivo(tickets_ant)
+                # Processar anterior (agregado do cache se o CSV já foi processado)
+                agregado_ant = cache_relatorios.obter_ou_calcular(
+                    CacheRelatorios.chave('agregado', hash_ant),
+                    lambda: TicketAggregate.from_tickets(parser_jira_csv(csv_ant_path))
+                )
+                resumo_ant = agregado_ant.resumo()
                 
                 # Processar atual
-                tickets_atu = parser_jira_csv(csv_atu_path)
-                service_atu = TicketService()
-                service_atu.carregar_tickets(tickets_atu)
-                resumo_atu = AnalysisService.calcular_resumo_executivo(tickets_atu)
-                analises_tipologia = AnalysisService.analisar_por_tipologia(tickets_atu)
-                analises_componente = AnalysisService.analisar_por_componente(tickets_atu)
-                analises_origem = AnalysisService.analisar_por_origem(tickets_atu)
-                analises_prioridade = AnalysisService.analisar_por_prioridade(tickets_atu)
-                analises_servidor = AnalysisService.analisar_por_servidor(tickets_atu)
-                
-                # Análises para Top 10 e Acumulado (por total de tickets)
-                top_10_servidores_atual = AnalysisService.top_10_servidores_por_total(tickets_atu)
-                top_10_servidores_acumulado = AnalysisService.top_10_servidores_por_total(tickets_ant + tickets_atu)
-                resumo_acumulado = AnalysisService.calcular_resumo_acumulado(tickets_ant, tickets_atu)
+                agregado_atu = cache_relatorios.obter_ou_calcular(
+                    CacheRelatorios.chave('agregado', hash_atu),
+                    lambda: TicketAggregate.from_tickets(parser_jira_csv(csv_atu_path))
+                )
+                resumo_atu = agregado_atu.resumo()
+                analises = agregado_atu.contagens
+                analises_tipologia = analises['tipologia']
+                analises_componente = analises['componente']
+                analises_origem = analises['origem']
+                analises_prioridade = analises['prioridade']
+                analises_servidor = analises['servidor']
+                
+                # Top 10 servidores com mais tickets (total do período)
+                top_10_servidores_atual = agregado_atu.top('servidor')
+                
+                # Acumulado: soma dos agregados dos dois períodos
+                top_10_servidores_acumulado = (agregado_ant + agregado_atu).top('servidor')
+                resumo_acumulado = AnalysisService.calcular_resumo_acumulado(agregado_ant, agregado_atu)
                 
                 # Tabelas detalhadas para relatório
-                tabela_tipologia = AnalysisService.tabela_tipologia(tickets_ant, tickets_atu)
-                tabela_top10_modulos = AnalysisService.tabela_top10_modulos(tickets_ant, tickets_atu)
-                tabela_origem = AnalysisService.tabela_origem(tickets_ant, tickets_atu)
+                tabela_tipologia = AnalysisService.tabela_tipologia(agregado_ant, agregado_atu)
+                tabela_top10_modulos = AnalysisService.tabela_top10_modulos(agregado_ant, agregado_atu)
+                tabela_origem = AnalysisService.tabela_origem(agregado_ant, agregado_atu)
             
             # Comparativo
             st.subheader("📊 Comparativo")
@@ -455,6 +478,8 @@ elif opcao == "📊 Comparativo de Períodos":
             
             st.markdown("---")
             
+            import pandas as pd
+            
             # Tabela Comparativa
             st.subheader("📋 Análise Comparativa")
             
@@ -655,8 +680,10 @@ elif opcao == "📊 Comparativo de Períodos":
                     pdf_filename = f"relatorio_comparativo_{periodo_anterior}_vs_{periodo_atual}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
                     pdf_path = REPORTS_OUTPUT_DIR / pdf_filename
                     
-                    pdf_service = PDFReportService(pdf_path)
-                    pdf_service.gerar_relatorio(
+                    chave_pdf = CacheRelatorios.chave(
+                        'pdf_comparativo', hash_ant, hash_atu, periodo_anterior, periodo_atual, VERSAO_MODELO
+                    )
+                    pdf = cache_relatorios.obter_ou_calcular(chave_pdf, lambda: PDFReportService().gerar_relatorio(
                         periodo=f"{periodo_anterior} vs {periodo_atual}",
                         resumo=resumo_atu,
                         analises_tipologia=analises_tipologia,
@@ -672,16 +699,16 @@ elif opcao == "📊 Comparativo de Períodos":
                         tabela_tipologia=tabela_tipologia,
                         tabela_top10_modulos=tabela_top10_modulos,
                         tabela_origem=tabela_origem
-                    )
+                    ).getvalue())
+                    pdf_path.write_bytes(pdf)
                     
-                    with open(pdf_path, "rb") as pdf_file:
-                        st.download_button(
-                            label="⬇️ Baixar PDF Comparativo",
-                            data=pdf_file,
-                            file_name=pdf_filename,
-                            mime="application/pdf",
-                            use_container_width=True
-                        )
+                    st.download_button(
+                        label="⬇️ Baixar PDF Comparativo",
+                        data=pdf,
+                        file_name=pdf_filename,
+                        mime="application/pdf",
+                        use_container_width=True
+                    )
                     
                     st.success(f"✅ PDF comparativo gerado: {pdf_filename}")
         
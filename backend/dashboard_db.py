@@ -128,8 +128,9 @@ if modo == "📊 Dashboard Geral":
         with st.spinner("Carregando dados..."):
             servico = obter_servico_cache()
             
-            # Obter resumo
-            resumo = servico.obter_resumo()
+            # Todos os widgets em uma única consulta
+            painel = servico.obter_painel()
+            resumo = painel['resumo']
             
             # Métricas principais
             col1, col2, col3, col4 = st.columns(4)
@@ -169,7 +170,7 @@ if modo == "📊 Dashboard Geral":
         
         with col1:
             st.subheader("📦 Top 10 Módulos/Componentes")
-            top_modulos = servico.obter_top_modulos()
+            top_modulos = painel['top_modulos']
             
             if top_modulos:
                 df_modulos = pd.DataFrame(
@@ -194,7 +195,7 @@ if modo == "📊 Dashboard Geral":
         
         with col2:
             st.subheader("🖥️ Top 10 Servidores/Clusters")
-            top_servidores = servico.obter_top_servidores()
+            top_servidores = painel['top_servidores']
             
             if top_servidores:
                 df_servidores = pd.DataFrame(
@@ -224,7 +225,7 @@ if modo == "📊 Dashboard Geral":
         
         with col1:
             st.subheader("📋 Tipologia de Tickets")
-            tipologia = servico.obter_tipologia()
+            tipologia = painel['tipologia']
             
             if tipologia:
                 df_tipo = pd.DataFrame(
@@ -246,7 +247,7 @@ if modo == "📊 Dashboard Geral":
         
         with col2:
             st.subheader("👤 Origem dos Tickets (Top 5)")
-            origem = servico.obter_origem()
+            origem = painel['origem']
             
             if origem:
                 df_origem = pd.DataFrame(
@@ -277,8 +278,9 @@ elif modo == "📅 Período Específico":
         with st.spinner(f"Carregando dados de {mes}/{ano}..."):
             servico = obter_servico_cache()
             
-            # Resumo do período
-            resumo_periodo = servico.obter_resumo(mes, ano)
+            # Todos os widgets do período em uma única consulta
+            painel_periodo = servico.obter_painel(mes, ano)
+            resumo_periodo = painel_periodo['resumo']
             
             col1, col2, col3 = st.columns(3)
             
@@ -300,6 +302,29 @@ elif modo == "📅 Período Específico":
                     formatar_numero(resumo_periodo['fechados']),
                 )
         
+            # Acumulado do ano até o mês (soma das contagens mensais)
+            resumo_acumulado = servico.obter_painel_acumulado(mes, ano)['resumo']
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric(
+                    f"Acumulado Jan-{['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'][mes-1]}/{ano}",
+                    formatar_numero(resumo_acumulado['total']),
+                )
+            
+            with col2:
+                st.metric(
+                    "Abertos no Ano",
+                    formatar_numero(resumo_acumulado['abertos']),
+                )
+            
+            with col3:
+                st.metric(
+                    "Fechados no Ano",
+                    formatar_numero(resumo_acumulado['fechados']),
+                )
+        
         st.markdown("---")
         
         # Detalhes do período
@@ -307,7 +332,7 @@ elif modo == "📅 Período Específico":
         
         with col1:
             st.subheader("📦 Módulos neste Período")
-            top_modulos_periodo = servico.obter_top_modulos(mes, ano)
+            top_modulos_periodo = painel_periodo['top_modulos']
             
             if top_modulos_periodo:
                 df_m = pd.DataFrame(top_modulos_periodo, columns=["Componente", "Total"])
@@ -318,7 +343,7 @@ elif modo == "📅 Período Específico":
         
         with col2:
             st.subheader("🖥️ Servidores neste Período")
-            top_serv_periodo = servico.obter_top_servidores(mes, ano)
+            top_serv_periodo = painel_periodo['top_servidores']
             
             if top_serv_periodo:
                 df_s = pd.DataFrame(top_serv_periodo, columns=["Servidor", "Total"])
@@ -338,11 +363,10 @@ elif modo == "📈 Comparativo":
         with st.spinner("Carregando dados..."):
             servico = obter_servico_cache()
             
-            # Resumo geral
-            resumo_geral = servico.obter_resumo()
-            
-            # Resumo do período
-            resumo_periodo = servico.obter_resumo(mes, ano)
+            # Geral e período em uma única consulta
+            painel_geral, painel_periodo = servico.obter_paineis([None, (mes, ano)])
+            resumo_geral = painel_geral['resumo']
+            resumo_periodo = painel_periodo['resumo']
             
             col1, col2, col3 = st.columns(3)
             
@@ -378,7 +402,7 @@ elif modo == "📈 Comparativo":
         
         with col1:
             st.write("**Geral**")
-            tipologia_geral = servico.obter_tipologia()
+            tipologia_geral = painel_geral['tipologia']
             if tipologia_geral:
                 df_t_geral = pd.DataFrame(tipologia_geral, columns=["Tipo", "Total"])
                 fig1, ax1 = plt.subplots(figsize=(6, 4))
@@ -387,7 +411,7 @@ elif modo == "📈 Comparativo":
         
         with col2:
             st.write(f"**{['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'][mes-1]}/{ano}**")
-            tipologia_periodo = servico.obter_tipologia(mes, ano)
+            tipologia_periodo = painel_periodo['tipologia']
             if tipologia_periodo:
                 df_t_per = pd.DataFrame(tipologia_periodo, columns=["Tipo", "Total"])
                 fig2, ax2 = plt.subplots(figsize=(6, 4))
@@ -408,9 +432,10 @@ elif modo == "📈 Comparativo de Meses":
         with st.spinner(f"Carregando {mes_nome1}/{ano1} e {mes_nome2}/{ano2}..."):
             servico = obter_servico_cache()
             
-            # Obter dados dos dois meses
-            resumo1 = servico.obter_resumo(mes1, ano1)
-            resumo2 = servico.obter_resumo(mes2, ano2)
+            # Obter dados dos dois meses em uma única consulta
+            painel1, painel2 = servico.obter_paineis([(mes1, ano1), (mes2, ano2)])
+            resumo1 = painel1['resumo']
+            resumo2 = painel2['resumo']
             
             # Métricas principais lado a lado
             st.subheader("📊 Resumo Geral")
@@ -486,7 +511,7 @@ elif modo == "📈 Comparativo de Meses":
             
             with col1:
                 st.markdown(f"#### {mes_nome1}/{ano1}")
-                top_modulos1 = servico.obter_top_modulos(mes1, ano1)
+                top_modulos1 = painel1['top_modulos']
                 if top_modulos1:
                     df_mod1 = pd.DataFrame(top_modulos1, columns=["Componente", "Total"])
                     st.dataframe(df_mod1, use_container_width=True, hide_index=True)
@@ -502,7 +527,7 @@ elif modo == "📈 Comparativo de Meses":
             
             with col3:
                 st.markdown(f"#### {mes_nome2}/{ano2}")
-                top_modulos2 = servico.obter_top_modulos(mes2, ano2)
+                top_modulos2 = painel2['top_modulos']
                 if top_modulos2:
                     df_mod2 = pd.DataFrame(top_modulos2, columns=["Componente", "Total"])
                     st.dataframe(df_mod2, use_container_width=True, hide_index=True)
@@ -521,7 +546,7 @@ elif modo == "📈 Comparativo de Meses":
             
             with col1:
                 st.markdown(f"#### {mes_nome1}/{ano1}")
-                top_serv1 = servico.obter_top_servidores(mes1, ano1)
+                top_serv1 = painel1['top_servidores']
                 if top_serv1:
                     df_serv1 = pd.DataFrame(top_serv1, columns=["Servidor", "Total"])
                     st.dataframe(df_serv1, use_container_width=True, hide_index=True)
@@ -537,7 +562,7 @@ elif modo == "📈 Comparativo de Meses":
             
             with col3:
                 st.markdown(f"#### {mes_nome2}/{ano2}")
-                top_serv2 = servico.obter_top_servidores(mes2, ano2)
+                top_serv2 = painel2['top_servidores']
                 if top_serv2:
                     df_serv2 = pd.DataFrame(top_serv2, columns=["Servidor", "Total"])
                     st.dataframe(df_serv2, use_container_width=True, hide_index=True)
@@ -556,7 +581,7 @@ elif modo == "📈 Comparativo de Meses":
             
             with col1:
                 st.markdown(f"#### {mes_nome1}/{ano1}")
-                tipologia1 = servico.obter_tipologia(mes1, ano1)
+                tipologia1 = painel1['tipologia']
                 if tipologia1:
                     df_tip1 = pd.DataFrame(tipologia1, columns=["Tipo", "Total"])
                     st.dataframe(df_tip1, use_container_width=True, hide_index=True)
@@ -570,7 +595,7 @@ elif modo == "📈 Comparativo de Meses":
             
             with col3:
                 st.markdown(f"#### {mes_nome2}/{ano2}")
-                tipologia2 = servico.obter_tipologia(mes2, ano2)
+                tipologia2 = painel2['tipologia']
                 if tipologia2:
                     df_tip2 = pd.DataFrame(tipologia2, columns=["Tipo", "Total"])
                     st.dataframe(df_tip2, use_container_width=True, hide_index=True)
@@ -119,7 +119,9 @@ try:
         # ========== RESUMO GERAL ==========
         st.subheader("📊 Resumo Geral")
         
-        resumo = servico.obter_resumo()
+        # Todos os widgets em uma única consulta
+        painel = servico.obter_painel()
+        resumo = painel['resumo']
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -135,7 +137,7 @@ try:
         
         # Gráfico 1: Componentes Distribution
         st.subheader("📊 Distribuição por Componentes")
-        componentes = servico.obter_componentes()
+        componentes = painel['componentes']
         if componentes:
             df_comp = pd.DataFrame(componentes, columns=['componente', 'quantidade'])
             fig = px.pie(
@@ -154,7 +156,7 @@ try:
         
         # Gráfico 2: Relator Distribution
         st.subheader("👤 Distribuição por Relator")
-        origem = servico.obter_origem()
+        origem = painel['origem']
         if origem:
             df_origem = pd.DataFrame(origem, columns=['relator', 'quantidade'])
             fig = px.bar(
@@ -172,7 +174,7 @@ try:
         
         # Gráfico 3: Top em Atendimento
         st.subheader("👤 Top 10 em Atendimento")
-        responsaveis = servico.obter_top_responsaveis()
+        responsaveis = painel['top_responsaveis']
         if responsaveis:
             df_responsaveis = pd.DataFrame(responsaveis[:10], columns=['responsavel', 'total']).sort_values('total')
             fig = px.bar(
@@ -191,7 +193,7 @@ try:
         
         # Gráfico 4: Top Servidores
         st.subheader("🖥️ Top 10 Servidores")
-        servidores = servico.obter_top_servidores()
+        servidores = painel['top_servidores']
         if servidores:
             df_servidores = pd.DataFrame(servidores[:10], columns=['servidor', 'quantidade']).sort_values('quantidade')
             fig = px.bar(
@@ -235,26 +237,28 @@ try:
     elif modo == "📈 Comparativo de Meses":
         st.subheader(f"📈 Comparando {mes1}/{ano1} vs {mes2}/{ano2}")
         
-        dados1 = servico.obter_tickets_por_periodo(mes1, ano1)
-        dados2 = servico.obter_tickets_por_periodo(mes2, ano2)
+        # Contadores dos dois meses (rollups mensais)
+        painel1, painel2 = servico.obter_paineis([(mes1, ano1), (mes2, ano2)])
+        total1 = painel1['resumo']['total']
+        total2 = painel2['resumo']['total']
         
-        if not dados1.empty and not dados2.empty:
+        if total1 and total2:
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric(f"Total {mes1}/{ano1}", len(dados1))
+                st.metric(f"Total {mes1}/{ano1}", total1)
             with col2:
-                st.metric(f"Total {mes2}/{ano2}", len(dados2))
+                st.metric(f"Total {mes2}/{ano2}", total2)
             with col3:
-                variacao = ((len(dados2) - len(dados1)) / len(dados1) * 100) if len(dados1) > 0 else 0
+                variacao = ((total2 - total1) / total1 * 100) if total1 > 0 else 0
                 st.metric("Variação %", f"{variacao:.1f}%")
             with col4:
-                diferenca = len(dados2) - len(dados1)
+                diferenca = total2 - total1
                 st.metric("Diferença", diferenca)
             
             # Gráfico comparativo
             dados_comparacao = pd.DataFrame({
-                f'{mes1}/{ano1}': [len(dados1)],
-                f'{mes2}/{ano2}': [len(dados2)]
+                f'{mes1}/{ano1}': [total1],
+                f'{mes2}/{ano2}': [total2]
             }).T.reset_index()
             dados_comparacao.columns = ['Período', 'Quantidade']
             
@@ -268,6 +272,19 @@ try:
             )
             fig.update_layout(height=400, yaxis_title="Quantidade")
             st.plotly_chart(fig, use_container_width=True)
+            
+            # Evolução dos 12 meses até o segundo período (um Snapshot por mês)
+            tendencia = servico.obter_tendencia_mensal(mes2, ano2)
+            tendencia['Período'] = tendencia['mes'].astype(str) + '/' + tendencia['ano'].astype(str)
+            fig = px.line(
+                tendencia,
+                x='Período',
+                y=['total', 'abertos', 'fechados'],
+                title=f"Evolução Mensal - 12 meses até {mes2}/{ano2}",
+                markers=True
+            )
+            fig.update_layout(height=400, yaxis_title="Quantidade", legend_title="")
+            st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning("Nenhum dado disponível para os períodos selecionados")
 
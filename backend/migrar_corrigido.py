@@ -12,6 +12,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from backend.ssh_tunnel import SSHTunnelManager
 from backend.app.config import UPLOADS_DIR
+from backend.auto_migrar import executar_via_ssh
+from backend.rollups import sql_recalcular_rollups
 
 def clean_ticket_data(row):
     """Limpa e normaliza os dados de um ticket."""
@@ -131,27 +133,10 @@ def migrar_csvs():
             
             print(f"   ✅ {len(df)} registros processados")
         
-        # Criar snapshots mensais
-        print(f"\n4️⃣ Criando snapshots mensais...")
-        
-        meses = [
-            (10, 2025, "Outubro 2025"),
-            (11, 2025, "Novembro 2025"),
-        ]
-        
-        for mes, ano, nome in meses:
-            sql = f"""
-            INSERT INTO snapshots (mes, ano, data_snapshot, total_tickets_abertos, total_tickets_fechados, total_geral)
-            SELECT {mes}, {ano}, NOW(),
-                   COUNT(CASE WHEN status IN ('Aberto', 'Em Progresso', 'Aguardando') THEN 1 END) as abertos,
-                   COUNT(CASE WHEN status = 'Fechado' THEN 1 END) as fechados,
-                   COUNT(*) as total
-            FROM tickets
-            """
-            
-            cmd = f"""docker exec {container_id} psql -U adelmosilva -d pythonai_db -c "{sql}" """
-            ssh_stdin, ssh_stdout, ssh_stderr = tunnel.ssh_client.exec_command(cmd)
-            print(f"   ✅ Snapshot {nome} criado")
+        # Recalcular os rollups mensais (snapshots/analises) a partir dos tickets
+        print(f"\n4️⃣ Recalculando snapshots mensais...")
+        executar_via_ssh(tunnel, container_id, sql_recalcular_rollups())
+        print(f"   ✅ Snapshots recalculados")
         
         # Verificar dados finais
         print(f"\n5️⃣ Verificando dados inseridos...")
@@ -182,10 +167,7 @@ if __name__ == "__main__":
         )
         container_id = ssh_stdout.read().decode().strip()
         
-        sqls = ["DELETE FROM snapshots;", "DELETE FROM tickets;"]
-        for sql in sqls:
-            cmd = f"""docker exec {container_id} psql -U adelmosilva -d pythonai_db -c "{sql}" """
-            tunnel.ssh_client.exec_command(cmd)
+        executar_via_ssh(tunnel, container_id, ["DELETE FROM tickets;"] + sql_recalcular_rollups())
         
         tunnel.ssh_client.close()
         print("✅ Dados limpos")
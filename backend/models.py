@@ -2,7 +2,7 @@
 Modelos SQLAlchemy para sistema de tickets
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Date
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Date, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -12,6 +12,16 @@ Base = declarative_base()
 class Ticket(Base):
     """Modelo para tickets/itens"""
     __tablename__ = 'tickets'
+    __table_args__ = (
+        # Filtros por período (+ status); INCLUDE deixa os painéis do mês em index-only scan
+        Index(
+            'idx_tickets_data_status', 'data_criacao', 'status',
+            postgresql_include=['componente', 'servidor_cluster', 'responsavel', 'tipo_item', 'relator']
+        ),
+        # Tops de abertos por servidor/módulo sem filtro de período
+        Index('idx_tickets_servidor_status', 'servidor_cluster', 'status'),
+        Index('idx_tickets_componente_status', 'componente', 'status'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -26,6 +36,10 @@ class Ticket(Base):
     data_atualizacao = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     servidor_cluster = Column(String(255), nullable=False, index=True)
     
+    # Sincronização incremental (ver auto_migrar.calcular_chaves)
+    chave_natural = Column(String(32), nullable=True, unique=True)
+    hash_conteudo = Column(String(32), nullable=True)
+    
     # Rastreamento
     criado_em = Column(DateTime, default=datetime.utcnow)
     atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -73,11 +87,11 @@ class Analise(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Referência
-    snapshot_id = Column(Integer, ForeignKey('snapshots.id'), nullable=False)
-    tipo_analise = Column(String(50), nullable=False, index=True)  # 'tipologia', 'top_modulos', 'top_servidores', 'origem'
+    snapshot_id = Column(Integer, ForeignKey('snapshots.id'), nullable=False, index=True)
+    tipo_analise = Column(String(50), nullable=False, index=True)  # Dimensão: 'componente', 'servidor_cluster', ... (rollups.DIMENSOES_ROLLUP)
     
     # Dados da análise (JSON armazenado como texto)
-    dados = Column(Text, nullable=False)  # JSON stringified
+    dados = Column(Text, nullable=False)  # JSON stringified: [[valor, total, abertos, fechados], ...]
     
     # Estatísticas
     total_registros = Column(Integer, default=0)
@@ -0,0 +1,126 @@
+"""
+Rollups mensais dos tickets nas tabelas `snapshots` e `analises`
+
+Recalculados no banco ao final de cada carga (auto_migrar), na mesma
+transação que altera `tickets`: os dashboards leem um Snapshot por mês
+(contadores) e uma Analise por dimensão do painel (contagens por valor)
+em vez de reagrupar a tabela de tickets a cada visualização.
+
+Só os meses marcados (sql_marcar_meses) são recalculados: a carga marca os
+meses em que algum ticket entrou, mudou ou saiu. Todo script que altera
+`tickets` por fora da carga deve rodar sql_recalcular_rollups em seguida.
+
+Formato de `analises.dados`: JSON com uma lista de
+[valor, total, abertos, fechados], do maior total para o menor.
+"""
+from typing import List
+
+# Dimensões com contagem por valor (uma Analise por mês e dimensão)
+DIMENSOES_ROLLUP = ['componente', 'servidor_cluster', 'responsavel', 'tipo_item', 'relator']
+
+# Tabelas de models.Snapshot e models.Analise (idempotente, para bancos criados por outros scripts)
+SQL_GARANTIR_TABELAS_ROLLUP = [
+    "CREATE TABLE IF NOT EXISTS snapshots ("
+    " id SERIAL PRIMARY KEY, mes INTEGER NOT NULL, ano INTEGER NOT NULL,"
+    " data_snapshot DATE NOT NULL UNIQUE,"
+    " total_tickets_abertos INTEGER DEFAULT 0, total_tickets_fechados INTEGER DEFAULT 0,"
+    " total_geral INTEGER DEFAULT 0, criado_em TIMESTAMP, atualizado_em TIMESTAMP);",
+    "CREATE TABLE IF NOT EXISTS analises ("
+    " id SERIAL PRIMARY KEY, snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),"
+    " tipo_analise VARCHAR(50) NOT NULL, dados TEXT NOT NULL,"
+    " total_registros INTEGER DEFAULT 0, total_abertos INTEGER DEFAULT 0,"
+    " total_fechados INTEGER DEFAULT 0, criado_em TIMESTAMP, atualizado_em TIMESTAMP);",
+    "CREATE INDEX IF NOT EXISTS ix_analises_snapshot_id ON analises (snapshot_id);",
+]
+
+# Tabela temporária com os meses (1º dia, coluna mes_ref) a recalcular
+TABELA_MESES = 'rollup_meses'
+
+# Todos os meses com tickets ou com Snapshot (recálculo completo)
+SQL_TODOS_OS_MESES = (
+    "SELECT date_trunc('month', data_criacao)::date AS mes_ref FROM tickets WHERE data_criacao IS NOT NULL"
+    " UNION SELECT data_snapshot FROM snapshots"
+)
+
+
+def sql_marcar_meses(consulta: str = SQL_TODOS_OS_MESES) -> List[str]:
+    """
+    Comandos que guardam em TABELA_MESES os meses a recalcular
+    
+    Args:
+        consulta: SELECT com a coluna mes_ref (date do 1º dia do mês); o
+            padrão marca todos os meses
+    
+    Returns:
+        Lista de comandos SQL
+    """
+    return [
+        f"DROP TABLE IF EXISTS {TABELA_MESES};",
+        f"CREATE TEMP TABLE {TABELA_MESES} AS SELECT DISTINCT mes_ref FROM ({consulta}) meses;",
+    ]
+
+
+def sql_atualizar_rollups() -> List[str]:
+    """
+    Comandos que recalculam os rollups dos meses marcados em TABELA_MESES
+    
+    Só os tickets desses meses são lidos (intervalos sobre data_criacao, que
+    usam o índice); os outros meses ficam como estão. Meses marcados que não
+    têm mais tickets perdem o Snapshot. Nenhum comando retorna linhas.
+    
+    Returns:
+        Lista de comandos SQL
+    """
+    dimensoes = ', '.join(f"('{d}', t.{d})" for d in DIMENSOES_ROLLUP)
+    intervalo = "t.data_criacao >= m.mes_ref AND t.data_criacao < m.mes_ref + INTERVAL '1 month'"
+    return [
+        f"DELETE FROM analises a USING snapshots s, {TABELA_MESES} m"
+        " WHERE a.snapshot_id = s.id AND s.data_snapshot = m.mes_ref;",
+        "WITH meses AS ("
+        " SELECT m.mes_ref, COUNT(t.data_criacao) AS total,"
+        " COUNT(*) FILTER (WHERE t.status != 'Fechado') AS abertos,"
+        " COUNT(*) FILTER (WHERE t.status = 'Fechado') AS fechados"
+        f" FROM {TABELA_MESES} m LEFT JOIN tickets t ON {intervalo}"
+        " GROUP BY m.mes_ref"
+        "), removidos AS ("
+        " DELETE FROM snapshots s USING meses m WHERE s.data_snapshot = m.mes_ref AND m.total = 0"
+        ")"
+        " INSERT INTO snapshots (mes, ano, data_snapshot, total_tickets_abertos, total_tickets_fechados,"
+        " total_geral, criado_em, atualizado_em)"
+        " SELECT EXTRACT(MONTH FROM mes_ref)::int, EXTRACT(YEAR FROM mes_ref)::int, mes_ref,"
+        " abertos, fechados, total, NOW(), NOW() FROM meses WHERE total > 0"
+        " ON CONFLICT (data_snapshot) DO UPDATE SET"
+        " total_tickets_abertos = EXCLUDED.total_tickets_abertos,"
+        " total_tickets_fechados = EXCLUDED.total_tickets_fechados,"
+        " total_geral = EXCLUDED.total_geral, atualizado_em = NOW();",
+        "INSERT INTO analises (snapshot_id, tipo_analise, dados, total_registros, total_abertos,"
+        " total_fechados, criado_em, atualizado_em)"
+        " SELECT s.id, c.dimensao,"
+        " json_agg(json_build_array(c.valor, c.total, c.abertos, c.fechados)"
+        " ORDER BY c.total DESC, c.valor)::text,"
+        " s.total_geral, s.total_tickets_abertos, s.total_tickets_fechados, NOW(), NOW()"
+        " FROM ("
+        " SELECT m.mes_ref, d.dimensao, d.valor,"
+        " COUNT(*) AS total,"
+        " COUNT(*) FILTER (WHERE t.status != 'Fechado') AS abertos,"
+        " COUNT(*) FILTER (WHERE t.status = 'Fechado') AS fechados"
+        f" FROM {TABELA_MESES} m JOIN tickets t ON {intervalo}"
+        f" CROSS JOIN LATERAL (VALUES {dimensoes}) AS d (dimensao, valor)"
+        " GROUP BY 1, 2, 3"
+        " ) c JOIN snapshots s ON s.data_snapshot = c.mes_ref"
+        " GROUP BY s.id, c.dimensao;",
+        f"DROP TABLE {TABELA_MESES};",
+    ]
+
+
+def sql_recalcular_rollups() -> List[str]:
+    """
+    Comandos que recalculam os rollups de todos os meses
+    
+    Para scripts que alteram `tickets` sem passar pela carga do auto_migrar
+    (limpeza, migrações); cria as tabelas de rollup se ainda não existirem.
+    
+    Returns:
+        Lista de comandos SQL
+    """
+    return SQL_GARANTIR_TABELAS_ROLLUP + sql_marcar_meses() + sql_atualizar_rollups()
@@ -0,0 +1,513 @@
+"""
+Consultas de tickets compartilhadas pelos serviços de banco (VPS e Supabase)
+
+As consultas rodam em um engine SQLAlchemy com pool de conexões
+(backend.database.criar_engine): cada chamada pega uma conexão já aberta
+do pool e os valores chegam tipados direto do driver.
+"""
+import json
+import pandas as pd
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+
+from app.utils.top_k import top_k
+from backend.cache_consultas import CacheConsultas
+from backend.rollups import DIMENSOES_ROLLUP
+
+
+# Traduzir valores de tipologia para português
+TRADUCAO_TIPOLOGIA = {
+    'Support': 'Suporte',
+    'Incident': 'Incidente',
+    'Suporte': 'Suporte',
+    'Incidente': 'Incidente',
+    'Tarefa': 'Tarefa'
+}
+
+# Widgets do painel: nome -> (coluna agrupada, contagem usada, limite)
+WIDGETS_PAINEL = {
+    'top_modulos': ('componente', 'abertos', 10),
+    'top_servidores': ('servidor_cluster', 'abertos', 10),
+    'top_responsaveis': ('responsavel', 'total', 10),
+    'tipologia': ('tipo_item', 'total', None),
+    'origem': ('relator', 'total', 10),
+    'componentes': ('componente', 'total', None),
+}
+
+# Colunas agrupadas no painel (ordem dos argumentos de GROUPING); as mesmas dos rollups mensais
+DIMENSOES_PAINEL = list(DIMENSOES_ROLLUP)
+
+
+def limites_mes(mes: int, ano: int) -> Tuple[datetime, datetime]:
+    """Retorna o intervalo semiaberto [início, fim) do mês"""
+    inicio = datetime(ano, mes, 1)
+    fim = datetime(ano + 1, 1, 1) if mes == 12 else datetime(ano, mes + 1, 1)
+    return inicio, fim
+
+
+def filtro_periodo(
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+    *condicoes: str,
+    coluna: str = 'data_criacao'
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Monta a cláusula WHERE de um período mais condições extras
+    
+    O período vira sempre um intervalo semiaberto sobre a própria coluna
+    (`coluna >= :data_inicio AND coluna < :data_fim`), com os limites como
+    parâmetros, para que o filtro use os índices que começam por ela.
+    Nunca aplicar funções (EXTRACT, date_trunc, ::date) à coluna aqui.
+    
+    Args:
+        inicio: Início do período (inclusivo) ou None
+        fim: Fim do período (exclusivo) ou None
+        condicoes: Condições SQL adicionais unidas com AND
+        coluna: Coluna de data filtrada
+    
+    Returns:
+        Tupla (cláusula WHERE ou "", parâmetros)
+    """
+    params = {}
+    partes = []
+    
+    if inicio is not None:
+        params['data_inicio'] = inicio
+        partes.append(f"{coluna} >= :data_inicio")
+    if fim is not None:
+        params['data_fim'] = fim
+        partes.append(f"{coluna} < :data_fim")
+    partes.extend(condicoes)
+    
+    filtro = f"WHERE {' AND '.join(partes)}" if partes else ""
+    return filtro, params
+
+
+class ServicoTicketsBase:
+    """Interface comum de consulta de tickets sobre um engine SQLAlchemy"""
+    
+    def __init__(self, engine: Optional[Engine] = None):
+        self.engine = engine
+        self.cache = CacheConsultas()
+    
+    def _sem_conexao(self):
+        """Chamado quando não há engine disponível (subclasses podem avisar o usuário)"""
+        raise Exception("Não conectado ao banco de dados")
+    
+    def _verificar_conexao(self):
+        """Garante que há um engine antes de consultar"""
+        if self.engine is None:
+            self._sem_conexao()
+    
+    def _executar(self, sql: str, params: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[tuple]]:
+        """
+        Executa uma consulta e retorna colunas e linhas como vieram do driver
+        
+        Resultados ficam no cache do serviço, chaveados pela consulta e pelos
+        parâmetros (período); quem chama não deve modificar as linhas.
+        Parâmetros com uma lista de valores (ex.: IN :datas) são expandidos
+        pelo SQLAlchemy, sem depender de o driver adaptar listas.
+        
+        Args:
+            sql: Consulta SQL (parâmetros no formato :nome)
+            params: Valores dos parâmetros
+        
+        Returns:
+            Tupla (nomes das colunas, lista de linhas)
+        """
+        params = params or {}
+        listas = [nome for nome, v in params.items() if isinstance(v, list)]
+        chave = (sql, tuple(sorted((n, tuple(v) if n in listas else v) for n, v in params.items())))
+        encontrado, valor = self.cache.obter(chave)
+        if encontrado:
+            return valor
+        
+        # Lida antes da consulta: uma invalidação no meio descarta o resultado
+        geracao = self.cache.geracao
+        consulta = text(sql).bindparams(*(bindparam(nome, expanding=True) for nome in listas))
+        with self.engine.connect() as conn:
+            resultado = conn.execute(consulta, params)
+            valor = (list(resultado.keys()), [tuple(linha) for linha in resultado])
+        
+        self.cache.guardar(chave, valor, geracao)
+        return valor
+    
+    def _executar_query(self, sql: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Executa query SQL e retorna DataFrame"""
+        self._verificar_conexao()
+        try:
+            colunas, linhas = self._executar(sql, params)
+            return pd.DataFrame.from_records(linhas, columns=colunas)
+        except Exception as e:
+            print(f"❌ Erro na query: {e}")
+            return pd.DataFrame()
+    
+    def _executar_pares(self, sql: str, params: Optional[Dict[str, Any]] = None) -> List[Tuple[str, int]]:
+        """Executa uma consulta de duas colunas (chave, total) e retorna a lista de pares"""
+        self._verificar_conexao()
+        try:
+            return [(chave, total) for chave, total in self._executar(sql, params)[1]]
+        except Exception as e:
+            print(f"❌ Erro na query: {e}")
+            return []
+    
+    @staticmethod
+    def _filtro_mes(mes: Optional[int], ano: Optional[int], *condicoes: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Monta a cláusula WHERE do mês (se informado) mais condições extras
+        
+        Args:
+            mes: Mês (1-12) ou None para todos os períodos
+            ano: Ano ou None para todos os períodos
+            condicoes: Condições SQL adicionais unidas com AND
+        
+        Returns:
+            Tupla (cláusula WHERE ou "", parâmetros)
+        """
+        if mes and ano:
+            return filtro_periodo(*limites_mes(mes, ano), *condicoes)
+        return filtro_periodo(None, None, *condicoes)
+    
+    def obter_tickets_abertos(self) -> pd.DataFrame:
+        """Obtém todos os tickets abertos"""
+        sql = "SELECT * FROM tickets WHERE status != 'Fechado' ORDER BY data_criacao DESC"
+        return self._executar_query(sql)
+    
+    def obter_tickets_por_periodo(self, mes: int, ano: int) -> pd.DataFrame:
+        """Obtém tickets de um período específico"""
+        filtro, params = self._filtro_mes(mes, ano)
+        sql = f"SELECT * FROM tickets {filtro} ORDER BY data_criacao DESC"
+        return self._executar_query(sql, params)
+    
+    def obter_top_modulos(self, mes: int = None, ano: int = None) -> List[Tuple[str, int]]:
+        """Obtém top 10 módulos por ticket abertos"""
+        filtro, params = self._filtro_mes(mes, ano, "status != 'Fechado'")
+        sql = f"""
+        SELECT componente, COUNT(*) as total
+        FROM tickets {filtro}
+        GROUP BY componente
+        ORDER BY total DESC
+        LIMIT 10
+        """
+        return self._executar_pares(sql, params)
+    
+    def obter_top_servidores(self, mes: int = None, ano: int = None) -> List[Tuple[str, int]]:
+        """Obtém top 10 servidores por tickets abertos"""
+        filtro, params = self._filtro_mes(mes, ano, "status != 'Fechado'")
+        sql = f"""
+        SELECT servidor_cluster, COUNT(*) as total
+        FROM tickets {filtro}
+        GROUP BY servidor_cluster
+        ORDER BY total DESC
+        LIMIT 10
+        """
+        return self._executar_pares(sql, params)
+    
+    def obter_top_responsaveis(self, mes: int = None, ano: int = None) -> List[Tuple[str, int]]:
+        """Obtém top 10 responsáveis por tickets"""
+        filtro, params = self._filtro_mes(mes, ano)
+        sql = f"""
+        SELECT responsavel, COUNT(*) as total
+        FROM tickets {filtro}
+        GROUP BY responsavel
+        ORDER BY total DESC
+        LIMIT 10
+        """
+        return self._executar_pares(sql, params)
+    
+    def obter_tipologia(self, mes: int = None, ano: int = None) -> List[Tuple[str, int]]:
+        """Obtém tipologia (tipo de item) dos tickets - apenas Support, Incident e Tarefa"""
+        filtro, params = self._filtro_mes(
+            mes, ano, "tipo_item IN ('Support', 'Incident', 'Tarefa', 'Suporte', 'Incidente')"
+        )
+        sql = f"""
+        SELECT tipo_item, COUNT(*) as total
+        FROM tickets {filtro}
+        GROUP BY tipo_item
+        ORDER BY total DESC
+        """
+        
+        return self._traduzir_tipologia(self._executar_pares(sql, params))
+    
+    @staticmethod
+    def _traduzir_tipologia(pares: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        """Traduz e soma os tipos (Support/Incident/Tarefa), garantindo os 3 tipos"""
+        resultado = {}
+        for tipo_original, total in pares:
+            if tipo_original not in TRADUCAO_TIPOLOGIA:
+                continue
+            tipo_traduzido = TRADUCAO_TIPOLOGIA[tipo_original]
+            resultado[tipo_traduzido] = resultado.get(tipo_traduzido, 0) + total
+        
+        # Garantir que sempre retorna os 3 tipos, mesmo com 0 tickets
+        for tipo in ('Suporte', 'Incidente', 'Tarefa'):
+            resultado.setdefault(tipo, 0)
+        
+        return sorted(resultado.items(), key=lambda x: x[1], reverse=True)
+    
+    def obter_origem(self, mes: int = None, ano: int = None) -> List[Tuple[str, int]]:
+        """Obtém origem (relator) dos tickets"""
+        filtro, params = self._filtro_mes(mes, ano)
+        sql = f"""
+        SELECT relator, COUNT(*) as total
+        FROM tickets {filtro}
+        GROUP BY relator
+        ORDER BY total DESC
+        LIMIT 10
+        """
+        return self._executar_pares(sql, params)
+    
+    def obter_componentes(self, mes: int = None, ano: int = None) -> List[Tuple[str, int]]:
+        """Obtém distribuição de tickets por componentes"""
+        filtro, params = self._filtro_mes(mes, ano)
+        sql = f"""
+        SELECT componente, COUNT(*) as total
+        FROM tickets {filtro}
+        GROUP BY componente
+        ORDER BY total DESC
+        """
+        return self._executar_pares(sql, params)
+    
+    def obter_resumo(self, mes: int = None, ano: int = None) -> Dict:
+        """Obtém resumo geral de tickets"""
+        filtro, params = self._filtro_mes(mes, ano)
+        sql = f"""
+        SELECT
+            COUNT(*) as total,
+            COUNT(*) FILTER (WHERE status != 'Fechado') as abertos,
+            COUNT(*) FILTER (WHERE status = 'Fechado') as fechados
+        FROM tickets {filtro}
+        """
+        
+        self._verificar_conexao()
+        try:
+            total, abertos, fechados = self._executar(sql, params)[1][0]
+        except Exception as e:
+            print(f"❌ Erro na query: {e}")
+            return {'total': 0, 'abertos': 0, 'fechados': 0}
+        
+        return {'total': total, 'abertos': abertos, 'fechados': fechados}
+    
+    def _agregar_tickets(self, periodos: Sequence[Optional[Tuple[int, int]]]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Agrega a tabela de tickets de vários períodos em uma única consulta
+        
+        Cada período vira um rótulo na CTE `periodos`; um único GROUP BY
+        GROUPING SETS calcula o resumo e a contagem de cada dimensão por
+        período.
+        
+        Args:
+            periodos: Lista de (mes, ano); None representa todos os períodos
+        
+        Returns:
+            Tupla (resumos, contagens por dimensão), na ordem de `periodos`
+        """
+        params = {}
+        valores = []
+        for i, periodo in enumerate(periodos):
+            params[f'inicio_{i}'], params[f'fim_{i}'] = limites_mes(*periodo) if periodo else (None, None)
+            valores.append(f"({i}, CAST(:inicio_{i} AS timestamp), CAST(:fim_{i} AS timestamp))")
+        
+        # Só com meses informados a junção é um intervalo puro, que usa o índice de data_criacao
+        juncao = "data_criacao >= periodos.inicio AND data_criacao < periodos.fim"
+        if not all(periodos):
+            juncao = f"periodos.inicio IS NULL OR ({juncao})"
+        
+        colunas = ', '.join(DIMENSOES_PAINEL)
+        conjuntos = ', '.join(['(p)'] + [f'(p, {d})' for d in DIMENSOES_PAINEL])
+        sql = f"""
+        WITH periodos (p, inicio, fim) AS (VALUES {', '.join(valores)})
+        SELECT
+            p, {colunas},
+            GROUPING({colunas}) as agrupamento,
+            COUNT(*) as total,
+            COUNT(*) FILTER (WHERE status != 'Fechado') as abertos,
+            COUNT(*) FILTER (WHERE status = 'Fechado') as fechados
+        FROM tickets
+        JOIN periodos ON {juncao}
+        GROUP BY GROUPING SETS ({conjuntos})
+        """
+        
+        try:
+            _, linhas = self._executar(sql, params)
+        except Exception as e:
+            print(f"❌ Erro na query: {e}")
+            linhas = []
+        
+        # GROUPING(...) tem um bit por dimensão (1 = não agrupada); a primeira é o bit mais alto
+        todos = (1 << len(DIMENSOES_PAINEL)) - 1
+        mascaras = {todos ^ (1 << (len(DIMENSOES_PAINEL) - 1 - i)): i for i in range(len(DIMENSOES_PAINEL))}
+        
+        resumos = [{'total': 0, 'abertos': 0, 'fechados': 0} for _ in periodos]
+        contagens = [{d: [] for d in DIMENSOES_PAINEL} for _ in periodos]
+        for linha in linhas:
+            p, chaves, agrupamento = linha[0], linha[1:-4], linha[-4]
+            total, abertos, fechados = linha[-3:]
+            if agrupamento == todos:
+                resumos[p] = {'total': total, 'abertos': abertos, 'fechados': fechados}
+            else:
+                i = mascaras[agrupamento]
+                contagens[p][DIMENSOES_PAINEL[i]].append((chaves[i], {'total': total, 'abertos': abertos}))
+        return resumos, contagens
+    
+    def _ler_rollups(self, meses: Sequence[Tuple[int, int]]) -> Dict[Tuple[int, int], Tuple[Dict, Dict]]:
+        """
+        Lê os rollups mensais (snapshots/analises) gravados na carga dos tickets
+        
+        Args:
+            meses: Lista de (mes, ano)
+        
+        Returns:
+            Dict (mes, ano) -> (resumo, contagens por dimensão), só com os meses que têm Snapshot
+        """
+        if not meses:
+            return {}
+        
+        sql = """
+        SELECT s.mes, s.ano, s.total_geral, s.total_tickets_abertos, s.total_tickets_fechados,
+            a.tipo_analise, a.dados
+        FROM snapshots s
+        LEFT JOIN analises a ON a.snapshot_id = s.id
+        WHERE s.data_snapshot IN :datas
+        """
+        datas = sorted({date(ano, mes, 1) for mes, ano in meses})
+        try:
+            _, linhas = self._executar(sql, {'datas': datas})
+        except Exception as e:
+            # Banco sem as tabelas de rollup: os painéis agregam os tickets
+            print(f"⚠️ Rollups indisponíveis: {e}")
+            return {}
+        
+        rollups = {}
+        for mes, ano, total, abertos, fechados, dimensao, dados in linhas:
+            resumo, contagens = rollups.setdefault(
+                (mes, ano),
+                ({'total': total, 'abertos': abertos, 'fechados': fechados}, {d: [] for d in DIMENSOES_PAINEL})
+            )
+            if dimensao in contagens:
+                contagens[dimensao] = [
+                    (valor, {'total': t, 'abertos': a}) for valor, t, a, _ in json.loads(dados)
+                ]
+        return rollups
+    
+    def obter_paineis(self, periodos: Sequence[Optional[Tuple[int, int]]]) -> List[Dict]:
+        """
+        Obtém os dados de todos os widgets de vários períodos
+        
+        Meses com rollup (backend.rollups) são lidos das tabelas snapshots e
+        analises; os demais (e o período geral) são agregados da tabela de
+        tickets em uma única consulta. Os tops são montados aqui a partir
+        das contagens por dimensão.
+        
+        Args:
+            periodos: Lista de (mes, ano); None representa todos os períodos
+        
+        Returns:
+            Lista (na ordem de `periodos`) de dicts com 'resumo' e as chaves de WIDGETS_PAINEL
+        """
+        return [self._montar_painel(resumo, contagens) for resumo, contagens in self._contagens_periodos(periodos)]
+    
+    def _contagens_periodos(self, periodos: Sequence[Optional[Tuple[int, int]]]) -> List[Tuple[Dict, Dict]]:
+        """Resumo e contagens por dimensão de cada período, dos rollups ou agregando os tickets"""
+        periodos = [tuple(p) if p else None for p in periodos]
+        
+        self._verificar_conexao()
+        rollups = self._ler_rollups([p for p in periodos if p])
+        pendentes = [i for i, p in enumerate(periodos) if p not in rollups]
+        agregados = {}
+        if pendentes:
+            resumos, contagens = self._agregar_tickets([periodos[i] for i in pendentes])
+            agregados = dict(zip(pendentes, zip(resumos, contagens)))
+        
+        return [agregados[i] if i in agregados else rollups[p] for i, p in enumerate(periodos)]
+    
+    def _montar_painel(self, resumo: Dict, por_dimensao: Dict) -> Dict:
+        """Monta os widgets do painel a partir das contagens por dimensão"""
+        painel = {'resumo': resumo}
+        for widget, (dimensao, contagem, limite) in WIDGETS_PAINEL.items():
+            # Desempate pelo nome, para a mesma ordem com rollups ou agregando os tickets
+            pares = ((chave, c[contagem]) for chave, c in por_dimensao[dimensao] if c[contagem])
+            painel[widget] = top_k(pares, limite)
+        painel['tipologia'] = self._traduzir_tipologia(painel['tipologia'])
+        return painel
+    
+    def obter_painel(self, mes: int = None, ano: int = None) -> Dict:
+        """Obtém os dados de todos os widgets de um período (ou geral) em uma consulta"""
+        return self.obter_paineis([(mes, ano) if mes and ano else None])[0]
+    
+    def obter_painel_acumulado(self, mes: int, ano: int) -> Dict:
+        """
+        Obtém o painel acumulado do ano (janeiro até mes/ano, inclusive)
+        
+        Soma as contagens parciais de cada mês (rollups mensais), sem
+        reagrupar os tickets do ano inteiro.
+        
+        Args:
+            mes: Último mês (1-12)
+            ano: Ano
+        
+        Returns:
+            Mesmo formato de obter_painel
+        """
+        resumo = {'total': 0, 'abertos': 0, 'fechados': 0}
+        somas = {d: {} for d in DIMENSOES_PAINEL}
+        for resumo_mes, contagens in self._contagens_periodos([(m, ano) for m in range(1, mes + 1)]):
+            for campo in resumo:
+                resumo[campo] += resumo_mes[campo]
+            for dimensao, pares in contagens.items():
+                for chave, c in pares:
+                    soma = somas[dimensao].setdefault(chave, {'total': 0, 'abertos': 0})
+                    soma['total'] += c['total']
+                    soma['abertos'] += c['abertos']
+        
+        return self._montar_painel(resumo, {d: list(c.items()) for d, c in somas.items()})
+    
+    def obter_tendencia_mensal(self, mes: int, ano: int, meses: int = 12) -> pd.DataFrame:
+        """
+        Obtém os contadores dos últimos `meses` meses até mes/ano (inclusive)
+        
+        Lê só os Snapshots do intervalo (uma linha pequena por mês); meses
+        sem tickets aparecem zerados.
+        
+        Args:
+            mes: Último mês da série (1-12)
+            ano: Ano do último mês
+            meses: Quantidade de meses
+        
+        Returns:
+            DataFrame com mes, ano, total, abertos e fechados, do mais antigo ao mais recente
+        """
+        indice = ano * 12 + mes - 1
+        serie = [((i % 12) + 1, i // 12) for i in range(indice - meses + 1, indice + 1)]
+        
+        sql = """
+        SELECT mes, ano, total_geral as total, total_tickets_abertos as abertos,
+            total_tickets_fechados as fechados
+        FROM snapshots
+        WHERE data_snapshot >= :data_inicio AND data_snapshot < :data_fim
+        """
+        params = {'data_inicio': date(serie[0][1], serie[0][0], 1), 'data_fim': limites_mes(mes, ano)[1].date()}
+        df = self._executar_query(sql, params)
+        
+        contadores = {(m, a): (t, ab, f) for m, a, t, ab, f in df.itertuples(index=False)} if not df.empty else {}
+        return pd.DataFrame(
+            [(m, a, *contadores.get((m, a), (0, 0, 0))) for m, a in serie],
+            columns=['mes', 'ano', 'total', 'abertos', 'fechados']
+        )
+    
+    def invalidar_cache(self):
+        """Descarta os resultados em cache deste serviço"""
+        self.cache.invalidar()
+    
+    def estatisticas_cache(self) -> Dict[str, Any]:
+        """Retorna acertos, falhas e tamanho do cache de consultas"""
+        return self.cache.estatisticas()
+    
+    def desconectar(self):
+        """Fecha as conexões do pool"""
+        if self.engine is not None:
+            self.engine.dispose()
+            self.engine = None
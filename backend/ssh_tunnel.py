@@ -1,10 +1,16 @@
 """
 Conexão SSH usando paramiko + psycopg2 direto
 """
-import paramiko
-import psycopg2
+import select
+import socketserver
+import threading
 from pathlib import Path
 import time
+from typing import TYPE_CHECKING
+
+# paramiko/psycopg2 só ao conectar: quem importa apenas as configurações não os carrega
+if TYPE_CHECKING:
+    import paramiko
 
 # Configurações SSH
 SSH_HOST = "91.108.124.150"
@@ -22,15 +28,59 @@ POSTGRES_DB = "pythonai_db"
 LOCAL_BIND_PORT = 5433
 
 
+# Intervalo (s) dos keepalives SSH: evita que NAT/firewall derrubem o túnel ocioso
+SSH_KEEPALIVE_INTERVALO = 30
+
+
+class _ServidorEncaminhamento(socketserver.ThreadingTCPServer):
+    """Servidor local que encaminha cada conexão por um canal SSH"""
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, endereco_local, gerenciador, destino):
+        super().__init__(endereco_local, _HandlerEncaminhamento)
+        self.gerenciador = gerenciador
+        self.destino = destino
+
+
+class _HandlerEncaminhamento(socketserver.BaseRequestHandler):
+    """Copia bytes entre o socket local e um canal direct-tcpip"""
+    
+    def handle(self):
+        try:
+            canal = self.server.gerenciador.abrir_canal(self.server.destino, self.request.getpeername())
+        except Exception as e:
+            print(f"❌ Erro ao abrir canal para {self.server.destino}: {e}")
+            return
+        
+        try:
+            while True:
+                prontos, _, _ = select.select([self.request, canal], [], [])
+                if self.request in prontos:
+                    dados = self.request.recv(16384)
+                    if not dados:
+                        break
+                    canal.sendall(dados)
+                if canal in prontos:
+                    dados = canal.recv(16384)
+                    if not dados:
+                        break
+                    self.request.sendall(dados)
+        finally:
+            canal.close()
+
+
 class SSHTunnelManager:
     def __init__(self):
         self.ssh_client = None
         self.transport = None
-        self.server = None
+        self.servidor_local = None
+        self._lock = threading.Lock()
         
     def conectar(self):
         """Estabelece conexão SSH"""
         print(f"🔧 Conectando SSH a {SSH_HOST}...")
+        import paramiko
         
         try:
             self.ssh_client = paramiko.SSHClient()
@@ -44,6 +94,8 @@ class SSHTunnelManager:
                 key_filename=str(SSH_KEY_PATH),
                 timeout=10
             )
+            self.transport = self.ssh_client.get_transport()
+            self.transport.set_keepalive(SSH_KEEPALIVE_INTERVALO)
             
             print(f"✅ SSH conectado com sucesso!")
             return True
@@ -52,18 +104,75 @@ class SSHTunnelManager:
             print(f"❌ Erro ao conectar SSH: {e}")
             return False
     
+    def esta_ativo(self) -> bool:
+        """Verifica se o transporte SSH continua ativo"""
+        return self.transport is not None and self.transport.is_active()
+    
+    def obter_transport(self) -> "paramiko.Transport":
+        """
+        Retorna o transporte SSH ativo, reconectando se ele caiu
+        
+        Returns:
+            paramiko.Transport ativo
+        """
+        with self._lock:
+            if not self.esta_ativo():
+                print("⚠️  Transporte SSH inativo, reconectando...")
+                if self.ssh_client:
+                    self.ssh_client.close()
+                if not self.conectar():
+                    raise ConnectionError(f"Não foi possível reconectar SSH a {SSH_HOST}")
+            return self.transport
+    
+    def abrir_canal(self, destino, origem) -> "paramiko.Channel":
+        """
+        Abre um canal direct-tcpip, tentando de novo após reconectar se falhar
+        
+        Args:
+            destino: (host, porta) visto a partir do servidor SSH
+            origem: (host, porta) da conexão local
+        
+        Returns:
+            paramiko.Channel aberto
+        """
+        import paramiko
+        
+        try:
+            return self.obter_transport().open_channel('direct-tcpip', destino, origem)
+        except (paramiko.SSHException, EOFError, OSError):
+            with self._lock:
+                if self.transport is not None:
+                    self.transport.close()
+            return self.obter_transport().open_channel('direct-tcpip', destino, origem)
+    
+    def descobrir_container(self) -> str:
+        """Retorna o ID do container PostgreSQL em execução ("" se não houver)"""
+        self.obter_transport()
+        stdin, stdout, stderr = self.ssh_client.exec_command("docker ps | grep postgres")
+        output = stdout.read().decode()
+        return output.split()[0] if output else ""
+    
+    def descobrir_ip_container(self, container_id: str) -> str:
+        """
+        Retorna o IP do container na rede do Docker
+        
+        O nome do serviço (POSTGRES_HOST) só resolve dentro da rede do
+        Docker; a partir do host SSH é preciso usar o IP do container.
+        """
+        stdin, stdout, stderr = self.ssh_client.exec_command(
+            f"docker inspect -f '{{{{range .NetworkSettings.Networks}}}}{{{{.IPAddress}}}} {{{{end}}}}' {container_id}"
+        )
+        return stdout.read().decode().split()[0]
+    
     def criar_tunnel(self):
-        """Cria tunnel para PostgreSQL"""
+        """Cria tunnel para PostgreSQL na porta local LOCAL_BIND_PORT"""
         print(f"🔧 Criando tunnel para PostgreSQL...")
         
         try:
-            self.transport = self.ssh_client.get_transport()
-            self.server = self.transport.open_channel(
-                'direct-tcpip',
-                (POSTGRES_HOST, POSTGRES_PORT),
-                ('127.0.0.1', 0)
-            )
-            print(f"✅ Tunnel criado na porta local {LOCAL_BIND_PORT}")
+            container_id = self.descobrir_container()
+            destino = self.descobrir_ip_container(container_id) if container_id else POSTGRES_HOST
+            porta = self.iniciar_encaminhamento(destino, POSTGRES_PORT, LOCAL_BIND_PORT)
+            print(f"✅ Tunnel criado na porta local {porta}")
             return True
             
         except Exception as e:
@@ -73,17 +182,20 @@ class SSHTunnelManager:
     def testar_postgres(self):
         """Testa conexão com PostgreSQL"""
         print(f"🔍 Testando conexão com PostgreSQL...")
+        import psycopg2
         
         try:
-            # Conectar via paramiko socket
-            sock = self.ssh_client.get_transport().open_session()
+            if self.servidor_local is None and not self.criar_tunnel():
+                return False
+            
+            # Conectar pela porta local encaminhada
             conn = psycopg2.connect(
-                host=POSTGRES_HOST,
-                port=POSTGRES_PORT,
+                host='127.0.0.1',
+                port=self.servidor_local.server_address[1],
                 user=POSTGRES_USER,
                 password=POSTGRES_PASSWORD,
                 database=POSTGRES_DB,
-                timeout=5
+                connect_timeout=5
             )
             
             cur = conn.cursor()
@@ -100,8 +212,39 @@ class SSHTunnelManager:
             print(f"❌ Erro ao testar PostgreSQL: {e}")
             return False
     
+    def iniciar_encaminhamento(self, host_remoto: str = POSTGRES_HOST, porta_remota: int = POSTGRES_PORT,
+                               porta_local: int = 0) -> int:
+        """
+        Abre uma porta local encaminhada para host_remoto:porta_remota via SSH
+        
+        Cada conexão aceita vira um canal no mesmo transporte SSH, então um
+        pool de conexões do banco pode usar a porta normalmente. Se o SSH
+        cair, a próxima conexão reconecta antes de abrir o canal.
+        
+        Args:
+            host_remoto: Host de destino visto a partir do servidor SSH
+            porta_remota: Porta de destino
+            porta_local: Porta local (0 escolhe uma livre)
+        
+        Returns:
+            Porta local em que o encaminhamento está escutando
+        """
+        if self.servidor_local is not None:
+            self.servidor_local.destino = (host_remoto, porta_remota)
+            return self.servidor_local.server_address[1]
+        
+        self.servidor_local = _ServidorEncaminhamento(
+            ('127.0.0.1', porta_local), self, (host_remoto, porta_remota)
+        )
+        threading.Thread(target=self.servidor_local.serve_forever, daemon=True).start()
+        return self.servidor_local.server_address[1]
+    
     def fechar(self):
         """Fecha todas as conexões"""
+        if self.servidor_local:
+            self.servidor_local.shutdown()
+            self.servidor_local.server_close()
+            self.servidor_local = None
         if self.ssh_client:
             self.ssh_client.close()
             print("✅ SSH desconectado")
@@ -115,7 +258,7 @@ def testar_simples():
     
     manager = SSHTunnelManager()
     
-    if manager.conectar():
+    if manager.conectar() and manager.criar_tunnel():
         print("\n✅ Agora você pode usar:")
         print(f"   postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}")
         print(f"\nSe via SSH tunnel local, use:")
@@ -6,14 +6,16 @@ Serviço para conectar ao Supabase (PostgreSQL na nuvem)
 from . import ipv4_socket_wrapper
 
 import os
-import pandas as pd
-import psycopg2
-from psycopg2 import sql
 import streamlit as st
 from typing import Optional
 import socket
 import time
 
+from sqlalchemy.engine import URL
+
+from backend.database import criar_engine
+from backend.servico_base import ServicoTicketsBase
+
 # Credenciais Supabase
 SUPABASE_HOST = "db.nmsarhysujzhpjbpnqtl.supabase.co"
 SUPABASE_USER = "postgres"
@@ -35,11 +37,11 @@ def resolve_ipv4_only(hostname, port):
         print(f"⚠️ IPv4 resolution failed for {hostname}: {e}")
     return hostname
 
-class SupabaseTicketService:
+class SupabaseTicketService(ServicoTicketsBase):
     """Serviço para acessar tickets do Supabase"""
     
     def __init__(self):
-        self.connection = None
+        super().__init__()
         self._conectar()
     
     def _conectar(self):
@@ -66,21 +68,32 @@ class SupabaseTicketService:
             # Resolver apenas IPv4 (disable IPv6)
             ipv4_host = resolve_ipv4_only(host, port)
             
-            # Conectar com retry e keepalives
+            # Pool de conexões com keepalives
+            engine = criar_engine(
+                URL.create(
+                    "postgresql+psycopg2",
+                    username=user,
+                    password=password,
+                    host=ipv4_host,
+                    port=port,
+                    database=database
+                ),
+                connect_args={
+                    "connect_timeout": 15,
+                    "application_name": "tickets_app",
+                    "keepalives": 1,
+                    "keepalives_idle": 10,
+                    "keepalives_interval": 5,
+                    "keepalives_count": 5
+                }
+            )
+            
+            # Validar a primeira conexão com retry
             for attempt in range(3):
                 try:
-                    self.connection = psycopg2.connect(
-                        host=ipv4_host,
-                        port=port,
-                        user=user,
-                        password=password,
-                        database=database,
-                        connect_timeout=15,
-                        keepalives=1,
-                        keepalives_idle=10,
-                        keepalives_interval=5,
-                        keepalives_count=5
-                    )
+                    with engine.connect():
+                        pass
+                    self.engine = engine
                     print("✅ Conectado ao Supabase!")
                     break
                 except Exception as e:
@@ -88,58 +101,19 @@ class SupabaseTicketService:
                         time.sleep(2)
                         continue
                     raise
-            
-        except Exception as e:
-            print(f"❌ Erro ao conectar ao Supabase: {e}")
-            self.connection = None
-    
-    def _executar_query(self, sql_query: str) -> pd.DataFrame:
-        """Executa query SQL e retorna DataFrame"""
-        if not self.connection:
-            raise Exception("Não conectado ao Supabase")
         
-        try:
-            df = pd.read_sql_query(sql_query, self.connection)
-            return df
         except Exception as e:
-            print(f"❌ Erro na query: {e}")
-            return pd.DataFrame()
-    
-    def obter_resumo(self) -> dict:
-        """Obtém resumo dos tickets"""
-        sql_query = """
-        SELECT 
-            COUNT(*) as total,
-            COUNT(CASE WHEN status != 'Fechado' THEN 1 END) as abertos,
-            COUNT(CASE WHEN status = 'Fechado' THEN 1 END) as fechados
-        FROM tickets
-        """
-        df = self._executar_query(sql_query)
-        
-        if df.empty:
-            return {"total": 0, "abertos": 0, "fechados": 0}
-        
-        return df.iloc[0].to_dict()
-    
-    def obter_tickets_abertos(self) -> pd.DataFrame:
-        """Obtém todos os tickets abertos"""
-        sql_query = "SELECT * FROM tickets WHERE status != 'Fechado' ORDER BY data_criacao DESC"
-        return self._executar_query(sql_query)
+            print(f"❌ Erro ao conectar ao Supabase: {e}")
+            self.engine = None
     
-    def obter_tickets_por_periodo(self, mes: int, ano: int) -> pd.DataFrame:
-        """Obtém tickets de um período específico"""
-        sql_query = f"""
-        SELECT * FROM tickets 
-        WHERE EXTRACT(MONTH FROM data_criacao) = {mes} 
-        AND EXTRACT(YEAR FROM data_criacao) = {ano}
-        ORDER BY data_criacao DESC
-        """
-        return self._executar_query(sql_query)
+    def _sem_conexao(self):
+        """Sem engine não há como consultar o Supabase"""
+        raise Exception("Não conectado ao Supabase")
     
     def fechar_conexao(self):
         """Fecha a conexão"""
-        if self.connection:
-            self.connection.close()
+        if self.engine is not None:
+            self.desconectar()
             print("Conexão fechada")
 
 # Singleton para reutilizar conexão
@@ -0,0 +1,80 @@
+"""
+Configuração comum dos testes
+
+Os módulos da aplicação são importados como `app.*` (backend/ no sys.path)
+e os scripts de banco como `backend.*` (raiz do projeto no sys.path).
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+for caminho in (BACKEND_DIR.parent, BACKEND_DIR):
+    if str(caminho) not in sys.path:
+        sys.path.insert(0, str(caminho))
+
+from app.models.ticket import Ticket
+
+
+def criar_ticket(numero, tipologia, componente, servidor, status, data_abertura,
+                 responsavel=None, prioridade=None, relator=None):
+    """Ticket com título/descrição/origem derivados, como o parser do Jira monta"""
+    return Ticket(
+        f"JIRA-{numero:04d}", f"{tipologia} - {componente}", f"{componente} - {status}",
+        tipologia, componente, componente, servidor, status, data_abertura,
+        None, responsavel, relator, prioridade
+    )
+
+
+@pytest.fixture
+def tickets():
+    """Amostra com valores ausentes, status abertos/fechados/cancelados e dois meses"""
+    jan, fev = datetime(2025, 1, 10, 9, 30), datetime(2025, 2, 3, 14, 0)
+    return [
+        criar_ticket(1, 'Support', 'Database', 'srv-db01', 'Aberta', jan, 'Ana', 'High'),
+        criar_ticket(2, 'Support', 'Database', 'srv-db01', 'Fechada', jan, 'Ana', 'Low'),
+        criar_ticket(3, 'Incident', 'Middleware', 'srv-app02', 'Em Progresso', jan, None, 'High'),
+        criar_ticket(4, 'Task', 'Middleware', None, 'Cancelado', jan, 'Bruno', None),
+        criar_ticket(5, 'Incident', 'Infraestruturas', 'cluster-k8s', 'Aberta', jan, 'Bruno', 'Critical'),
+        criar_ticket(6, 'Support', 'PSRM', 'srv-app02', 'Fechada', fev, 'Carla', 'Medium'),
+        criar_ticket(7, 'Support', 'Database', 'srv-db02', 'Aberta', fev, 'Ana', 'Low'),
+        criar_ticket(8, 'Task', 'Portal', None, 'Aberta', fev, None, None),
+        criar_ticket(9, 'Incident', 'Database', 'srv-db01', 'FECHADA', fev, 'Carla', 'High'),
+        criar_ticket(10, 'Support', 'Middleware', 'srv-app02', 'Aberta', fev, 'Bruno', 'Medium'),
+    ]
+
+
+CABECALHO_JIRA = (
+    'Tipo de item', 'Responsável', 'Relator', 'Componentes', 'Prioridade',
+    'Status', 'Criado', 'Atualizado(a)', 'Servidores / Cluster'
+)
+
+LINHAS_JIRA = [
+    ('Support', 'João', 'Ana', 'Database', 'High', 'Aberta', '10/01/2025 09:30', '12/01/2025 10:00', 'srv-db01'),
+    ('Tarefa', 'Ana', 'Bruno', 'Middleware', 'Low', 'Fechada', '10/01/2025 11:00', '15/01/2025 17:45', 'srv-app02'),
+    ('Incidente', '', 'Carla', 'Infraestruturas', 'Critical', 'Em Progresso', '31/01/2025 23:59', '', ''),
+    ('Support', 'Conceição', 'Ana', 'Database', '', 'Cancelado', '01/02/2025 00:00', '02/02/2025 08:00', 'srv-db02'),
+    ('Bug', 'João', 'Bruno', 'PSRM', 'Medium', 'Fechada', '03/02/2025 14:00', '04/02/2025 09:15', 'srv-app02'),
+    ('Support', 'Ana', 'Carla', 'Portal', 'High', 'Aberta', '28/02/2025 16:20', '28/02/2025 16:20', 'srv-web01'),
+    ('Tarefa', 'Bruno', 'Ana', 'Database', 'Medium', 'Aberta', '03/03/2025 08:05', '05/03/2025 12:00', 'srv-db01'),
+]
+
+
+@pytest.fixture
+def montar_csv_jira():
+    """Monta um CSV no formato da exportação do Jira (';', datas DD/MM/YYYY HH:MM)"""
+    def montar(linhas=LINHAS_JIRA, encoding='utf-8'):
+        texto = ''.join(';'.join(linha) + '\n' for linha in [CABECALHO_JIRA, *linhas])
+        return texto.encode(encoding)
+    return montar
+
+
+@pytest.fixture
+def csv_jira(tmp_path, montar_csv_jira):
+    """Caminho de um CSV do Jira com LINHAS_JIRA em UTF-8"""
+    caminho = tmp_path / 'JIRA_02_2025.csv'
+    caminho.write_bytes(montar_csv_jira())
+    return caminho
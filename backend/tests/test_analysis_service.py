@@ -0,0 +1,122 @@
+"""
+Testes do agrupamento em passagem única (AnalysisService.agrupar)
+"""
+
+from datetime import datetime
+
+from app.models.ticket_frame import TicketFrame
+from app.services.analysis_service import DIMENSOES, AcumuladoAnual, AnalysisService, TicketAggregate
+from tests.conftest import criar_ticket
+
+
+def _contar(tickets, extrair):
+    """Contagem de referência, uma dimensão por vez"""
+    contagens = {}
+    for ticket in tickets:
+        contagem = contagens.setdefault(extrair(ticket), {'total': 0, 'abertos': 0, 'fechados': 0})
+        contagem['total'] += 1
+        contagem['abertos' if ticket.esta_aberto else 'fechados'] += 1
+    return contagens
+
+
+def test_agrupar_igual_a_contagem_por_dimensao(tickets):
+    agrupamento = AnalysisService.agrupar(tickets)
+    
+    assert set(agrupamento) == set(DIMENSOES)
+    assert agrupamento['tipologia'] == _contar(tickets, lambda t: t.tipologia)
+    assert agrupamento['componente'] == _contar(tickets, lambda t: t.componente)
+
+
+def test_agrupar_percorre_o_iteravel_uma_vez(tickets):
+    agrupamento = AnalysisService.agrupar(iter(tickets), ['tipologia', 'servidor'])
+    
+    assert sum(c['total'] for c in agrupamento['tipologia'].values()) == len(tickets)
+    assert sum(c['total'] for c in agrupamento['servidor'].values()) == len(tickets)
+
+
+def test_agrupar_normaliza_valores_ausentes(tickets):
+    agrupamento = AnalysisService.agrupar(tickets, ['servidor', 'responsavel', 'prioridade', 'origem'])
+    
+    assert agrupamento['servidor']['Não especificado'] == {'total': 2, 'abertos': 1, 'fechados': 1}
+    assert agrupamento['responsavel']['Não atribuído']['total'] == 2
+    assert agrupamento['prioridade']['Não especificada']['total'] == 2
+    assert agrupamento['origem']['Infra'] == {'total': 1, 'abertos': 1, 'fechados': 0}
+    assert None not in agrupamento['servidor']
+
+
+def test_status_fechado_ignora_maiusculas_e_inclui_cancelado(tickets):
+    database = AnalysisService.agrupar(tickets, ['componente'])['componente']['Database']
+    
+    # 'Fechada' e 'FECHADA' contam como fechados; 'Cancelado' (Middleware) também
+    assert database == {'total': 4, 'abertos': 2, 'fechados': 2}
+    assert AnalysisService.analisar_por_componente(tickets)['Middleware']['fechados'] == 1
+
+
+def test_analises_por_dimensao_usam_o_agrupamento(tickets):
+    agrupamento = AnalysisService.agrupar(tickets)
+    
+    assert AnalysisService.analisar_por_tipologia(tickets) == agrupamento['tipologia']
+    assert AnalysisService.analisar_por_origem(tickets) == agrupamento['origem']
+    assert AnalysisService.analisar_por_servidor(tickets) == agrupamento['servidor']
+    assert AnalysisService.analisar_por_responsavel(tickets) == agrupamento['responsavel']
+
+
+def test_agrupar_sem_tickets():
+    assert AnalysisService.agrupar([], ['tipologia']) == {'tipologia': {}}
+
+
+def test_acumulado_ate_igual_a_agrupar_os_meses(tickets):
+    dezembro = criar_ticket(11, 'Task', 'Portal', None, 'Aberta', datetime(2024, 12, 5))
+    marco = criar_ticket(12, 'Support', 'PSRM', 'srv-app02', 'Fechada', datetime(2025, 3, 2))
+    acumulado = AcumuladoAnual()
+    acumulado.adicionar_tickets(tickets + [dezembro, marco])
+    
+    assert acumulado.ate(2025, 1) == TicketAggregate.from_tickets(tickets[:5])
+    assert acumulado.ate(2025, 2) == TicketAggregate.from_tickets(tickets)
+    # O acumulado recomeça em janeiro: dezembro de 2024 fica de fora
+    assert acumulado.ate(2025, 3) == TicketAggregate.from_tickets(tickets + [marco])
+    assert acumulado.ate(2024, 12) == TicketAggregate.from_tickets([dezembro])
+    assert acumulado.total() == TicketAggregate.from_tickets(tickets + [dezembro, marco])
+
+
+def test_acumulado_de_frame_igual_a_lista(tickets):
+    por_lista, por_frame = AcumuladoAnual(), AcumuladoAnual()
+    por_lista.adicionar_tickets(tickets)
+    por_frame.adicionar_tickets(TicketFrame.from_tickets(tickets))
+    
+    assert por_frame.parciais == por_lista.parciais
+    assert por_frame.ate(2025, 2) == por_lista.ate(2025, 2)
+
+
+def test_adicionar_mes_anterior_invalida_acumulados_seguintes(tickets):
+    acumulado = AcumuladoAnual()
+    acumulado.adicionar_tickets(tickets)
+    assert acumulado.ate(2025, 2).dimensao('tipologia')['Support']['total'] == 5
+    
+    acumulado.adicionar_tickets([criar_ticket(11, 'Support', 'Portal', None, 'Aberta', datetime(2025, 1, 20))])
+    
+    assert acumulado.ate(2025, 1).dimensao('tipologia')['Support']['total'] == 3
+    assert acumulado.ate(2025, 2).dimensao('tipologia')['Support']['total'] == 6
+
+
+def test_soma_de_agregados_igual_a_agregar_tudo(tickets):
+    a, b, c = (TicketAggregate.from_tickets(parte) for parte in (tickets[:3], tickets[3:7], tickets[7:]))
+    
+    assert (a + b) + c == a + (b + c) == TicketAggregate.from_tickets(tickets)
+    assert a + b == b + a
+    assert sum([a, b, c]) == TicketAggregate.from_tickets(tickets)
+    assert a + TicketAggregate() == a
+
+
+def test_agregado_em_lotes_igual_ao_de_uma_vez(tickets):
+    lotes = [tickets[:4], TicketFrame.from_tickets(tickets[4:])]
+    
+    assert TicketAggregate.from_lotes(lotes) == TicketAggregate.from_tickets(tickets)
+
+
+def test_agregado_serializado_volta_igual(tickets):
+    agregado = TicketAggregate.from_tickets(tickets)
+    
+    assert TicketAggregate.from_dict(agregado.to_dict()) == agregado
+    assert agregado.total == len(tickets)
+    assert agregado.resumo() == AnalysisService.calcular_resumo_executivo(tickets)
@@ -0,0 +1,190 @@
+"""
+Testes da carga do CSV no banco (normalização, dados e script do COPY)
+
+O script enviado ao psql é capturado por um canal SSH falso; nenhum banco
+é necessário.
+"""
+
+import csv
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from backend import auto_migrar
+from backend.auto_migrar import (
+    COLUNAS_COPY, COLUNAS_TICKETS, calcular_chaves, carregar_via_ssh, executar_via_ssh, ler_csv_normalizado
+)
+from backend.rollups import SQL_TODOS_OS_MESES, TABELA_MESES, sql_recalcular_rollups
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+class _CanalFalso:
+    """Imita os streams de exec_command do paramiko, guardando o que é escrito"""
+    
+    def __init__(self, saida=b''):
+        self.escrito = io.BytesIO()
+        self.saida = saida
+        self.channel = self
+    
+    def write(self, dados):
+        self.escrito.write(dados)
+    
+    def read(self):
+        return self.saida
+    
+    def shutdown_write(self):
+        pass
+    
+    def recv_exit_status(self):
+        return 0
+
+
+class _TunelFalso:
+    def __init__(self, saida):
+        self.stdin, self.stdout, self.stderr = _CanalFalso(), _CanalFalso(saida), _CanalFalso()
+        self.ssh_client = self
+    
+    def exec_command(self, comando):
+        self.comando = comando
+        return self.stdin, self.stdout, self.stderr
+
+
+def test_ler_csv_normalizado(csv_jira):
+    tickets = ler_csv_normalizado(csv_jira)
+    
+    assert list(tickets.columns) == COLUNAS_TICKETS
+    assert len(tickets) == 7
+    primeiro = tickets.iloc[0]
+    assert primeiro['responsavel'] == 'João'
+    assert primeiro['data_criacao'] == '2025-01-10 09:30:00'
+    # Células vazias ficam '' (e não 'nan')
+    assert tickets.iloc[2]['responsavel'] == ''
+    assert tickets.iloc[2]['data_atualizacao'] is None
+
+
+def test_ler_csv_normalizado_cp1252(tmp_path, montar_csv_jira):
+    caminho = tmp_path / 'cp1252.csv'
+    caminho.write_bytes(montar_csv_jira(encoding='cp1252'))
+    
+    assert 'Conceição' in ler_csv_normalizado(caminho)['responsavel'].tolist()
+
+
+def test_blocos_do_copy_reproduzem_as_linhas(csv_jira, monkeypatch):
+    monkeypatch.setattr(auto_migrar, 'LINHAS_POR_BLOCO_COPY', 3)
+    tickets = ler_csv_normalizado(csv_jira)
+    
+    blocos = list(auto_migrar._blocos_csv(tickets))
+    
+    assert len(blocos) == 3
+    linhas = list(csv.reader(io.StringIO(''.join(blocos))))
+    assert linhas == [['' if v is None else v for v in linha] for linha in tickets.itertuples(index=False)]
+
+
+def test_copy_nao_converte_texto_vazio_em_null():
+    sql = auto_migrar._sql_copy()
+    
+    assert sql.startswith('COPY tickets_staging (')
+    assert 'FROM STDIN' in sql
+    assert 'FORCE_NOT_NULL (tipo_item, responsavel' in sql
+    assert 'data_' not in sql.split('FORCE_NOT_NULL')[1]
+
+
+def test_chave_natural_nao_depende_da_ordem_nem_do_status(csv_jira):
+    tickets = ler_csv_normalizado(csv_jira)
+    alterados = tickets.iloc[::-1].reset_index(drop=True)
+    alterados.loc[0, 'status'] = 'Fechada'
+    
+    original = calcular_chaves(tickets)
+    novo = calcular_chaves(alterados).iloc[::-1].reset_index(drop=True)
+    
+    assert list(original.columns) == COLUNAS_COPY
+    assert original['chave_natural'].tolist() == novo['chave_natural'].tolist()
+    # Só o ticket cujo status mudou tem outro hash de conteúdo
+    diferentes = (original['hash_conteudo'] != novo['hash_conteudo']).tolist()
+    assert diferentes == [False] * 6 + [True]
+
+
+def test_tickets_iguais_na_chave_natural_continuam_distintos(csv_jira):
+    tickets = ler_csv_normalizado(csv_jira)
+    repetidos = pd.concat([tickets.iloc[[0]], tickets.iloc[[0]]], ignore_index=True)
+    
+    chaves = calcular_chaves(repetidos)
+    
+    assert chaves['chave_natural'].nunique() == 2
+    assert chaves['hash_conteudo'].nunique() == 1
+
+
+def test_sql_aplicar_por_modo():
+    completo = ' '.join(auto_migrar._sql_aplicar('completo'))
+    incremental = ' '.join(auto_migrar._sql_aplicar('incremental'))
+    
+    assert 'TRUNCATE tickets;' in completo
+    assert 'TRUNCATE' not in incremental
+    assert 'ON CONFLICT (chave_natural) DO UPDATE' in incremental
+    # Linhas sem alteração não são regravadas
+    assert 'WHERE tickets.hash_conteudo IS DISTINCT FROM EXCLUDED.hash_conteudo' in incremental
+
+
+def test_rollups_so_dos_meses_alterados():
+    completo = auto_migrar._sql_aplicar('completo')
+    incremental = auto_migrar._sql_aplicar('incremental')
+    
+    # Os meses são marcados antes do upsert (que apaga as linhas antigas)
+    assert auto_migrar.SQL_MESES_ALTERADOS in incremental[1]
+    assert TABELA_MESES in incremental[1]
+    assert any('ON CONFLICT (chave_natural)' in c for c in incremental[2:])
+    assert SQL_TODOS_OS_MESES in ' '.join(completo)
+    for comandos in (completo, incremental):
+        assert 'DELETE FROM analises;' not in comandos
+        assert comandos[-1] == f'DROP TABLE {TABELA_MESES};'
+
+
+def test_carga_via_ssh_envia_um_script_em_transacao(csv_jira):
+    tunel = _TunelFalso(saida=b'5|1|2\n7\n')
+    
+    resultado = carregar_via_ssh(calcular_chaves(ler_csv_normalizado(csv_jira)), tunel, 'container')
+    
+    assert resultado == {'inseridos': 5, 'atualizados': 1, 'removidos': 2, 'total_banco': 7}
+    assert 'ON_ERROR_STOP=1' in tunel.comando
+    script = tunel.stdin.escrito.getvalue().decode('utf-8')
+    comandos, dados = script.split(auto_migrar._sql_copy() + '\n')
+    assert comandos.startswith("SET client_encoding TO 'UTF8';\n")
+    # Colunas de controle criadas antes da transação da carga
+    assert comandos.index('ADD COLUMN IF NOT EXISTS chave_natural') < comandos.index('BEGIN;')
+    dados, fim = dados.split('\\.\n')
+    assert 'Conceição' in dados
+    assert len(pd.read_csv(io.StringIO(dados), header=None)) == 7
+    assert 'ON CONFLICT (chave_natural)' in fim
+    assert fim.rstrip().endswith('COMMIT;')
+
+
+def test_executar_via_ssh_em_uma_transacao():
+    tunel = _TunelFalso(saida=b'')
+    
+    executar_via_ssh(tunel, 'container', ['DELETE FROM tickets;'] + sql_recalcular_rollups())
+    
+    assert 'ON_ERROR_STOP=1' in tunel.comando
+    script = tunel.stdin.escrito.getvalue().decode('utf-8')
+    assert script.startswith('BEGIN;\nDELETE FROM tickets;\n')
+    assert script.rstrip().endswith('COMMIT;')
+
+
+def test_carga_usa_os_mesmos_modulos_da_aplicacao(csv_jira):
+    # Num processo novo, como o dashboard: `app.*` com backend/ no sys.path
+    script = (
+        f"import json, sys; sys.path.insert(1, {str(BACKEND_DIR.parent)!r})\n"
+        "from backend.auto_migrar import ler_csv_normalizado\n"
+        f"ler_csv_normalizado({str(csv_jira)!r})\n"
+        "print(json.dumps(sorted(m for m in sys.modules if m.startswith('backend.app'))))"
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    
+    # Uma segunda cópia (backend.app.*) não compartilharia caches nem a instrumentação
+    assert json.loads(saida.stdout) == []
@@ -0,0 +1,92 @@
+"""
+Testes do cache de consultas (TTL + LRU)
+"""
+
+from backend import cache_consultas
+from backend.cache_consultas import CacheConsultas, invalidar_caches
+
+
+class _Relogio:
+    """Substituto de time.monotonic controlado pelo teste"""
+    
+    def __init__(self):
+        self.agora = 1000.0
+    
+    def __call__(self):
+        return self.agora
+
+
+def test_resultado_expira_apos_o_ttl(monkeypatch):
+    relogio = _Relogio()
+    monkeypatch.setattr(cache_consultas.time, 'monotonic', relogio)
+    cache = CacheConsultas(ttl=10, tamanho_maximo=4)
+    
+    cache.guardar('status', {'Aberta': 3})
+    relogio.agora += 9.9
+    assert cache.obter('status') == (True, {'Aberta': 3})
+    
+    relogio.agora += 0.1
+    assert cache.obter('status') == (False, None)
+    assert cache.estatisticas()['itens'] == 0
+
+
+def test_descarta_o_menos_usado_quando_cheio():
+    cache = CacheConsultas(ttl=60, tamanho_maximo=2)
+    cache.guardar('a', 1)
+    cache.guardar('b', 2)
+    
+    # 'a' passa a ser o mais recente; 'b' sai quando 'c' entra
+    cache.obter('a')
+    cache.guardar('c', 3)
+    
+    assert cache.obter('b') == (False, None)
+    assert cache.obter('a') == (True, 1)
+    assert cache.obter('c') == (True, 3)
+
+
+def test_guardar_de_novo_renova_a_chave(monkeypatch):
+    relogio = _Relogio()
+    monkeypatch.setattr(cache_consultas.time, 'monotonic', relogio)
+    cache = CacheConsultas(ttl=10, tamanho_maximo=2)
+    
+    cache.guardar('a', 1)
+    relogio.agora += 8
+    cache.guardar('a', 2)
+    relogio.agora += 8
+    
+    assert cache.obter('a') == (True, 2)
+
+
+def test_estatisticas_contam_acertos_e_falhas():
+    cache = CacheConsultas(ttl=60, tamanho_maximo=4)
+    assert cache.estatisticas()['taxa_acerto'] == 0.0
+    
+    cache.obter('a')
+    cache.guardar('a', 1)
+    cache.obter('a')
+    cache.obter('a')
+    
+    assert cache.estatisticas() == {'itens': 1, 'acertos': 2, 'falhas': 1, 'taxa_acerto': 2 / 3}
+
+
+def test_invalidar_caches_limpa_todos_os_servicos():
+    caches = [CacheConsultas(ttl=60, tamanho_maximo=4) for _ in range(2)]
+    for cache in caches:
+        cache.guardar('total', 10)
+    
+    invalidar_caches()
+    
+    assert all(cache.obter('total') == (False, None) for cache in caches)
+
+
+def test_resultado_de_consulta_anterior_a_invalidacao_nao_e_guardado():
+    cache = CacheConsultas(ttl=60, tamanho_maximo=4)
+    geracao = cache.geracao
+    
+    # A carga de um novo CSV invalida enquanto a consulta ainda está no banco
+    invalidar_caches()
+    cache.guardar('total', 10, geracao)
+    
+    assert cache.obter('total') == (False, None)
+    cache.guardar('total', 12, cache.geracao)
+    assert cache.obter('total') == (True, 12)
@@ -0,0 +1,136 @@
+"""
+Testes do cache em disco endereçado por conteúdo
+"""
+
+import io
+import os
+import threading
+
+import pytest
+
+from app.utils.cache_relatorios import CacheRelatorios, hash_conteudo
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheRelatorios(tmp_path / 'cache', tamanho_maximo=1024 * 1024)
+
+
+def test_chave_depende_do_tipo_e_das_partes():
+    chave = CacheRelatorios.chave('pdf', 'abc123', 'Janeiro')
+    
+    assert chave == CacheRelatorios.chave('pdf', 'abc123', 'Janeiro')
+    assert chave != CacheRelatorios.chave('agregado', 'abc123', 'Janeiro')
+    assert chave != CacheRelatorios.chave('pdf', 'abc123', 'Fevereiro')
+
+
+def test_guarda_e_obtem(cache):
+    chave = CacheRelatorios.chave('agregado', 'abc123')
+    assert cache.obter(chave) is None
+    
+    cache.guardar(chave, {'total': 10})
+    
+    assert cache.obter(chave) == {'total': 10}
+    assert (cache.acertos, cache.falhas) == (1, 1)
+
+
+def test_obter_ou_calcular_so_calcula_uma_vez(cache):
+    chamadas = []
+    chave = CacheRelatorios.chave('tickets', 'abc123')
+    
+    for _ in range(3):
+        valor = cache.obter_ou_calcular(chave, lambda: chamadas.append(1) or [1, 2, 3])
+    
+    assert valor == [1, 2, 3]
+    assert len(chamadas) == 1
+
+
+def test_remove_as_entradas_usadas_ha_mais_tempo(tmp_path):
+    cache = CacheRelatorios(tmp_path / 'cache', tamanho_maximo=2500)
+    a, b, c = (CacheRelatorios.chave('pdf', nome) for nome in 'abc')
+    for idade, chave in ((300, a), (200, b)):
+        cache.guardar(chave, b'x' * 1000)
+        os.utime(cache._caminho(chave), (idade, idade))
+    
+    # Um acerto em 'a' a torna a mais recente; 'b' sai quando 'c' entra
+    assert cache.obter(a) is not None
+    cache.guardar(c, b'x' * 1000)
+    
+    assert cache.obter(b) is None
+    assert cache.obter(a) == cache.obter(c) == b'x' * 1000
+
+
+def test_diretorio_so_e_percorrido_ao_passar_do_limite(tmp_path):
+    cache = CacheRelatorios(tmp_path / 'cache', tamanho_maximo=3500)
+    levantamentos = []
+    remover_excedente = cache._remover_excedente
+    cache._remover_excedente = lambda: levantamentos.append(1) or remover_excedente()
+    a, b, c, d = (CacheRelatorios.chave('pdf', nome) for nome in 'abcd')
+    
+    # Primeira gravação levanta o total; as seguintes só somam
+    cache.guardar(a, b'x' * 1000)
+    cache.guardar(b, b'x' * 1000)
+    cache.guardar(b, b'y' * 1000)
+    cache.guardar(c, b'x' * 1000)
+    assert len(levantamentos) == 1
+    
+    cache.guardar(d, b'x' * 1000)
+    
+    assert len(levantamentos) == 2
+    assert cache.obter(a) is None
+    assert cache.obter(b) == b'y' * 1000
+    assert cache._tamanho_total == sum(p.stat().st_size for p in (tmp_path / 'cache').glob('*/*'))
+
+
+def test_contadores_consistentes_entre_threads(cache):
+    chave = CacheRelatorios.chave('agregado', 'abc123')
+    cache.guardar(chave, {'total': 10})
+    
+    def consultar():
+        for i in range(200):
+            cache.obter(chave if i % 2 else 'ausente')
+    
+    threads = [threading.Thread(target=consultar) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert (cache.acertos, cache.falhas) == (800, 800)
+
+
+def test_tamanho_zero_desativa_o_cache(tmp_path):
+    cache = CacheRelatorios(tmp_path / 'cache', tamanho_maximo=0)
+    chave = CacheRelatorios.chave('pdf', 'abc123')
+    
+    cache.guardar(chave, b'pdf')
+    
+    assert cache.obter(chave) is None
+    assert not (tmp_path / 'cache').exists()
+
+
+def test_entrada_corrompida_e_descartada(cache):
+    chave = CacheRelatorios.chave('agregado', 'abc123')
+    cache.guardar(chave, {'total': 10})
+    cache._caminho(chave).write_bytes(b'nao e pickle')
+    
+    assert cache.obter(chave) is None
+    assert not cache._caminho(chave).exists()
+
+
+def test_hash_de_arquivo_igual_ao_dos_bytes_e_preserva_a_posicao():
+    conteudo = b'Resumo;Status\n' * 100000
+    arquivo = io.BytesIO(conteudo)
+    arquivo.seek(7)
+    
+    assert hash_conteudo(arquivo) == hash_conteudo(conteudo[7:])
+    assert arquivo.tell() == 7
+    assert hash_conteudo(conteudo) == hash_conteudo(memoryview(conteudo))
+
+
+def test_hash_de_caminho_igual_ao_dos_bytes(tmp_path):
+    conteudo = b'Resumo;Status\n' * 1000
+    caminho = tmp_path / 'tickets.csv'
+    caminho.write_bytes(conteudo)
+    
+    assert hash_conteudo(caminho) == hash_conteudo(str(caminho)) == hash_conteudo(conteudo)
@@ -0,0 +1,72 @@
+"""
+Testes da conversão de datas do Jira (caminho rápido, coluna inteira e PostgreSQL)
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.utils.date_parser import converter_coluna_datas, converter_data_jira, formatar_datas_postgres
+from app.utils.jira_parser import parser_jira_csv
+
+
+@pytest.mark.parametrize('valor', [
+    '10/01/2025 09:30', '31/12/2024 23:59', '29/02/2024 00:00', ' 05/03/2025 08:05 ',
+])
+def test_caminho_rapido_igual_ao_strptime(valor):
+    assert converter_data_jira(valor) == datetime.strptime(valor.strip(), "%d/%m/%Y %H:%M")
+
+
+def test_formato_sem_zeros_cai_no_strptime():
+    assert converter_data_jira('1/2/2025 9:05') == datetime(2025, 2, 1, 9, 5)
+
+
+@pytest.mark.parametrize('valor', ['', '   ', '31/02/2025 10:00', '2025-01-10 09:30', '10/01/2025', 'ab/cd/efgh ij:kl'])
+def test_valores_vazios_ou_invalidos_viram_none(valor):
+    assert converter_data_jira(valor) is None
+
+
+def test_converter_coluna_conta_so_os_invalidos_preenchidos():
+    valores = ['10/01/2025 09:30', None, '', '31/02/2025 10:00', '10/01/2025 09:30', 'lixo']
+    
+    datas, invalidas = converter_coluna_datas(valores)
+    
+    assert invalidas == 2
+    assert datas.dtype == np.dtype('datetime64[ns]')
+    assert np.isnat(datas).tolist() == [False, True, True, True, False, True]
+    assert datas[0] == np.datetime64('2025-01-10T09:30')
+
+
+def test_coluna_igual_ao_valor_a_valor():
+    valores = ['10/01/2025 09:30', '31/12/2024 23:59', '29/02/2024 00:00', '01/06/2025 12:00']
+    
+    datas, _ = converter_coluna_datas(valores)
+    
+    assert [d.astype('datetime64[us]').item() for d in datas] == [converter_data_jira(v) for v in valores]
+
+
+def test_formatar_datas_postgres():
+    assert formatar_datas_postgres(['10/01/2025 09:30', '', 'lixo']) == ['2025-01-10 09:30:00', None, None]
+
+
+def test_parser_conta_datas_invalidas_por_coluna(tmp_path, montar_csv_jira):
+    linhas = [
+        ('Support', 'Ana', 'Ana', 'Database', 'Low', 'Fechada', '31/02/2025 10:00', '12/01/2025 10:00', 'srv'),
+        ('Support', 'Ana', 'Ana', 'Database', 'Low', 'Fechada', '10/01/2025 09:30', 'ontem', 'srv'),
+        ('Support', 'Ana', 'Ana', 'Database', 'Low', 'Aberta', '10/01/2025 09:30', '', 'srv'),
+    ]
+    caminho = tmp_path / 'datas.csv'
+    caminho.write_bytes(montar_csv_jira(linhas))
+    
+    for como_frame in (False, True):
+        erros = {}
+        tickets = parser_jira_csv(caminho, como_frame=como_frame, erros=erros)
+        if como_frame:
+            tickets = tickets.to_tickets()
+        
+        assert erros == {'Criado': 1, 'Atualizado(a)': 1}
+        assert tickets[0].data_abertura is None
+        assert tickets[0].ticket_id == 'JIRA-SEMDATA-0001'
+        assert tickets[1].data_fechamento is None
+        assert tickets[2].data_abertura == datetime(2025, 1, 10, 9, 30)
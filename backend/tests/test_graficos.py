@@ -0,0 +1,47 @@
+"""
+Testes da renderização dos gráficos dos relatórios
+"""
+
+import sys
+import types
+
+import pytest
+
+from app.utils import graficos
+
+GRAFICOS = [
+    ('barras', {'Suporte': 5, 'Incidente': 3}, 'Tipologia'),
+    ('pizza', {'Database': 4, 'Portal': 1}, 'Componentes'),
+]
+
+
+@pytest.fixture
+def pagina_streamlit(tmp_path, monkeypatch):
+    """Simula uma página do Streamlit: `__main__` é um script sem guarda de __name__"""
+    runtime = pytest.importorskip('streamlit.runtime')
+    marcador = tmp_path / 'pagina_executada'
+    script = tmp_path / 'pagina.py'
+    script.write_text(f"open({str(marcador)!r}, 'a').write('executada')\n")
+    
+    principal = types.ModuleType('__main__')
+    principal.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, '__main__', principal)
+    monkeypatch.setattr(runtime, 'exists', lambda: True)
+    monkeypatch.setattr(graficos, 'GRAFICOS_PROCESSOS', None)
+    yield marcador
+    graficos.encerrar_pool()
+
+
+def test_renderiza_png_na_ordem_pedida():
+    pngs = graficos.renderizar_graficos(GRAFICOS[:1])
+    
+    assert len(pngs) == 1
+    assert pngs[0].startswith(b'\x89PNG')
+
+
+def test_pagina_do_streamlit_nao_e_reexecutada(pagina_streamlit):
+    pngs = graficos.renderizar_graficos(GRAFICOS)
+    
+    assert [png[:4] for png in pngs] == [b'\x89PNG'] * 2
+    assert graficos._pool is None
+    assert not pagina_streamlit.exists()
@@ -0,0 +1,56 @@
+"""
+Orçamento do tempo de importação a frio de app.api
+
+Cada medição roda num interpretador novo (sem módulos em cache), como na
+subida do uvicorn. O teste falha se as dependências pesadas voltarem a ser
+carregadas na importação ou se o tempo passar do orçamento.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Orçamento (s) do melhor de REPETICOES; ajustável em máquinas de CI mais lentas
+ORCAMENTO_S = float(os.getenv("IMPORT_API_ORCAMENTO_S", "1.5"))
+REPETICOES = 3
+
+# Carregadas só no primeiro uso (gráficos, PDF, TicketFrame, banco, dashboards)
+DEPENDENCIAS_PESADAS = ("matplotlib", "reportlab", "pandas", "numpy", "paramiko", "psycopg2", "plotly")
+
+_SCRIPT = """
+import json, sys, time
+inicio = time.perf_counter()
+import app.api
+duracao = time.perf_counter() - inicio
+pesadas = sorted(m for m in {pesadas!r} if m in sys.modules)
+print(json.dumps({{"duracao": duracao, "pesadas": pesadas}}))
+"""
+
+
+def _importar_a_frio() -> dict:
+    """Importa app.api num processo novo e retorna a duração e as dependências pesadas carregadas"""
+    script = _SCRIPT.format(pesadas=DEPENDENCIAS_PESADAS)
+    saida = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def test_importar_api_nao_carrega_dependencias_pesadas():
+    resultado = _importar_a_frio()
+    assert resultado["pesadas"] == [], f"app.api carregou na importação: {resultado['pesadas']}"
+
+
+def test_importar_api_dentro_do_orcamento():
+    melhor = min(_importar_a_frio()["duracao"] for _ in range(REPETICOES))
+    assert melhor <= ORCAMENTO_S, (
+        f"Importação a frio de app.api levou {melhor:.2f} s (orçamento {ORCAMENTO_S:.2f} s)"
+    )
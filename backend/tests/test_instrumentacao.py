@@ -0,0 +1,142 @@
+"""
+Testes da instrumentação das etapas do pipeline
+"""
+
+import logging
+
+import pytest
+
+from app.utils import instrumentacao
+from app.utils.instrumentacao import coletar, emitir, etapa, medir, observar
+
+
+@pytest.fixture(autouse=True)
+def desativada(monkeypatch):
+    """Cada teste começa com a instrumentação desligada e sem observadores"""
+    monkeypatch.setattr(instrumentacao, '_ativa', False)
+    monkeypatch.setattr(instrumentacao, '_medir', False)
+    monkeypatch.setattr(instrumentacao, '_perfil', None)
+    monkeypatch.setattr(instrumentacao, '_observadores', [])
+
+
+def _sem_relogio(monkeypatch):
+    def falhar():
+        raise AssertionError("relógio lido com a instrumentação desativada")
+    monkeypatch.setattr(instrumentacao.time, 'perf_counter', falhar)
+
+
+def test_desativada_devolve_a_etapa_nula_compartilhada(monkeypatch):
+    _sem_relogio(monkeypatch)
+    
+    with etapa('leitura', linhas=10) as e1, etapa('agregacao') as e2:
+        e1['bytes'] = 100
+        e1.somar('linhas', 5)
+        with e1.cronometrar('parse_ms'), e2.suspensa():
+            pass
+    
+    assert e1 is e2 is instrumentacao._ETAPA_NULA
+    assert not e1
+    assert instrumentacao._etapa_atual.get() is None
+
+
+def test_desativada_nao_chama_observadores_nem_coleta(monkeypatch):
+    _sem_relogio(monkeypatch)
+    
+    with coletar() as coletadas:
+        with etapa('leitura'):
+            pass
+        assert medir('pdf')(lambda x: x * 2)(21) == 42
+    
+    assert coletadas == []
+    assert not instrumentacao.medindo()
+
+
+def test_nomes_aninhados_e_ordem_de_conclusao():
+    instrumentacao.medir_etapas()
+    
+    with coletar() as coletadas:
+        with etapa('relatorio', periodo='Janeiro') as relatorio:
+            with etapa('pdf'):
+                with etapa('graficos') as graficos:
+                    graficos['quantidade'] = 3
+            with etapa('agregacao'):
+                pass
+            relatorio.somar('linhas', 10)
+            relatorio.somar('linhas', 5)
+    
+    assert [e.nome for e in coletadas] == [
+        'relatorio.pdf.graficos', 'relatorio.pdf', 'relatorio.agregacao', 'relatorio'
+    ]
+    assert coletadas[0].campos == {'quantidade': 3}
+    assert coletadas[-1].campos == {'periodo': 'Janeiro', 'linhas': 15}
+    assert all(e.duracao_ms >= 0 for e in coletadas)
+    assert instrumentacao._etapa_atual.get() is None
+
+
+def test_etapa_suspensa_devolve_o_aninhamento_ao_pai():
+    instrumentacao.medir_etapas()
+    
+    def gerar():
+        with etapa('leitura') as leitura:
+            for lote in range(2):
+                with leitura.suspensa():
+                    yield lote
+    
+    with coletar() as coletadas:
+        with etapa('carga'):
+            for _ in gerar():
+                with etapa('insercao'):
+                    pass
+    
+    assert [e.nome for e in coletadas] == ['carga.insercao', 'carga.insercao', 'carga.leitura', 'carga']
+
+
+def test_medir_registra_o_erro_e_propaga_a_excecao():
+    recebidas = []
+    observar(recebidas.append)
+    
+    @medir('migracao')
+    def migrar():
+        raise ValueError("CSV inválido")
+    
+    with pytest.raises(ValueError, match="CSV inválido"):
+        migrar()
+    
+    assert migrar.__name__ == 'migrar'
+    assert len(recebidas) == 1
+    assert recebidas[0]['etapa'] == 'migracao'
+    assert recebidas[0]['erro'] == 'ValueError'
+    assert instrumentacao._etapa_atual.get() is None
+
+
+def test_coletar_e_emitir_entregam_as_etapas_de_outro_processo():
+    # No processo do job: etapas medidas e devolvidas como dicionários
+    instrumentacao.medir_etapas()
+    with coletar() as coletadas:
+        with etapa('relatorio', linhas=20):
+            with etapa('pdf'):
+                pass
+    resultado = [e.to_dict() for e in coletadas]
+    
+    # Na API: entregues aos observadores; um observador com erro não impede os demais
+    recebidas = []
+    observar(lambda dados: 1 / 0)
+    observar(recebidas.append)
+    emitir(resultado)
+    
+    assert recebidas == resultado
+    assert [d['etapa'] for d in recebidas] == ['relatorio.pdf', 'relatorio']
+    assert recebidas[1]['linhas'] == 20
+
+
+def test_ativa_registra_a_etapa_no_log(caplog):
+    instrumentacao.ativar()
+    
+    with caplog.at_level(logging.INFO, logger=instrumentacao.__name__):
+        with etapa('leitura', linhas=7):
+            pass
+    
+    registro, = caplog.records
+    assert registro.etapa == 'leitura'
+    assert registro.campos == {'linhas': 7}
+    assert 'linhas=7' in registro.getMessage()
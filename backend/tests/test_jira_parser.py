@@ -0,0 +1,84 @@
+"""
+Testes da leitura do CSV do Jira em lotes e da detecção de encoding
+"""
+
+import codecs
+
+import pytest
+
+from app.models.ticket_frame import TicketFrame
+from app.services.analysis_service import AnalysisService
+from app.utils.jira_parser import TAMANHO_AMOSTRA_ENCODING, detectar_encoding, iterar_jira_csv, parser_jira_csv
+
+
+@pytest.mark.parametrize('prefixo, esperado', [
+    (codecs.BOM_UTF8 + 'Responsável'.encode('utf-8'), 'utf-8-sig'),
+    ('Responsável;Conceição'.encode('utf-8'), 'utf-8'),
+    ('Responsável;Conceição'.encode('cp1252'), 'cp1252'),
+    # 0x81 não existe em cp1252: só latin1 decodifica qualquer byte
+    (b'Respons\xe1vel;\x81', 'latin1'),
+])
+def test_detectar_encoding(prefixo, esperado):
+    assert detectar_encoding(prefixo) == esperado
+
+
+def test_detectar_encoding_tolera_caractere_cortado_no_fim_da_amostra():
+    amostra = 'ção'.encode('utf-8')[:-1]
+    
+    assert detectar_encoding(amostra) == 'utf-8'
+
+
+def test_lotes_somam_o_arquivo_inteiro(csv_jira):
+    lotes = list(iterar_jira_csv(csv_jira, tamanho_lote=3))
+    
+    assert [len(lote) for lote in lotes] == [3, 3, 1]
+    assert [t for lote in lotes for t in lote] == parser_jira_csv(csv_jira)
+
+
+def test_lotes_como_frame_iguais_aos_de_tickets(csv_jira):
+    lotes = list(iterar_jira_csv(csv_jira, tamanho_lote=4, como_frame=True))
+    
+    assert all(isinstance(lote, TicketFrame) for lote in lotes)
+    assert TicketFrame.concatenar(lotes).to_tickets() == parser_jira_csv(csv_jira)
+
+
+def test_campos_convertidos(csv_jira):
+    tickets = parser_jira_csv(csv_jira)
+    
+    primeiro, fechado = tickets[0], tickets[1]
+    assert primeiro.ticket_id == 'JIRA-20250110-0001'
+    assert primeiro.responsavel == 'João'
+    assert primeiro.data_fechamento is None
+    assert (fechado.tipologia, fechado.origem, fechado.status) == ('Task', 'Middleware', 'Fechada')
+    assert fechado.data_fechamento.strftime('%d/%m/%Y %H:%M') == '15/01/2025 17:45'
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'utf-8-sig', 'cp1252'])
+def test_encodings_da_exportacao(tmp_path, montar_csv_jira, encoding):
+    caminho = tmp_path / 'jira.csv'
+    caminho.write_bytes(montar_csv_jira(encoding=encoding))
+    
+    responsaveis = [t.responsavel for t in parser_jira_csv(caminho)]
+    
+    assert 'Conceição' in responsaveis
+
+
+def test_bytes_invalidos_depois_da_amostra_viram_latin1(tmp_path, montar_csv_jira):
+    # Amostra em UTF-8 puro; o byte cp1252/latin1 só aparece depois dela
+    linhas = [('Support', 'Ana', 'Ana', 'Database', 'Low', 'Aberta', '10/01/2025 09:30', '', 'srv')]
+    linhas *= TAMANHO_AMOSTRA_ENCODING // 40
+    conteudo = montar_csv_jira(linhas) + 'Support;Jos\xe9;Ana;Database;Low;Aberta;10/01/2025 09:30;;srv\n'.encode('latin1')
+    caminho = tmp_path / 'misto.csv'
+    caminho.write_bytes(conteudo)
+    assert conteudo.index(b'Jos\xe9') > TAMANHO_AMOSTRA_ENCODING
+    
+    tickets = parser_jira_csv(caminho)
+    
+    assert len(tickets) == len(linhas) + 1
+    assert tickets[-1].responsavel == 'José'
+
+
+def test_agrupar_lotes_igual_ao_arquivo_inteiro(csv_jira):
+    por_lotes = AnalysisService.agrupar_lotes(iterar_jira_csv(csv_jira, tamanho_lote=2))
+    
+    assert por_lotes == AnalysisService.agrupar(parser_jira_csv(csv_jira))
@@ -0,0 +1,111 @@
+"""
+Testes da fila de jobs (limite de pendentes, status e métricas)
+"""
+
+import time
+
+import pytest
+
+from app.services.job_service import FilaCheiaError, JobService
+
+
+def _dormir(segundos, valor):
+    """Job de teste: executa no processo do pool (precisa ser importável)"""
+    time.sleep(segundos)
+    return {'resultado': valor}
+
+
+def _falhar():
+    raise ValueError("CSV inválido")
+
+
+def _esperar(condicao, limite=30):
+    """Espera a condição (callbacks do pool rodam em outra thread)"""
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim, "tempo esgotado"
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def servico():
+    servico = JobService(processos=1, fila_maxima=1, retencao=600)
+    yield servico
+    servico.encerrar()
+
+
+def test_rejeita_alem_de_processos_mais_fila(servico):
+    primeiro = servico.submeter('relatorio', _dormir, 1, 'a')
+    segundo = servico.submeter('relatorio', _dormir, 0, 'b')
+    
+    with pytest.raises(FilaCheiaError):
+        servico.submeter('relatorio', _dormir, 0, 'c')
+    
+    assert servico.metricas()['rejeitados'] == 1
+    assert primeiro.future.result(timeout=30) == {'resultado': 'a'}
+    assert segundo.future.result(timeout=30) == {'resultado': 'b'}
+    
+    # Com a fila vazia de novo, novos jobs são aceitos
+    assert servico.submeter('relatorio', _dormir, 0, 'd').future.result(timeout=30) == {'resultado': 'd'}
+
+
+def test_status_e_metricas_dos_jobs(servico):
+    ok = servico.submeter('relatorio', _dormir, 0, {'total': 3})
+    falha = servico.submeter('comparativo', _falhar)
+    
+    _esperar(lambda: servico.metricas()['concluidos'] + servico.metricas()['erros'] == 2)
+    
+    assert servico.obter(ok.job_id).to_dict()['resultado'] == {'total': 3}
+    estado = servico.obter(falha.job_id).to_dict()
+    assert (estado['status'], estado['erro']) == ('erro', 'CSV inválido')
+    assert servico.obter('inexistente') is None
+    metricas = servico.metricas()
+    assert (metricas['concluidos'], metricas['erros'], metricas['executando'], metricas['na_fila']) == (1, 1, 0, 0)
+    assert metricas['retidos'] == 2
+
+
+def test_jobs_cancelados_no_encerramento(servico):
+    servico.fila_maxima = 2
+    executando = servico.submeter('relatorio', _dormir, 1, 'a')
+    servico.submeter('relatorio', _dormir, 0, 'b')
+    na_fila = servico.submeter('relatorio', _dormir, 0, 'c')
+    
+    servico.encerrar()
+    
+    assert na_fila.status == 'cancelado'
+    assert servico.obter(na_fila.job_id).to_dict()['status'] == 'cancelado'
+    assert servico.metricas()['cancelados'] >= 1
+    assert executando.future.result(timeout=30) == {'resultado': 'a'}
+
+
+def test_retem_no_maximo_os_jobs_finalizados_mais_recentes():
+    servico = JobService(processos=1, fila_maxima=1, retencao=600, retidos_maximo=2)
+    try:
+        finalizados = []
+        for valor in 'abc':
+            job = servico.submeter('relatorio', _dormir, 0, valor)
+            _esperar(lambda: job.concluido_em is not None)
+            finalizados.append(job)
+        
+        assert servico.obter(finalizados[0].job_id) is None
+        assert [servico.obter(j.job_id).to_dict()['resultado'] for j in finalizados[1:]] == ['b', 'c']
+        assert servico.metricas()['retidos'] == 2
+    finally:
+        servico.encerrar()
+
+
+def test_arquivos_do_job_removidos_ao_terminar_ou_rejeitar(servico, tmp_path):
+    arquivos = [tmp_path / nome for nome in ('a.csv', 'b.csv', 'c.csv')]
+    for arquivo in arquivos:
+        arquivo.write_bytes(b'csv')
+    
+    primeiro = servico.submeter('relatorio', _dormir, 1, 'a', arquivos=arquivos[:1])
+    servico.submeter('relatorio', _dormir, 0, 'b', arquivos=arquivos[1:2])
+    with pytest.raises(FilaCheiaError):
+        servico.submeter('relatorio', _dormir, 0, 'c', arquivos=arquivos[2:])
+    
+    assert not arquivos[2].exists()
+    assert arquivos[0].exists()
+    _esperar(lambda: servico.metricas()['concluidos'] == 2)
+    assert not any(arquivo.exists() for arquivo in arquivos)
+    assert primeiro.to_dict()['resultado'] == 'a'
@@ -0,0 +1,106 @@
+"""
+Testes do formato de exposição de texto do Prometheus
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import metricas_service
+from app.utils.metricas import Contador, Histograma, MedirRequisicoes, Medidor, Registro
+
+
+def test_contador_e_medidor():
+    registro = Registro()
+    linhas = registro.contador('agt_linhas_total', 'Linhas lidas', ['formato'])
+    fila = registro.medidor('agt_jobs_na_fila', 'Jobs aguardando')
+    linhas.incrementar(10, formato='csv')
+    linhas.incrementar(2.5, formato='csv')
+    linhas.incrementar(formato='xlsx')
+    fila.incrementar(3)
+    fila.incrementar(-1)
+    
+    assert registro.formatar() == (
+        "# HELP agt_linhas_total Linhas lidas\n"
+        "# TYPE agt_linhas_total counter\n"
+        'agt_linhas_total{formato="csv"} 12.5\n'
+        'agt_linhas_total{formato="xlsx"} 1\n'
+        "# HELP agt_jobs_na_fila Jobs aguardando\n"
+        "# TYPE agt_jobs_na_fila gauge\n"
+        "agt_jobs_na_fila 2\n"
+    )
+
+
+def test_histograma_tem_faixas_cumulativas_e_inf():
+    histograma = Histograma('agt_parse_segundos', 'Duração', ['etapa'], buckets=[1, 0.5])
+    for valor in (0.2, 0.5, 0.7, 3):
+        histograma.observar(valor, etapa='csv')
+    
+    assert histograma.formatar().split('\n')[2:] == [
+        'agt_parse_segundos_bucket{etapa="csv",le="0.5"} 2',
+        'agt_parse_segundos_bucket{etapa="csv",le="1"} 3',
+        'agt_parse_segundos_bucket{etapa="csv",le="+Inf"} 4',
+        'agt_parse_segundos_sum{etapa="csv"} 4.4',
+        'agt_parse_segundos_count{etapa="csv"} 4',
+    ]
+
+
+def test_valores_de_rotulo_sao_escapados():
+    medidor = Medidor('agt_build_info', 'Versão', ['versao'])
+    medidor.definir(1, versao='a"b\\c\nd')
+    
+    assert medidor.formatar().split('\n')[-1] == 'agt_build_info{versao="a\\"b\\\\c\\nd"} 1'
+
+
+def test_rotulos_e_nomes_sao_validados():
+    registro = Registro()
+    contador = registro.contador('agt_erros_total', 'Erros', ['tipo'])
+    
+    with pytest.raises(ValueError):
+        contador.incrementar(tipo='csv', extra='x')
+    with pytest.raises(ValueError):
+        contador.incrementar()
+    with pytest.raises(ValueError):
+        contador.incrementar(-1, tipo='csv')
+    with pytest.raises(ValueError):
+        registro.medidor('agt_erros_total', 'Repetida')
+
+
+def test_middleware_mede_pela_rota_e_nao_pela_url():
+    class Rota:
+        path = '/jobs/{job_id}'
+    
+    async def app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 404})
+        await send({'type': 'http.response.body', 'body': b''})
+    
+    async def enviar(mensagem):
+        pass
+    
+    latencia = Histograma('agt_http_segundos', 'Latência', ['metodo', 'endpoint', 'status'])
+    em_andamento = Medidor('agt_http_em_andamento', 'Em andamento')
+    middleware = MedirRequisicoes(app, latencia, em_andamento)
+    
+    scope = {'type': 'http', 'method': 'GET', 'path': '/jobs/abc123', 'route': Rota()}
+    asyncio.run(middleware(scope, None, enviar))
+    
+    texto = latencia.formatar()
+    assert 'agt_http_segundos_count{metodo="GET",endpoint="/jobs/{job_id}",status="404"} 1' in texto
+    assert 'abc123' not in texto
+    assert em_andamento.formatar().endswith('agt_http_em_andamento 0')
+
+
+def test_jobs_finalizados_viram_contador_incrementado_pela_diferenca(monkeypatch):
+    contador = Contador('agt_jobs_finalizados_total', 'Jobs finalizados', ['resultado'])
+    monkeypatch.setattr(metricas_service, 'jobs_finalizados', contador)
+    monkeypatch.setattr(metricas_service, '_jobs_finalizados_vistos', {})
+    fila = {'executando': 1, 'na_fila': 0, 'processos': 2, 'erros': 0, 'rejeitados': 0, 'cancelados': 0}
+    
+    # Serviço de jobs recriado entre a segunda e a terceira leitura (totais zerados)
+    for concluidos in (3, 5, 1):
+        metricas_service.atualizar_jobs({**fila, 'concluidos': concluidos})
+    
+    texto = contador.formatar()
+    assert '# TYPE agt_jobs_finalizados_total counter' in texto
+    assert 'agt_jobs_finalizados_total{resultado="concluidos"} 6' in texto
+    assert 'agt_jobs_finalizados_total{resultado="cancelados"} 0' in texto
@@ -0,0 +1,187 @@
+"""
+Testes do serviço base dos dashboards: filtro de período (intervalo
+semiaberto sobre data_criacao), leitura dos rollups e montagem dos painéis
+"""
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.utils import top_k
+from backend import servico_base
+from backend.cache_consultas import invalidar_caches
+from backend.servico_base import ServicoTicketsBase, filtro_periodo, limites_mes
+
+
+@pytest.mark.parametrize('mes, ano, esperado', [
+    (1, 2025, (datetime(2025, 1, 1), datetime(2025, 2, 1))),
+    (2, 2024, (datetime(2024, 2, 1), datetime(2024, 3, 1))),
+    (12, 2024, (datetime(2024, 12, 1), datetime(2025, 1, 1))),
+])
+def test_limites_mes(mes, ano, esperado):
+    assert limites_mes(mes, ano) == esperado
+
+
+def test_filtro_periodo_semiaberto_com_parametros():
+    inicio, fim = limites_mes(3, 2025)
+    
+    filtro, params = filtro_periodo(inicio, fim, "status != 'Fechado'")
+    
+    assert filtro == "WHERE data_criacao >= :data_inicio AND data_criacao < :data_fim AND status != 'Fechado'"
+    assert params == {'data_inicio': inicio, 'data_fim': fim}
+
+
+def test_filtro_periodo_limites_opcionais():
+    assert filtro_periodo() == ("", {})
+    assert filtro_periodo(None, None, "status = 'Aberta'") == ("WHERE status = 'Aberta'", {})
+    
+    filtro, params = filtro_periodo(datetime(2025, 1, 1), coluna='data_atualizacao')
+    assert filtro == "WHERE data_atualizacao >= :data_inicio"
+    assert params == {'data_inicio': datetime(2025, 1, 1)}
+
+
+@pytest.fixture
+def servico():
+    """Serviço sobre um SQLite em memória com tickets nas bordas de dezembro"""
+    engine = create_engine('sqlite://')
+    datas = [
+        datetime(2024, 11, 30, 23, 59, 59),
+        datetime(2024, 12, 1, 0, 0),
+        datetime(2024, 12, 31, 23, 59, 59),
+        datetime(2025, 1, 1, 0, 0),
+    ]
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE tickets (componente TEXT, status TEXT, data_criacao TIMESTAMP)"))
+        conn.execute(
+            text("INSERT INTO tickets VALUES (:componente, 'Aberta', :data)"),
+            [{'componente': f"M{i}", 'data': data} for i, data in enumerate(datas)]
+        )
+    return ServicoTicketsBase(engine)
+
+
+def test_mes_inclui_o_primeiro_instante_e_exclui_o_seguinte(servico):
+    tickets = servico.obter_tickets_por_periodo(12, 2024)
+    
+    assert sorted(tickets['componente']) == ['M1', 'M2']
+
+
+def test_sem_periodo_consulta_todos_os_tickets(servico):
+    assert sorted(servico.obter_top_modulos()) == [('M0', 1), ('M1', 1), ('M2', 1), ('M3', 1)]
+    assert servico.obter_top_modulos(1, 2025) == [('M3', 1)]
+
+
+def test_painel_usa_o_top_k_da_aplicacao():
+    # backend.app.utils.top_k seria uma segunda cópia do módulo
+    assert servico_base.top_k is top_k.top_k
+
+
+def test_rollups_lidos_com_lista_de_datas_expandida(servico):
+    # O sqlite3 não adapta tuplas: o IN só funciona com o parâmetro expandido
+    with servico.engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE snapshots (id INTEGER, mes INTEGER, ano INTEGER, data_snapshot DATE,"
+            " total_geral INTEGER, total_tickets_abertos INTEGER, total_tickets_fechados INTEGER)"
+        ))
+        conn.execute(text("CREATE TABLE analises (snapshot_id INTEGER, tipo_analise TEXT, dados TEXT)"))
+        conn.execute(text("INSERT INTO snapshots VALUES (1, 12, 2024, :data, 2, 2, 0)"), {'data': date(2024, 12, 1)})
+        conn.execute(text("INSERT INTO snapshots VALUES (2, 1, 2025, :data, 1, 1, 0)"), {'data': date(2025, 1, 1)})
+        conn.execute(text("INSERT INTO analises VALUES (1, 'componente', '[[\"M1\", 1, 1, 0], [\"M2\", 1, 1, 0]]')"))
+    
+    rollups = servico._ler_rollups([(12, 2024), (2, 2025)])
+    
+    assert list(rollups) == [(12, 2024)]
+    resumo, contagens = rollups[(12, 2024)]
+    assert resumo == {'total': 2, 'abertos': 2, 'fechados': 0}
+    assert contagens['componente'] == [('M1', {'total': 1, 'abertos': 1}), ('M2', {'total': 1, 'abertos': 1})]
+    # Mesma consulta servida pelo cache (lista de datas vira tupla na chave)
+    assert servico._ler_rollups([(2, 2025), (12, 2024)]) == rollups
+
+
+def test_consulta_em_andamento_durante_invalidacao_nao_volta_ao_cache(servico, monkeypatch):
+    conectar = servico.engine.connect
+    
+    def conectar_e_invalidar():
+        # Um novo CSV é carregado enquanto a consulta roda
+        conexao = conectar()
+        invalidar_caches()
+        return conexao
+    
+    monkeypatch.setattr(servico.engine, 'connect', conectar_e_invalidar)
+    servico.obter_top_modulos()
+    
+    assert servico.cache.estatisticas()['itens'] == 0
+
+
+class _ServicoConsultasFalsas(ServicoTicketsBase):
+    """Responde às consultas do painel com linhas prontas, como o driver as devolveria"""
+    
+    def __init__(self, linhas_agregadas, linhas_rollups):
+        super().__init__(engine=object())
+        self.linhas = {'GROUPING SETS': linhas_agregadas, 'FROM snapshots': linhas_rollups}
+        self.consultas = []
+    
+    def _executar(self, sql, params=None):
+        self.consultas.append((sql, params))
+        return [], next(linhas for trecho, linhas in self.linhas.items() if trecho in sql)
+
+
+def _linha(p, dimensao, valor, total, abertos):
+    """Linha do GROUPING SETS: só a coluna da dimensão preenchida e o bit dela zerado"""
+    i = servico_base.DIMENSOES_PAINEL.index(dimensao)
+    chaves = [None] * len(servico_base.DIMENSOES_PAINEL)
+    chaves[i] = valor
+    agrupamento = 0b11111 ^ (1 << (len(chaves) - 1 - i))
+    return (p, *chaves, agrupamento, total, abertos, total - abertos)
+
+
+def _resumo(p, total, abertos):
+    return (p, None, None, None, None, None, 0b11111, total, abertos, total - abertos)
+
+
+def test_paineis_decodificam_o_grouping_e_juntam_com_os_rollups():
+    # p=0: período geral; p=1: janeiro de 2025 (fevereiro vem dos rollups)
+    agregadas = [
+        _resumo(0, 10, 6),
+        _linha(0, 'componente', 'Database', 6, 4),
+        _linha(0, 'componente', 'Portal', 4, 2),
+        _linha(0, 'servidor_cluster', 'srv-db01', 10, 6),
+        _linha(0, 'responsavel', 'Ana', 10, 6),
+        _linha(0, 'tipo_item', 'Support', 7, 5),
+        _linha(0, 'tipo_item', 'Incident', 3, 1),
+        _linha(0, 'relator', 'Infra', 10, 6),
+        _resumo(1, 3, 1),
+        _linha(1, 'componente', 'Portal', 3, 1),
+        _linha(1, 'tipo_item', 'Incident', 3, 1),
+    ]
+    rollups = [
+        (2, 2025, 2, 2, 0, 'componente', '[["Middleware", 2, 2, 0]]'),
+        (2, 2025, 2, 2, 0, 'tipo_item', '[["Tarefa", 2, 2, 0]]'),
+    ]
+    servico = _ServicoConsultasFalsas(agregadas, rollups)
+    
+    geral, janeiro, fevereiro = servico.obter_paineis([None, (1, 2025), (2, 2025)])
+    
+    assert geral['resumo'] == {'total': 10, 'abertos': 6, 'fechados': 4}
+    assert geral['top_modulos'] == [('Database', 4), ('Portal', 2)]
+    assert geral['componentes'] == [('Database', 6), ('Portal', 4)]
+    assert geral['top_servidores'] == [('srv-db01', 6)]
+    assert geral['top_responsaveis'] == [('Ana', 10)]
+    assert geral['origem'] == [('Infra', 10)]
+    assert dict(geral['tipologia']) == {'Suporte': 7, 'Incidente': 3, 'Tarefa': 0}
+    
+    assert janeiro['resumo'] == {'total': 3, 'abertos': 1, 'fechados': 2}
+    assert janeiro['top_modulos'] == [('Portal', 1)]
+    assert janeiro['top_servidores'] == []
+    assert dict(janeiro['tipologia']) == {'Suporte': 0, 'Incidente': 3, 'Tarefa': 0}
+    
+    assert fevereiro['resumo'] == {'total': 2, 'abertos': 2, 'fechados': 0}
+    assert fevereiro['componentes'] == [('Middleware', 2)]
+    assert dict(fevereiro['tipologia']) == {'Suporte': 0, 'Incidente': 0, 'Tarefa': 2}
+    
+    # Uma consulta de rollups e uma única agregação, só com os períodos sem rollup
+    (sql_rollups, _), (sql, params) = servico.consultas
+    assert 'FROM snapshots' in sql_rollups
+    assert 'GROUPING SETS ((p), (p, componente), (p, servidor_cluster)' in sql
+    assert 'periodos.inicio IS NULL OR' in sql
+    assert params == {'inicio_0': None, 'fim_0': None, 'inicio_1': datetime(2025, 1, 1), 'fim_1': datetime(2025, 2, 1)}
@@ -0,0 +1,164 @@
+"""
+Testes do encaminhamento local pelo túnel SSH
+
+O transporte do paramiko é substituído por um falso cujos canais são uma
+ponta de um socket.socketpair(); a outra ponta faz o papel do PostgreSQL.
+"""
+
+import socket
+import time
+
+import paramiko
+import pytest
+
+from backend.ssh_tunnel import SSHTunnelManager
+
+
+class _TransporteFalso:
+    """Transporte que abre canais como socketpairs e pode estar caído"""
+    
+    def __init__(self, falhar=False):
+        self.ativo = True
+        self.falhar = falhar
+        self.remotos = []
+    
+    def is_active(self):
+        return self.ativo
+    
+    def close(self):
+        self.ativo = False
+    
+    def open_channel(self, tipo, destino, origem):
+        assert tipo == 'direct-tcpip'
+        if self.falhar:
+            raise paramiko.SSHException("canal recusado")
+        canal, remoto = socket.socketpair()
+        self.remotos.append(remoto)
+        return canal
+
+
+class _GerenciadorFalso(SSHTunnelManager):
+    """Gerenciador que 'reconecta' instalando o próximo transporte da lista"""
+    
+    def __init__(self, *transportes):
+        super().__init__()
+        self.proximos = list(transportes)
+        self.transport = self.proximos.pop(0)
+        self.conexoes = 0
+    
+    def conectar(self):
+        self.conexoes += 1
+        if not self.proximos:
+            return False
+        self.transport = self.proximos.pop(0)
+        return True
+
+
+@pytest.fixture
+def encaminhamento():
+    """Gerenciador com porta local aberta e uma função que conecta nela"""
+    gerenciadores = []
+    clientes = []
+    
+    def abrir(*transportes):
+        gerenciador = _GerenciadorFalso(*transportes)
+        porta = gerenciador.iniciar_encaminhamento('10.0.0.5', 5432, 0)
+        cliente = socket.create_connection(('127.0.0.1', porta), timeout=5)
+        gerenciadores.append(gerenciador)
+        clientes.append(cliente)
+        return gerenciador, cliente
+    
+    yield abrir
+    
+    for cliente in clientes:
+        cliente.close()
+    for gerenciador in gerenciadores:
+        gerenciador.fechar()
+
+
+def _remoto(transporte, indice=0, timeout=5):
+    """Ponta remota do canal aberto pelo handler (espera ele aceitar a conexão)"""
+    for _ in range(timeout * 100):
+        if len(transporte.remotos) > indice:
+            remoto = transporte.remotos[indice]
+            remoto.settimeout(timeout)
+            return remoto
+        time.sleep(0.01)
+    raise AssertionError("o handler não abriu o canal")
+
+
+def _receber(sock, tamanho):
+    dados = b''
+    while len(dados) < tamanho:
+        bloco = sock.recv(tamanho - len(dados))
+        if not bloco:
+            break
+        dados += bloco
+    return dados
+
+
+def test_copia_bytes_nos_dois_sentidos(encaminhamento):
+    transporte = _TransporteFalso()
+    _, cliente = encaminhamento(transporte)
+    remoto = _remoto(transporte)
+    
+    cliente.sendall(b'SELECT 1;')
+    assert _receber(remoto, 9) == b'SELECT 1;'
+    
+    resposta = b'r' * 100000
+    remoto.sendall(resposta)
+    assert _receber(cliente, len(resposta)) == resposta
+
+
+def test_eof_do_canal_fecha_a_conexao_local(encaminhamento):
+    transporte = _TransporteFalso()
+    _, cliente = encaminhamento(transporte)
+    remoto = _remoto(transporte)
+    
+    remoto.sendall(b'fim')
+    remoto.close()
+    
+    assert _receber(cliente, 4) == b'fim'
+    assert cliente.recv(1) == b''
+
+
+def test_eof_local_fecha_o_canal(encaminhamento):
+    transporte = _TransporteFalso()
+    _, cliente = encaminhamento(transporte)
+    remoto = _remoto(transporte)
+    
+    cliente.shutdown(socket.SHUT_WR)
+    
+    assert remoto.recv(1) == b''
+
+
+def test_canal_recusado_reconecta_e_tenta_de_novo(encaminhamento):
+    caido, novo = _TransporteFalso(falhar=True), _TransporteFalso()
+    gerenciador, cliente = encaminhamento(caido, novo)
+    remoto = _remoto(novo)
+    
+    cliente.sendall(b'ping')
+    
+    assert _receber(remoto, 4) == b'ping'
+    assert not caido.ativo
+    assert gerenciador.conexoes == 1
+
+
+def test_transporte_inativo_reconecta_antes_de_abrir_o_canal():
+    caido, novo = _TransporteFalso(), _TransporteFalso()
+    caido.ativo = False
+    gerenciador = _GerenciadorFalso(caido, novo)
+    
+    canal = gerenciador.abrir_canal(('10.0.0.5', 5432), ('127.0.0.1', 40000))
+    
+    canal.close()
+    assert gerenciador.transport is novo
+    assert len(novo.remotos) == 1 and not caido.remotos
+    assert gerenciador.conexoes == 1
+
+
+def test_falha_ao_reconectar_propaga_erro():
+    gerenciador = _GerenciadorFalso(_TransporteFalso(falhar=True))
+    
+    with pytest.raises(ConnectionError):
+        gerenciador.abrir_canal(('10.0.0.5', 5432), ('127.0.0.1', 40000))
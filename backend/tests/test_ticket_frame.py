@@ -0,0 +1,89 @@
+"""
+Testes do TicketFrame: mesmos resultados que a lista de Ticket
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from app.models.ticket_frame import COLUNAS_CATEGORICAS, TicketFrame
+from app.services.analysis_service import DIMENSOES, AnalysisService
+from app.services.ticket_service import TicketService
+
+
+def test_ida_e_volta_preserva_os_tickets(tickets):
+    frame = TicketFrame.from_tickets(tickets)
+    
+    assert len(frame) == len(tickets)
+    assert frame.to_tickets() == tickets
+
+
+def test_abertos_segue_a_regra_do_ticket(tickets):
+    frame = TicketFrame.from_tickets(tickets)
+    
+    assert frame.abertos.tolist() == [t.esta_aberto for t in tickets]
+
+
+def test_agrupar_frame_igual_a_lista(tickets):
+    frame = TicketFrame.from_tickets(tickets)
+    
+    assert AnalysisService.agrupar(frame) == AnalysisService.agrupar(tickets)
+    for dimensao in DIMENSOES:
+        assert AnalysisService.agrupar(frame, [dimensao]) == AnalysisService.agrupar(tickets, [dimensao])
+
+
+def test_resumo_executivo_frame_igual_a_lista(tickets):
+    frame = TicketFrame.from_tickets(tickets)
+    
+    assert AnalysisService.calcular_resumo_executivo(frame) == AnalysisService.calcular_resumo_executivo(tickets)
+
+
+def test_concatenar_unifica_categorias(tickets):
+    frame = TicketFrame.concatenar([TicketFrame.from_tickets(tickets[:4]), TicketFrame.from_tickets(tickets[4:])])
+    
+    assert frame.to_tickets() == tickets
+    assert AnalysisService.agrupar(frame) == AnalysisService.agrupar(tickets)
+
+
+def test_filtrar_por_mascara(tickets):
+    frame = TicketFrame.from_tickets(tickets)
+    
+    abertos = frame.filtrar(frame.abertos)
+    
+    assert abertos.to_tickets() == [t for t in tickets if t.esta_aberto]
+
+
+def test_dias_aberto_vetorizado(tickets):
+    tickets[1].data_fechamento = datetime(2025, 1, 20, 9, 30)
+    frame = TicketFrame.from_tickets(tickets)
+    agora = datetime(2025, 3, 1)
+    
+    dias = frame.dias_aberto(agora)
+    
+    esperado = [((t.data_fechamento or agora) - t.data_abertura).days for t in tickets]
+    assert dias.tolist() == esperado
+    assert not np.isnan(dias).any()
+
+
+def test_ticket_service_frame_igual_a_lista(tickets):
+    por_lista, por_frame = TicketService(), TicketService()
+    por_lista.carregar_tickets(tickets)
+    por_frame.carregar_tickets(TicketFrame.from_tickets(tickets))
+    
+    assert por_frame.contar_por_status() == por_lista.contar_por_status()
+    assert por_frame.contar_por_prioridade() == por_lista.contar_por_prioridade()
+    assert por_frame.contar_tickets() == por_lista.contar_tickets()
+
+
+def test_frame_sem_tickets():
+    for frame in (TicketFrame.from_tickets([]), TicketFrame.concatenar([])):
+        assert len(frame) == 0
+        assert frame.to_tickets() == []
+        assert AnalysisService.agrupar(frame, ['tipologia']) == {'tipologia': {}}
+
+
+def test_so_colunas_de_poucos_valores_sao_categoricas(tickets):
+    dados = TicketFrame.concatenar([TicketFrame.from_tickets(tickets[:4]), TicketFrame.from_tickets(tickets[4:])]).dados
+    
+    assert dados['titulo'].dtype == object and dados['descricao'].dtype == object
+    assert all(dados[coluna].dtype == 'category' for coluna in COLUNAS_CATEGORICAS)
@@ -0,0 +1,76 @@
+"""
+Testes da seleção top-K e do contador Space-Saving
+"""
+
+import random
+
+import pytest
+
+from app.models.ticket_frame import TicketFrame
+from app.services.analysis_service import DIMENSOES, AnalysisService
+from app.utils.top_k import SpaceSaving, top_k
+
+
+PARES = [('srv-b', 5), ('srv-a', 5), (None, 5), ('srv-c', 9), ('srv-d', 1), ('srv-e', 5)]
+
+
+def test_top_k_desempata_pela_chave():
+    assert top_k(PARES, 4) == [('srv-c', 9), (None, 5), ('srv-a', 5), ('srv-b', 5)]
+
+
+def test_top_k_nao_depende_da_ordem_de_entrada():
+    embaralhado = PARES[:]
+    for semente in range(5):
+        random.Random(semente).shuffle(embaralhado)
+        assert top_k(embaralhado, 3) == top_k(PARES, 3)
+        assert top_k(iter(embaralhado), None) == top_k(PARES, None)
+
+
+def test_top_k_sem_limite_ordena_todos():
+    assert top_k(PARES, None) == sorted(PARES, key=lambda p: (-p[1], p[0] or ''))
+    assert top_k(PARES, 100) == top_k(PARES, None)
+    assert top_k([], 3) == []
+
+
+def test_space_saving_exato_dentro_da_capacidade():
+    contador = SpaceSaving(capacidade=10)
+    for chave, contagem in PARES:
+        contador.adicionar(chave, contagem)
+    
+    assert contador.top(3) == top_k(PARES, 3)
+    assert set(contador.erros.values()) == {0}
+
+
+def test_space_saving_garante_as_chaves_frequentes():
+    gerador = random.Random(42)
+    fluxo = ['quente'] * 300 + ['morna'] * 150 + [f"fria-{gerador.randrange(500)}" for _ in range(550)]
+    gerador.shuffle(fluxo)
+    contador = SpaceSaving(capacidade=20)
+    
+    for chave in fluxo:
+        contador.adicionar(chave)
+    
+    # Frequência real > total/capacidade (50): presentes, com contagem superestimada no máximo pelo erro
+    assert len(contador.contagens) == 20
+    assert [chave for chave, _ in contador.top(2)] == ['quente', 'morna']
+    for chave, real in (('quente', 300), ('morna', 150)):
+        assert real <= contador.contagens[chave] <= real + contador.erros[chave]
+
+
+def test_top_k_do_servico_aproximado_igual_ao_exato_em_cardinalidade_baixa(tickets):
+    exato = AnalysisService.top_k(tickets, 'componente', 3)
+    
+    assert exato == [('Database', 4), ('Middleware', 3), ('Infraestruturas', 1)]
+    assert AnalysisService.top_k(tickets, 'componente', 3, capacidade=10) == exato
+    assert AnalysisService.top_k(tickets, 'componente', 2, 'abertos') == [('Database', 2), ('Middleware', 2)]
+
+
+@pytest.mark.parametrize('dimensao', sorted(DIMENSOES))
+def test_top_k_aproximado_de_frame_usa_as_colunas(tickets, monkeypatch, dimensao):
+    frame = TicketFrame.from_tickets(tickets)
+    monkeypatch.setattr(TicketFrame, '__iter__', lambda self: pytest.fail("frame percorrido como Tickets"))
+    
+    # Capacidade menor que a cardinalidade: mesma ordem das linhas, mesmas substituições
+    for contagem in ('total', 'abertos'):
+        esperado = AnalysisService.top_k(tickets, dimensao, 3, contagem, capacidade=2)
+        assert AnalysisService.top_k(frame, dimensao, 3, contagem, capacidade=2) == esperado
@@ -0,0 +1,87 @@
+"""
+Testes do recebimento de uploads em streaming
+"""
+
+import asyncio
+import csv
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils import upload_stream
+from app.utils.upload_stream import BLOCOS_EM_ESPERA, FluxoUpload, UploadRejeitadoError
+
+BLOCO = b'x' * 1024
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=1)
+    yield executor
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _ler_tudo(fluxo):
+    return fluxo.read()
+
+
+def _falhar_no_primeiro_bloco(fluxo):
+    fluxo.read(len(BLOCO))
+    raise csv.Error("unexpected end of data")
+
+
+def test_leitor_recebe_todos_os_blocos(executor):
+    async def receber():
+        fluxo = FluxoUpload(tamanho_maximo=10 * 1024 * 1024)
+        leitor = fluxo.iniciar_leitor(executor, _ler_tudo)
+        for i in range(3 * BLOCOS_EM_ESPERA):
+            assert await fluxo.alimentar(bytes([i]) * 1024)
+        await fluxo.finalizar()
+        return fluxo, await leitor
+
+    fluxo, conteudo = asyncio.run(receber())
+
+    assert len(conteudo) == fluxo.tamanho == 3 * BLOCOS_EM_ESPERA * 1024
+    assert fluxo.hash == hashlib.md5(conteudo).hexdigest()
+
+
+def test_leitor_que_falha_no_meio_nao_trava_o_recebimento(executor, monkeypatch):
+    monkeypatch.setattr(upload_stream, 'ESPERA_ENTREGA', 0.05)
+
+    async def receber():
+        fluxo = FluxoUpload(tamanho_maximo=10 * 1024 * 1024)
+        leitor = fluxo.iniciar_leitor(executor, _falhar_no_primeiro_bloco)
+        entregues = [await fluxo.alimentar(BLOCO) for _ in range(4 * BLOCOS_EM_ESPERA)]
+        await fluxo.finalizar()
+        return entregues, leitor
+
+    # Com a fila cheia e o leitor morto, a entrega antiga esperava para sempre
+    entregues, leitor = asyncio.run(asyncio.wait_for(receber(), timeout=10))
+
+    assert entregues[0] and not entregues[-1]
+    assert leitor.done()
+    with pytest.raises(csv.Error):
+        leitor.result()
+
+
+def test_upload_acima_do_limite_e_recusado():
+    fluxo = FluxoUpload(tamanho_maximo=1536)
+
+    with pytest.raises(UploadRejeitadoError) as erro:
+        asyncio.run(fluxo.alimentar(BLOCO + BLOCO))
+
+    assert erro.value.status == 413
+
+
+def test_cabecalho_invalido_e_recusado_no_primeiro_bloco():
+    def validar(inicio):
+        if not inicio.startswith(b'Resumo;'):
+            raise ValueError("Cabeçalho do Jira não encontrado")
+
+    fluxo = FluxoUpload(tamanho_maximo=1024 * 1024, validar_inicio=validar)
+
+    with pytest.raises(UploadRejeitadoError) as erro:
+        asyncio.run(fluxo.alimentar(b'nome,idade\nAna,30\n'))
+
+    assert (erro.value.status, str(erro.value)) == (400, "Cabeçalho do Jira não encontrado")
@@ -0,0 +1,96 @@
+"""
+Testes da resolução da versão (módulo do build, git ou data local)
+"""
+
+import subprocess
+import sys
+import types
+from datetime import datetime
+
+import pytest
+
+from app.utils import versao
+from app.utils.versao import gravar_versao, obter_versao, versao_texto
+
+MODULO_BUILD = 'app._versao_build'
+
+
+@pytest.fixture(autouse=True)
+def sem_build(monkeypatch):
+    """Sem o módulo gerado no build e sem versão em cache"""
+    # None em sys.modules faz o import levantar ImportError, exista ou não o arquivo
+    monkeypatch.setitem(sys.modules, MODULO_BUILD, None)
+    versao._resolver.cache_clear()
+    yield
+    versao._resolver.cache_clear()
+
+
+class _GitFalso:
+    """Substituto de subprocess.check_output que conta as chamadas"""
+    
+    def __init__(self, saida=b'a1b2c3d 2025-01-31 10:20:30 -0300\n', erro=None):
+        self.saida = saida
+        self.erro = erro
+        self.chamadas = []
+    
+    def __call__(self, comando, **kwargs):
+        self.chamadas.append(comando)
+        if self.erro is not None:
+            raise self.erro
+        return self.saida
+
+
+def test_modulo_do_build_tem_precedencia_sobre_o_git(monkeypatch):
+    git = _GitFalso()
+    monkeypatch.setattr(versao.subprocess, 'check_output', git)
+    monkeypatch.setitem(sys.modules, MODULO_BUILD, types.SimpleNamespace(COMMIT='f00ba47', DATA='2025-02-01'))
+    
+    assert obter_versao() == {
+        'versao': 'v2025-02-01 (f00ba47)', 'commit': 'f00ba47', 'data': '2025-02-01', 'origem': 'build'
+    }
+    assert git.chamadas == []
+
+
+def test_sem_build_usa_um_unico_git_log(monkeypatch):
+    git = _GitFalso()
+    monkeypatch.setattr(versao.subprocess, 'check_output', git)
+    
+    for _ in range(3):
+        assert obter_versao()['origem'] == 'git'
+    assert versao_texto() == 'v2025-01-31 (a1b2c3d)'
+    
+    assert git.chamadas == [['git', 'log', '-1', '--format=%h %ai']]
+
+
+@pytest.mark.parametrize('erro', [
+    FileNotFoundError("git"),
+    subprocess.CalledProcessError(128, 'git'),
+    subprocess.TimeoutExpired('git', 5),
+], ids=['sem_git', 'fora_de_repositorio', 'timeout'])
+def test_sem_git_usa_a_data_local(monkeypatch, erro):
+    git = _GitFalso(erro=erro)
+    monkeypatch.setattr(versao.subprocess, 'check_output', git)
+    
+    dados = obter_versao()
+    obter_versao()
+    
+    assert dados['origem'] == 'local'
+    assert dados['commit'] == 'local'
+    assert dados['data'] == datetime.now().strftime('%Y-%m-%d')
+    assert len(git.chamadas) == 1
+
+
+def test_repositorio_sem_commits_usa_a_data_local(monkeypatch):
+    monkeypatch.setattr(versao.subprocess, 'check_output', _GitFalso(saida=b''))
+    
+    assert obter_versao()['origem'] == 'local'
+
+
+def test_gravar_versao_gera_o_modulo_lido_no_build(monkeypatch, tmp_path):
+    monkeypatch.setattr(versao.subprocess, 'check_output', _GitFalso())
+    
+    destino = gravar_versao(tmp_path / '_versao_build.py')
+    
+    namespace = {}
+    exec(destino.read_text(encoding='utf-8'), namespace)
+    assert (namespace['COMMIT'], namespace['DATA']) == ('a1b2c3d', '2025-01-31')
@@ -1,44 +1,24 @@
 """
 Sistema de versionamento automático baseado em git commits
+
+A versão é resolvida uma vez por processo (app.utils.versao): do módulo
+gravado no build com `python version.py --gravar` ou, sem ele, do git.
 """
 
-import subprocess
-from datetime import datetime
-import os
+import sys
+
+from app.utils.versao import gravar_versao, obter_versao, versao_texto
 
 def get_version():
     """Obtém versão baseada no git commit hash (curto)"""
-    try:
-        # Tentar obter o hash do commit atual (curto: 7 caracteres)
-        commit_hash = subprocess.check_output(
-            ['git', 'rev-parse', '--short', 'HEAD'],
-            stderr=subprocess.DEVNULL
-        ).decode('utf-8').strip()
-        
-        # Tentar obter a data do commit
-        commit_date = subprocess.check_output(
-            ['git', 'log', '-1', '--format=%ai'],
-            stderr=subprocess.DEVNULL
-        ).decode('utf-8').strip()
-        
-        # Formatar data (2024-12-25 12:34:56 +0000 -> 2024-12-25)
-        version_date = commit_date.split()[0]
-        
-        return f"v{version_date} ({commit_hash})"
-    except:
-        # Fallback: usar timestamp local
-        return f"v{datetime.now().strftime('%Y-%m-%d')} (local)"
+    return versao_texto()
 
 def get_version_short():
     """Obtém apenas o hash do commit (para uso em badges)"""
-    try:
-        commit_hash = subprocess.check_output(
-            ['git', 'rev-parse', '--short', 'HEAD'],
-            stderr=subprocess.DEVNULL
-        ).decode('utf-8').strip()
-        return commit_hash
-    except:
-        return "dev"
+    versao = obter_versao()
+    return versao['commit'] if versao['origem'] != 'local' else "dev"
 
 if __name__ == "__main__":
+    if '--gravar' in sys.argv[1:]:
+        print(f"Versão gravada em {gravar_versao()}")
     print(f"Versão atual: {get_version()}")
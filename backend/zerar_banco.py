@@ -32,6 +32,8 @@ def zerar_banco():
         # SQL para zerar e recriar
         sql_statements = """
 -- Deletar tabelas
+DROP TABLE IF EXISTS analises CASCADE;
+DROP TABLE IF EXISTS snapshots CASCADE;
 DROP TABLE IF EXISTS ticket_servers CASCADE;
 DROP TABLE IF EXISTS ticket_modules CASCADE;
 DROP TABLE IF EXISTS tickets CASCADE;
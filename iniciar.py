@@ -57,6 +57,7 @@ def teste_conexao():
     try:
         # Importar o serviço
         sys.path.insert(0, str(PROJETO_DIR))
+        sys.path.insert(0, str(PROJETO_DIR / "backend"))
         from backend.servico_tickets import obter_servico
         
         servico = obter_servico()
@@ -78,6 +79,7 @@ def ver_dados():
     
     try:
         sys.path.insert(0, str(PROJETO_DIR))
+        sys.path.insert(0, str(PROJETO_DIR / "backend"))
         from backend.servico_tickets import obter_servico
         
         servico = obter_servico()
@@ -34,12 +34,15 @@ try:
     
     servico = obter_servico()
     
+    # Todos os widgets em uma única consulta
+    painel = servico.obter_painel()
+    
     # Abas
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Resumo", "📦 Módulos", "🖥️ Servidores", "📋 Tipologia"])
     
     with tab1:
         st.subheader("Resumo Geral")
-        resumo = servico.obter_resumo()
+        resumo = painel['resumo']
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -53,7 +56,7 @@ try:
         
         # Gráfico de Status com mais detalhes
         st.subheader("📊 Distribuição de Status")
-        tipologia = servico.obter_tipologia()
+        tipologia = painel['tipologia']
         if tipologia:
             df_tipo = pd.DataFrame(tipologia, columns=['status', 'quantidade'])
             # Gráfico de barras horizontal com mais informações
@@ -79,7 +82,7 @@ try:
     
     with tab2:
         st.subheader("🧑 Top 20 em Atendimento")
-        responsaveis = servico.obter_top_responsaveis()
+        responsaveis = painel['top_responsaveis']
         
         if responsaveis:
             df_responsaveis = pd.DataFrame(responsaveis[:20], columns=['responsavel', 'total']).sort_values('total')
@@ -110,7 +113,7 @@ try:
     
     with tab3:
         st.subheader("🖥️ Top 20 Servidores")
-        servidores = servico.obter_top_servidores()
+        servidores = painel['top_servidores']
         
         if servidores:
             df_servidores = pd.DataFrame(servidores[:20], columns=['servidor', 'quantidade']).sort_values('quantidade')
@@ -143,7 +146,7 @@ try:
         st.subheader("📋 Tipologia de Tickets")
         
         st.subheader("Por Origem")
-        origem = servico.obter_origem()
+        origem = painel['origem']
         if origem:
             df_origem = pd.DataFrame(origem, columns=['origem', 'quantidade'])
             fig = px.bar(